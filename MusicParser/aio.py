@@ -0,0 +1,65 @@
+"""
+Asynchronous HTTP transport for music site parsers. (Requires aiohttp.)
+
+Author: Yungon Park
+"""
+try:
+    import aiohttp
+except ImportError:     # aiohttp is optional.
+    aiohttp = None
+
+from .transport import DEFAULT_HEADERS
+
+
+class AsyncTransport(object):
+    """
+    Pooled HTTP client for asyncio based on aiohttp.
+
+    Create it in a running event loop and share it among parsers. Close it with 'await close()'
+    or use it with 'async with'.
+    """
+
+    def __init__(self, limit=100, limit_per_host=10, timeout=10, headers=None):
+        if aiohttp is None:
+            raise ImportError("AsyncTransport requires aiohttp. (pip install aiohttp)")
+
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.headers = dict(DEFAULT_HEADERS)
+        if headers:
+            self.headers.update(headers)
+
+        self._session = None
+
+    def _get_session(self):
+        """Get session. (Session should be created in event loop.)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  headers=self.headers,
+                                                  timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    async def get_text(self, url):
+        """Send GET request and return decoded body. Raise ClientResponseError if failed."""
+        async with self._get_session().get(url) as response:
+            response.raise_for_status()
+            return await response.text()
+
+    async def get_content(self, url):
+        """Send GET request and return (body as bytes, Content-Type). Raise ClientResponseError if failed."""
+        async with self._get_session().get(url) as response:
+            response.raise_for_status()
+            return await response.read(), response.headers.get('Content-Type')
+
+    async def close(self):
+        """Close all pooled connections."""
+        if self._session is not None:
+            await self._session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
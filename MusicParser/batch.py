@@ -0,0 +1,82 @@
+"""
+Running parsers over many album URLs concurrently.
+
+Author: Yungon Park
+"""
+import collections
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class BatchResult(collections.namedtuple('BatchResult', ['url', 'result', 'error', 'elapsed'])):
+    """Result of one URL in a batch. Either result or error is None."""
+    __slots__ = ()
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class HostLimiter(object):
+    """Limit the number of concurrent requests for each host."""
+
+    def __init__(self, per_host):
+        self.per_host = per_host
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def _get_semaphore(self, host):
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.per_host)
+            return self._semaphores[host]
+
+    def slot(self, host):
+        """Return a context manager holding one slot for host."""
+        return self._get_semaphore(host)
+
+
+def _run(work, item):
+    """Call work for an item and wrap the outcome as BatchResult."""
+    start = time.perf_counter()
+    try:
+        result, error = work(item), None
+    except Exception as e:
+        result, error = None, e
+
+    return BatchResult(item, result, error, time.perf_counter() - start)
+
+
+def run_batch(work, items, max_workers=8, ordered=True):
+    """
+    Call work for each item with a thread pool and yield BatchResult.
+
+    At most max_workers * 2 items are in flight, so items may be a long (or endless) iterator.
+    If ordered is True, results are yielded in input order. Otherwise, in completion order.
+    """
+    window = max_workers * 2
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        if ordered:
+            pending = collections.deque()
+            for item in items:
+                pending.append(executor.submit(_run, work, item))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+        else:
+            pending = set()
+            for item in items:
+                pending.add(executor.submit(_run, work, item))
+                if len(pending) >= window:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
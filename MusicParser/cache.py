@@ -0,0 +1,171 @@
+"""
+Caches for pages from music information sites.
+
+Author: Yungon Park
+"""
+import collections
+import sqlite3
+import threading
+import time
+import zlib
+
+CachedPage = collections.namedtuple('CachedPage', ['url', 'content', 'content_type', 'etag', 'last_modified',
+                                                   'stored_at', 'fresh'])
+
+
+class ResponseCache(object):
+    """
+    Response cache stored in a SQLite file.
+
+    Pages are compressed and stored with ETag/Last-Modified, so stale pages can be revalidated.
+    If the total size is larger than max_size, least recently used pages are removed.
+    """
+
+    def __init__(self, path, ttl=24 * 60 * 60, max_size=512 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_size = max_size
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "url TEXT PRIMARY KEY, content BLOB, size INTEGER, content_type TEXT, "
+                "etag TEXT, last_modified TEXT, stored_at REAL, accessed_at REAL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+
+    def get(self, url):
+        """Get cached page for URL. Return None if it doesn't exist."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT content, content_type, etag, last_modified, stored_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            now = time.time()
+            with self._connection:
+                self._connection.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (now, url))
+
+            content, content_type, etag, last_modified, stored_at = row
+            fresh = now - stored_at < self.ttl
+            if fresh:
+                self.hits += 1
+
+        return CachedPage(url, zlib.decompress(content), content_type, etag, last_modified, stored_at, fresh)
+
+    def set(self, url, content, content_type=None, etag=None, last_modified=None):
+        """Store page for URL, and remove old pages if cache is too large."""
+        compressed = zlib.compress(content)
+        now = time.time()
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, compressed, len(compressed), content_type, etag, last_modified, now, now)
+            )
+            self._evict()
+
+    def refresh(self, url):
+        """Mark cached page for URL as fresh. (When site said it was not modified.)"""
+        now = time.time()
+
+        with self._lock, self._connection:
+            self._connection.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?",
+                                     (now, now, url))
+            self.revalidated += 1
+
+    def delete(self, url):
+        """Remove cached page for URL."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM responses WHERE url = ?", (url,))
+
+    def _evict(self):
+        """Remove least recently used pages until total size is under max_size."""
+        total_size = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total_size <= self.max_size:
+            return
+
+        for url, size in self._connection.execute("SELECT url, size FROM responses ORDER BY accessed_at").fetchall():
+            self._connection.execute("DELETE FROM responses WHERE url = ?", (url,))
+            self.evictions += 1
+            total_size -= size
+            if total_size <= self.max_size:
+                break
+
+    def clear(self):
+        """Remove all cached pages."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM responses")
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class TTLCache(object):
+    """
+    In-memory LRU cache with TTL. (Thread safe)
+
+    Cached values are shared, not copied, so they should be immutable.
+    """
+
+    def __init__(self, max_size=1024, ttl=60 * 60):
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._values = collections.OrderedDict()
+
+    def get(self, key):
+        """Get value for key. Return None if it doesn't exist or expired."""
+        with self._lock:
+            item = self._values.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._values[key]
+                self.misses += 1
+                return None
+
+            self._values.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key, value):
+        """Store value for key, and remove least recently used values if cache is full."""
+        with self._lock:
+            self._values[key] = (time.monotonic() + self.ttl, value)
+            self._values.move_to_end(key)
+
+            while len(self._values) > self.max_size:
+                self._values.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Remove all cached values."""
+        with self._lock:
+            self._values.clear()
+
+    def __len__(self):
+        return len(self._values)
+
+
+class AlbumCache(TTLCache):
+    """
+    In-memory LRU cache of parsed albums (Album records) with TTL. (Thread safe)
+
+    Cached records are shared, not copied. Parsers return a new dict from them for each call.
+    """
@@ -0,0 +1,191 @@
+"""
+Parse many albums from command line, and write them as JSON Lines.
+
+    python -m MusicParser urls.txt -o albums.jsonl.gz --workers 16 --cache pages.sqlite3
+
+URLs are read from a file (or stdin) one per line. Statistics are printed to stderr at the end.
+
+Author: Yungon Park
+"""
+import argparse
+import collections
+import math
+import os
+import sys
+import time
+
+from . import router
+from .cache import AlbumCache, ResponseCache
+from .export import JsonLinesWriter, skip_written
+from .parser import MusicParser
+from .replay import PageStore, RecordingTransport, ReplayTransport
+from .scheduler import Scheduler
+from .transport import Transport
+
+PERCENTILES = (50, 90, 99)
+
+
+def read_urls(stream):
+    """Read URLs from stream, skipping blank lines and comments ('#')."""
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line
+
+
+def percentile(sorted_values, percent):
+    """Get percentile of sorted values. (Nearest rank)"""
+    if not sorted_values:
+        return None
+
+    rank = max(1, int(math.ceil(percent / 100.0 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+class JobStats(object):
+    """Statistics of a parsing job."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.albums = 0
+        self.tracks = 0
+        self.skipped = 0
+        self.errors = collections.Counter()
+        self.latencies = []
+
+    def add(self, item):
+        """Add BatchResult."""
+        self.latencies.append(item.elapsed)
+
+        if item.ok:
+            self.albums += 1
+            self.tracks += len(item.result['tracks'])
+        else:
+            route = router.route(item.url)
+            self.errors[route.site if route is not None else 'invalid'] += 1
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started_at
+
+    def progress(self):
+        """Return one line of progress."""
+        elapsed = self.elapsed
+        return "%d albums, %d errors, %.1f albums/s" % (self.albums, sum(self.errors.values()),
+                                                        self.albums / elapsed if elapsed else 0)
+
+    def summary(self, response_cache=None, album_cache=None):
+        """Return lines of summary."""
+        elapsed = self.elapsed
+        lines = [
+            "Albums: %d (skipped %d), tracks: %d, errors: %d, elapsed: %.2f s" % (
+                self.albums, self.skipped, self.tracks, sum(self.errors.values()), elapsed),
+            "Throughput: %.1f albums/s, %.1f tracks/s" % (
+                self.albums / elapsed if elapsed else 0, self.tracks / elapsed if elapsed else 0),
+        ]
+
+        latencies = sorted(self.latencies)
+        if latencies:
+            lines.append("Latency: " + ", ".join("p%d %.0f ms" % (p, percentile(latencies, p) * 1000)
+                                                 for p in PERCENTILES))
+
+        if self.errors:
+            lines.append("Errors by site: " + ", ".join("%s %d" % (site, count)
+                                                        for site, count in sorted(self.errors.items())))
+
+        for name, cache in (('Response cache', response_cache), ('Album cache', album_cache)):
+            if cache is not None:
+                total = cache.hits + cache.misses
+                lines.append("%s: %d hits / %d lookups (%.1f%%)" % (
+                    name, cache.hits, total, 100.0 * cache.hits / total if total else 0))
+
+        if response_cache is not None:
+            lines.append("Response cache revalidated: %d" % response_cache.revalidated)
+
+        return lines
+
+
+def _make_arg_parser():
+    arg_parser = argparse.ArgumentParser(prog='python -m MusicParser', description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('input', nargs='?', default='-', help="File with album URLs. (Default: stdin)")
+    arg_parser.add_argument('-o', '--output', default='-',
+                            help="JSON Lines file to write. Compressed if it ends with '.gz'. (Default: stdout)")
+    arg_parser.add_argument('--resume', action='store_true', help="Continue after the last record in output file.")
+    arg_parser.add_argument('--workers', type=int, default=8, help="Number of concurrent requests.")
+    arg_parser.add_argument('--per-host', type=int, default=4, help="Number of concurrent requests for each host.")
+    arg_parser.add_argument('--processes', type=int, help="Number of worker processes parsing pages.")
+    arg_parser.add_argument('--rate', type=float, help="Requests per second for each host.")
+    arg_parser.add_argument('--cache', help="SQLite file to cache pages.")
+    arg_parser.add_argument('--cache-ttl', type=int, default=24 * 60 * 60, help="Seconds to keep cached pages fresh.")
+    arg_parser.add_argument('--record', help="SQLite file to save fetched pages for replaying.")
+    arg_parser.add_argument('--replay', help="SQLite file of recorded pages to parse instead of sites.")
+    arg_parser.add_argument('--album-cache', type=int, default=0, help="Number of parsed albums kept in memory.")
+    arg_parser.add_argument('--backend', help="Tree builder. (Default: fastest one installed)")
+    arg_parser.add_argument('--progress', type=float, default=10,
+                            help="Seconds between progress lines. (0 to disable)")
+    arg_parser.add_argument('-q', '--quiet', action='store_true', help="Don't print progress and statistics.")
+    return arg_parser
+
+
+def main(argv=None, stdin=None, stdout=None, stderr=None, transport=None):
+    """Run command line tool. Return exit status. (1 if no album was parsed but some failed)"""
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+    arg_parser = _make_arg_parser()
+    args = arg_parser.parse_args(argv)
+    if transport is not None and (args.cache or args.rate):
+        # They are settings of transport created by this tool.
+        arg_parser.error("--cache and --rate can't be used with a given transport.")
+
+    response_cache = ResponseCache(args.cache, ttl=args.cache_ttl) if args.cache else None
+    album_cache = AlbumCache(max_size=args.album_cache) if args.album_cache else None
+    scheduler = Scheduler(rate=args.rate) if args.rate else None
+    page_store = PageStore(args.replay or args.record) if args.replay or args.record else None
+    owns_transport = transport is None
+    if args.replay:
+        transport = ReplayTransport(page_store)
+    elif owns_transport:
+        transport = Transport(pool_maxsize=max(10, args.workers), cache=response_cache, scheduler=scheduler)
+    if args.record and not args.replay:
+        transport = RecordingTransport(page_store, transport)
+    parser = MusicParser(transport=transport, backend=args.backend, album_cache=album_cache)
+
+    input_file = stdin if args.input == '-' else open(args.input, encoding='utf-8')
+    stats = JobStats()
+
+    try:
+        urls = read_urls(input_file)
+
+        append = args.resume and args.output != '-' and os.path.exists(args.output)
+        if append:
+            stats.skipped, urls = skip_written(urls, args.output)
+
+        target = getattr(stdout, 'buffer', stdout) if args.output == '-' else args.output
+        next_progress = time.perf_counter() + args.progress
+        with JsonLinesWriter(target, append=append) as writer:
+            for item in parser.to_dict_many(urls, max_workers=args.workers, per_host=args.per_host,
+                                            processes=args.processes):
+                writer.write(item.url, album=item.result, error=item.error)
+                stats.add(item)
+
+                if not args.quiet and args.progress and time.perf_counter() >= next_progress:
+                    stderr.write(stats.progress() + '\n')
+                    next_progress = time.perf_counter() + args.progress
+    finally:
+        if input_file is not stdin:
+            input_file.close()
+        if owns_transport and not args.replay:
+            # Recording transport has no close(), so close the transport wrapped by it.
+            getattr(transport, 'transport', transport).close()
+
+    if not args.quiet:
+        for line in stats.summary(response_cache, album_cache):
+            stderr.write(line + '\n')
+
+    if response_cache is not None:
+        response_cache.close()
+    if page_store is not None:
+        page_store.close()
+
+    return 1 if stats.errors and not stats.albums else 0
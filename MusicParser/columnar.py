@@ -0,0 +1,169 @@
+"""
+Columnar export of parsed albums for analytics.
+
+Albums and tracks are written to two tables joined by album_id ('site:album ID').
+Rows are kept in column buffers and flushed in chunks, to Parquet if pyarrow is installed
+or to CSV otherwise.
+
+Author: Yungon Park
+"""
+import csv
+import os
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:     # pyarrow is optional.
+    pyarrow = None
+
+from . import router
+from .parser import MusicParser
+
+ALBUM_COLUMNS = ('album_id', 'site', 'url', 'artist', 'album_title', 'album_cover', 'track_count')
+TRACK_COLUMNS = ('album_id', 'disk', 'track_num', 'track_title', 'track_artist')
+
+# Integer columns. (Others are strings)
+INT_COLUMNS = ('track_count', 'disk', 'track_num')
+
+
+def _get_schema(columns):
+    return pyarrow.schema([(name, pyarrow.int32() if name in INT_COLUMNS else pyarrow.string()) for name in columns])
+
+
+class _ParquetTable(object):
+    """Parquet file written one row group per chunk."""
+
+    def __init__(self, path, columns):
+        self.columns = columns
+        self.schema = _get_schema(columns)
+        self._writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+
+    def write(self, buffers):
+        arrays = [pyarrow.array(buffers[name], type=self.schema.field(name).type) for name in self.columns]
+        self._writer.write_table(pyarrow.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self._writer.close()
+
+
+class _CsvTable(object):
+    """CSV file with a header row."""
+
+    def __init__(self, path, columns):
+        self.columns = columns
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+
+    def write(self, buffers):
+        self._writer.writerows(zip(*[buffers[name] for name in self.columns]))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ColumnarWriter(object):
+    """
+    Write albums to album table and track table in a directory.
+
+    format is 'parquet' or 'csv'. (Default: 'parquet' if pyarrow is installed, or 'csv')
+    Buffers are flushed when chunk_size tracks are collected, so memory is bounded.
+    """
+
+    def __init__(self, directory, format=None, chunk_size=100000):
+        if format is None:
+            format = 'parquet' if pyarrow is not None else 'csv'
+        if format == 'parquet' and pyarrow is None:
+            raise ImportError("Parquet format requires pyarrow. (pip install pyarrow)")
+        if format not in ('parquet', 'csv'):
+            raise ValueError("Unknown format: %s" % format)
+
+        self.format = format
+        self.chunk_size = chunk_size
+        self.album_count = 0
+        self.track_count = 0
+
+        table_class = _ParquetTable if format == 'parquet' else _CsvTable
+        os.makedirs(directory, exist_ok=True)
+        self.album_path = os.path.join(directory, 'albums.' + format)
+        self.track_path = os.path.join(directory, 'tracks.' + format)
+        self._album_table = table_class(self.album_path, ALBUM_COLUMNS)
+        self._track_table = table_class(self.track_path, TRACK_COLUMNS)
+
+        self._albums = self._new_buffers(ALBUM_COLUMNS)
+        self._tracks = self._new_buffers(TRACK_COLUMNS)
+
+    @staticmethod
+    def _new_buffers(columns):
+        return {name: [] for name in columns}
+
+    def add(self, url, album):
+        """Add an album (Album record) parsed from URL."""
+        route = router.route(url)
+        album_id = "%s:%s" % (route.site, route.album_id)
+
+        albums = self._albums
+        albums['album_id'].append(album_id)
+        albums['site'].append(route.site)
+        albums['url'].append(route.url)
+        albums['artist'].append(album.artist)
+        albums['album_title'].append(album.album_title)
+        albums['album_cover'].append(album.album_cover)
+        albums['track_count'].append(len(album.tracks))
+
+        tracks = self._tracks
+        for track in album.tracks:
+            tracks['album_id'].append(album_id)
+            tracks['disk'].append(track.disk)
+            tracks['track_num'].append(track.track_num)
+            tracks['track_title'].append(track.track_title)
+            tracks['track_artist'].append(track.track_artist)
+
+        self.album_count += 1
+        self.track_count += len(album.tracks)
+
+        if len(tracks['album_id']) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Write buffered rows to files."""
+        if self._albums['album_id']:
+            self._album_table.write(self._albums)
+            self._albums = self._new_buffers(ALBUM_COLUMNS)
+
+        if self._tracks['album_id']:
+            self._track_table.write(self._tracks)
+            self._tracks = self._new_buffers(TRACK_COLUMNS)
+
+    def close(self):
+        self.flush()
+        self._album_table.close()
+        self._track_table.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def export_columnar(input_urls, directory, parser=None, format=None, chunk_size=100000,
+                    max_workers=8, per_host=4, processes=None):
+    """
+    Parse albums from URLs and write them to album/track tables in directory.
+
+    Return counts of 'albums', 'tracks' and 'errors'.
+    """
+    parser = parser or MusicParser()
+    errors = 0
+
+    with ColumnarWriter(directory, format=format, chunk_size=chunk_size) as writer:
+        for item in parser.to_album_many(input_urls, max_workers=max_workers, per_host=per_host,
+                                         ordered=False, processes=processes):
+            if item.ok:
+                writer.add(item.url, item.result)
+            else:
+                errors += 1
+
+    return {'albums': writer.album_count, 'tracks': writer.track_count, 'errors': errors}
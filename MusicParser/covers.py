@@ -0,0 +1,244 @@
+"""
+Downloading album covers.
+
+Covers are stored once for each content (SHA-1 hash) in a directory, and URLs are mapped to them in a SQLite index.
+Covers shared by many albums (e.g. reissues) are downloaded once, and least recently used covers are removed
+if the total size is larger than max_size.
+
+Author: Yungon Park
+"""
+import collections
+import hashlib
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from urllib.parse import urlsplit, urlunsplit
+
+from . import router
+
+CoverFile = collections.namedtuple('CoverFile', ['url', 'path', 'sha1', 'size', 'cached'])
+
+# Site: (pattern of size in cover URL, replacement with size)
+RESIZE_PATTERNS = {
+    'melon': (re.compile(r"/resize/[0-9]+"), "/resize/%d"),
+    'bugs': (re.compile(r"/album/images/[0-9]+/"), "/album/images/%d/"),
+    'allmusic': (re.compile(r"/JPG_[0-9]+/"), "/JPG_%d/"),
+}
+
+COVER_HOSTS = {
+    'cdnimg.melon.co.kr': 'melon',
+    'image.bugsm.co.kr': 'bugs',
+    'cps-static.rovicorp.com': 'allmusic',
+}
+
+
+def resize_cover_url(cover_url, size):
+    """
+    Rewrite cover URL to get the image of size (pixels) from the site.
+
+    Melon and Bugs resize images on their servers, and AllMusic has images of a few sizes. (75, 170, 250, 400, 500)
+    Return URL as is if it is not a cover URL of these sites.
+    """
+    parts = urlsplit(cover_url)
+    site = COVER_HOSTS.get(parts.hostname)
+    if site is None:
+        return cover_url
+
+    pattern, replacement = RESIZE_PATTERNS[site]
+    if pattern.search(cover_url):
+        return pattern.sub(replacement % size, cover_url, count=1)
+
+    if site == 'melon':
+        # Original image without resizing options. (Options follow the path, before the query)
+        return urlunsplit(parts._replace(path=parts.path + "/melon/resize/%d/quality/80/optimize" % size))
+
+    return cover_url
+
+
+class CoverFetcher(object):
+    """
+    Download album covers to directory. (Thread safe)
+
+    If size is given, covers are requested in that size. (See resize_cover_url)
+    """
+
+    def __init__(self, directory, transport=None, max_size=1024 * 1024 * 1024, size=None):
+        self.directory = directory
+        self.transport = transport
+        self.max_size = max_size
+        self.size = size
+
+        self.hits = 0
+        self.downloads = 0
+        self.deduplicated = 0
+        self.evictions = 0
+        self.bytes_downloaded = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # URL: Future of CoverFile being downloaded.
+        self._downloading = {}
+        self._connection = sqlite3.connect(os.path.join(directory, 'index.sqlite3'), check_same_thread=False)
+        with self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS covers (url TEXT PRIMARY KEY, sha1 TEXT)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS covers_sha1 ON covers (sha1)")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS files (sha1 TEXT PRIMARY KEY, ext TEXT, size INTEGER, accessed_at REAL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS files_accessed_at ON files (accessed_at)")
+
+    def _get_transport(self):
+        from .transport import resolve_transport
+        return resolve_transport(self.transport)
+
+    def _get_path(self, sha1, ext):
+        return os.path.join(self.directory, sha1[:2], sha1 + ext)
+
+    def _get_cached(self, url):
+        """Get cached cover for URL. Return None if it isn't stored."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT files.sha1, files.ext, files.size FROM covers JOIN files ON covers.sha1 = files.sha1 "
+                "WHERE covers.url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            sha1, ext, size = row
+            path = self._get_path(sha1, ext)
+            if not os.path.exists(path):
+                return None
+
+            with self._connection:
+                self._connection.execute("UPDATE files SET accessed_at = ? WHERE sha1 = ?", (time.time(), sha1))
+            self.hits += 1
+
+        return CoverFile(url, path, sha1, size, True)
+
+    def fetch(self, cover_url):
+        """Get cover from cache, or download it. Return CoverFile."""
+        if self.size is not None:
+            cover_url = resize_cover_url(cover_url, self.size)
+
+        if not router.is_album_cover(cover_url):
+            raise ValueError("Not an album cover URL: %s" % cover_url)
+
+        cover = self._get_cached(cover_url)
+        if cover is not None:
+            return cover
+
+        # Only one thread downloads a URL. Others wait for it.
+        with self._lock:
+            future = self._downloading.get(cover_url)
+            downloading = future is None
+            if downloading:
+                future = self._downloading[cover_url] = Future()
+
+        if not downloading:
+            return future.result()
+
+        try:
+            cover = self._download(cover_url)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(cover)
+            return cover
+        finally:
+            with self._lock:
+                del self._downloading[cover_url]
+
+    def _download(self, cover_url):
+        """Download cover and store it if the same content isn't stored yet."""
+        content = self._get_transport().get(cover_url).content
+        sha1 = hashlib.sha1(content).hexdigest()
+        ext = os.path.splitext(urlsplit(cover_url).path.split('/melon/')[0])[1].lower() or '.jpg'
+
+        # File is written outside the lock, so concurrent downloads don't wait for each other's disk writes.
+        path = self._get_path(sha1, ext)
+        temp_path = self._write_temp(path, content)
+
+        try:
+            with self._lock:
+                self.downloads += 1
+                self.bytes_downloaded += len(content)
+
+                row = self._connection.execute("SELECT ext FROM files WHERE sha1 = ?", (sha1,)).fetchone()
+                if row is not None and os.path.exists(self._get_path(sha1, row[0])):
+                    # Same cover from another URL.
+                    ext = row[0]
+                    self.deduplicated += 1
+                else:
+                    # Rename is atomic, so a broken file is never read.
+                    os.replace(temp_path, path)
+                    temp_path = None
+
+                with self._connection:
+                    self._connection.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                                             (sha1, ext, len(content), time.time()))
+                    self._connection.execute("INSERT OR REPLACE INTO covers VALUES (?, ?)", (cover_url, sha1))
+                    self._evict(sha1)
+        finally:
+            if temp_path is not None:
+                os.remove(temp_path)
+
+        return CoverFile(cover_url, self._get_path(sha1, ext), sha1, len(content), False)
+
+    @staticmethod
+    def _write_temp(path, content):
+        """Write content to a temporary file in the directory of path, and return its path."""
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        with tempfile.NamedTemporaryFile(dir=directory, delete=False) as f:
+            f.write(content)
+
+        return f.name
+
+    def _evict(self, keep):
+        """Remove least recently used covers (except keep) until total size is under max_size."""
+        total_size = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM files").fetchone()[0]
+        if total_size <= self.max_size:
+            return
+
+        for sha1, ext, size in self._connection.execute(
+                "SELECT sha1, ext, size FROM files WHERE sha1 != ? ORDER BY accessed_at", (keep,)).fetchall():
+            self._connection.execute("DELETE FROM files WHERE sha1 = ?", (sha1,))
+            self._connection.execute("DELETE FROM covers WHERE sha1 = ?", (sha1,))
+            try:
+                os.remove(self._get_path(sha1, ext))
+            except FileNotFoundError:
+                pass
+
+            self.evictions += 1
+            total_size -= size
+            if total_size <= self.max_size:
+                break
+
+    def fetch_many(self, cover_urls, max_workers=8, per_host=4, ordered=True):
+        """Get covers of many URLs concurrently. Yield BatchResult with CoverFile for each URL."""
+        from .batch import HostLimiter, run_batch
+        from .scheduler import BULK, priority
+
+        limiter = HostLimiter(per_host)
+
+        def work(cover_url):
+            with limiter.slot(urlsplit(cover_url).hostname), priority(BULK):
+                return self.fetch(cover_url)
+
+        return run_batch(work, cover_urls, max_workers=max_workers, ordered=ordered)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,181 @@
+"""
+Export parsed albums as JSON Lines.
+
+Each line is {"url": input URL, "album": {...}} or {"url": input URL, "error": "..."}.
+
+Author: Yungon Park
+"""
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import zlib
+
+from .parser import MusicParser
+
+
+def _is_gzip_path(path, compress):
+    return path.endswith('.gz') if compress is None else compress
+
+
+def _open_read(path, compress):
+    if _is_gzip_path(path, compress):
+        return gzip.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def read_records(path, compress=None):
+    """
+    Read records from JSON Lines file written by JsonLinesWriter.
+
+    An incomplete record at the end (written when process was killed) is ignored.
+    """
+    with _open_read(path, compress) as f:
+        try:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                yield json.loads(line.decode('utf-8'))
+        except EOFError:
+            # gzip stream was cut in the middle.
+            return
+
+
+def _is_complete(path, compress):
+    """Check if the file ends with a complete record, so new records can be appended."""
+    with _open_read(path, compress) as f:
+        try:
+            last = b''
+            for line in f:
+                last = line
+        except EOFError:
+            return False
+
+    return last == b'' or last.endswith(b'\n')
+
+
+def _repair(path, compress):
+    """Rewrite the file without incomplete record at the end."""
+    directory = os.path.dirname(os.path.abspath(path))
+
+    with tempfile.NamedTemporaryFile(dir=directory, delete=False) as temp:
+        temp_path = temp.name
+    try:
+        with JsonLinesWriter(temp_path, compress=_is_gzip_path(path, compress)) as writer:
+            for record in read_records(path, compress):
+                writer.write_record(record)
+        shutil.move(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+class JsonLinesWriter(object):
+    """
+    Write records as JSON Lines to a file or stream.
+
+    Each record is flushed as soon as it is written. If path ends with '.gz' (or compress is True),
+    the file is compressed with gzip.
+    """
+
+    def __init__(self, target, compress=None, append=False):
+        self._owns_file = isinstance(target, str)
+        self._text = False
+
+        if self._owns_file:
+            mode = 'ab' if append else 'wb'
+            self.compress = _is_gzip_path(target, compress)
+            self._file = gzip.open(target, mode) if self.compress else open(target, mode)
+        else:
+            self.compress = bool(compress)
+            self._text = isinstance(target, io.TextIOBase)
+            if self.compress:
+                if self._text:
+                    raise ValueError("Compressed records should be written to a binary stream.")
+                self._file = gzip.GzipFile(fileobj=target, mode='wb')
+            else:
+                self._file = target
+
+    def write_record(self, record):
+        """Write a record and flush it."""
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        self._file.write(line if self._text else line.encode('utf-8'))
+
+        if self.compress:
+            self._file.flush(zlib.Z_SYNC_FLUSH)
+        else:
+            self._file.flush()
+
+    def write(self, url, album=None, error=None):
+        """Write parsed album, or error while parsing it."""
+        if error is not None:
+            self.write_record({'url': url, 'error': "%s: %s" % (type(error).__name__, error)})
+        else:
+            self.write_record({'url': url, 'album': album})
+
+    def close(self):
+        if self._owns_file or self.compress:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def skip_written(input_urls, path, compress=None):
+    """
+    Skip input URLs whose records are already in JSON Lines file, to resume writing to it.
+
+    A partially written last line is removed first. Return (the number of skipped URLs, iterator of remaining URLs).
+    Raise ValueError if the records don't match the input URLs in order.
+    """
+    if not _is_complete(path, compress):
+        _repair(path, compress)
+
+    count, last_url = 0, None
+    for record in read_records(path, compress):
+        count, last_url = count + 1, record['url']
+
+    if count == 0:
+        return 0, input_urls
+
+    input_urls = iter(input_urls)
+    skipped_url = None
+    for _, skipped_url in zip(range(count), input_urls):
+        pass
+
+    if skipped_url != last_url:
+        raise ValueError("Input URLs don't match records in %s. (Expected %s at line %d)" % (path, last_url, count))
+
+    return count, input_urls
+
+
+def export_jsonl(input_urls, target, parser=None, compress=None, resume=False, max_workers=8, per_host=4):
+    """
+    Parse albums from URLs and write each result to JSON Lines file (or stream) as soon as it is ready.
+
+    Only a bounded number of albums are kept in memory. Records (including errors) are written in input order,
+    so if resume is True, export continues after the last record in the file.
+    Return counts of 'written', 'errors' and 'skipped' URLs.
+    """
+    parser = parser or MusicParser()
+    counts = {'written': 0, 'errors': 0, 'skipped': 0}
+
+    append = resume and isinstance(target, str) and os.path.exists(target)
+    if append:
+        counts['skipped'], input_urls = skip_written(input_urls, target, compress)
+
+    with JsonLinesWriter(target, compress=compress, append=append) as writer:
+        for item in parser.to_dict_many(input_urls, max_workers=max_workers, per_host=per_host, ordered=True):
+            if item.ok:
+                writer.write(item.url, album=item.result)
+                counts['written'] += 1
+            else:
+                writer.write(item.url, error=item.error)
+                counts['errors'] += 1
+
+    return counts
@@ -0,0 +1,88 @@
+"""
+Finding tags of a row with one traversal.
+
+Instead of calling find() for each field (each call walks the row again), a row is walked once and
+every tag is checked against all selectors with plain attribute comparisons.
+
+Author: Yungon Park
+"""
+import collections
+
+# key: name of result
+# name, class_name: tag name, and a class the tag should have (None for any tag)
+# attr: (attribute name, value) the tag should have, or None
+# within: key of a selector which the tag should be in, or None for anywhere in the row
+# many: if True, all matching tags are collected as a list. Otherwise, the first matching tag.
+Selector = collections.namedtuple('Selector', ['key', 'name', 'class_name', 'attr', 'within', 'many'])
+
+
+def selector(key, name, class_name=None, attr=None, within=None, many=False):
+    return Selector(key, name, class_name, attr, within, many)
+
+
+# Selectors grouped by tag name, for each tuple of selectors.
+_indexes = {}
+
+
+def _get_index(selectors):
+    index = _indexes.get(selectors)
+    if index is None:
+        grouped = collections.defaultdict(list)
+        for item in selectors:
+            grouped[item.name].append(item)
+        index = _indexes[selectors] = {name: tuple(items) for name, items in grouped.items()}
+
+    return index
+
+
+def scan(root, selectors):
+    """
+    Walk descendants of root once, and return {key: tag} for selectors. (selectors should be a tuple)
+
+    A key is None (or an empty list if many) if no tag matched. Like find(), 'within' means the first tag of
+    that selector, and all matching tags are descendants of root.
+    """
+    from bs4.element import Tag
+
+    index = _get_index(selectors)
+    found = {item.key: [] if item.many else None for item in selectors}
+    # Keys of matched tags that each tag is in. (Only for tags in matched tags)
+    inside = {}
+    remaining = sum(1 for item in selectors if not item.many)
+    has_many = remaining < len(selectors)
+
+    for node in root.descendants:
+        if not isinstance(node, Tag):
+            continue
+
+        keys = inside.get(id(node.parent), ())
+        candidates = index.get(node.name)
+        if candidates:
+            matched = ()
+            for item in candidates:
+                if not item.many and found[item.key] is not None:
+                    continue
+                if item.within is not None and item.within not in keys:
+                    continue
+                if item.class_name is not None and item.class_name not in (node.get('class') or ()):
+                    continue
+                if item.attr is not None and node.get(item.attr[0]) != item.attr[1]:
+                    continue
+
+                if item.many:
+                    found[item.key].append(node)
+                else:
+                    found[item.key] = node
+                    remaining -= 1
+                matched += (item.key,)
+
+            if matched:
+                keys += matched
+
+        if keys:
+            inside[id(node)] = keys
+
+        if remaining == 0 and not has_many:
+            break
+
+    return found
@@ -0,0 +1,205 @@
+"""
+Incremental re-crawl of albums.
+
+A fingerprint (ETag/Last-Modified, hash of the page and hash of the album regions) is stored
+for each album URL. When an album is checked again:
+
+1. The page is requested with its validators. If the site says it was not modified, it is skipped.
+2. If the page is the same as before, it is skipped without building a tree.
+3. If the album regions are the same as before, it is skipped without parsing the album.
+
+Only new and changed albums are parsed, and changed albums are reported with a diff.
+
+Author: Yungon Park
+"""
+import collections
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit
+
+from .batch import HostLimiter, run_batch
+from .parser import MusicParser
+from .scheduler import BULK, priority
+
+Fingerprint = collections.namedtuple('Fingerprint', ['url', 'etag', 'last_modified', 'content_hash', 'region_hash',
+                                                     'album', 'checked_at'])
+
+# status: 'not_modified', 'unchanged' (album is None), 'new' or 'changed' (diff is None for new albums)
+AlbumChange = collections.namedtuple('AlbumChange', ['url', 'status', 'album', 'diff'])
+
+ALBUM_FIELDS = ('artist', 'album_title', 'album_cover')
+
+
+def _hash(content):
+    return hashlib.sha1(content).hexdigest()
+
+
+class FingerprintStore(object):
+    """Fingerprints of albums stored in a SQLite file. (Thread safe)"""
+
+    def __init__(self, path):
+        self.path = path
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS fingerprints ("
+                "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, content_hash TEXT, region_hash TEXT, "
+                "album TEXT, checked_at REAL)"
+            )
+
+    def get(self, url):
+        """Get fingerprint for URL. Return None if the album was not crawled."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT url, etag, last_modified, content_hash, region_hash, album, checked_at "
+                "FROM fingerprints WHERE url = ?", (url,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return Fingerprint(*row[:5], album=json.loads(row[5]), checked_at=row[6])
+
+    def set(self, url, etag, last_modified, content_hash, region_hash, album):
+        """Store fingerprint and album (dict) for URL."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, content_hash, region_hash, json.dumps(album, ensure_ascii=False),
+                 time.time())
+            )
+
+    def touch(self, url):
+        """Mark album for URL as checked now."""
+        with self._lock, self._connection:
+            self._connection.execute("UPDATE fingerprints SET checked_at = ? WHERE url = ?", (time.time(), url))
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM fingerprints").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def _track_key(track):
+    return track['disk'], track['track_num']
+
+
+def diff_albums(old, new):
+    """
+    Compare two albums (dict) and return the differences.
+
+    Changed fields are {'old': ..., 'new': ...}. Track changes are in 'tracks' as
+    lists of 'added', 'removed' and 'changed' ({'old': track, 'new': track}) tracks.
+    Return an empty dict if albums are the same.
+    """
+    diff = {}
+    for field in ALBUM_FIELDS:
+        if old.get(field) != new.get(field):
+            diff[field] = {'old': old.get(field), 'new': new.get(field)}
+
+    old_tracks = collections.OrderedDict((_track_key(track), track) for track in old['tracks'])
+    new_tracks = collections.OrderedDict((_track_key(track), track) for track in new['tracks'])
+
+    tracks = {
+        'added': [track for key, track in new_tracks.items() if key not in old_tracks],
+        'removed': [track for key, track in old_tracks.items() if key not in new_tracks],
+        'changed': [{'old': old_tracks[key], 'new': track} for key, track in new_tracks.items()
+                    if key in old_tracks and old_tracks[key] != track],
+    }
+    tracks = {name: items for name, items in tracks.items() if items}
+    if tracks:
+        diff['tracks'] = tracks
+
+    return diff
+
+
+class IncrementalCrawler(object):
+    """
+    Re-crawl albums and report only new and changed ones.
+
+    Fingerprints are read from and written to store (FingerprintStore).
+    counts has the number of albums for each status, and 'errors'.
+    """
+
+    def __init__(self, store, parser=None):
+        self.store = store
+        self.parser = parser or MusicParser()
+
+        self.counts = collections.Counter()
+        self._counts_lock = threading.Lock()
+
+    def _count(self, name):
+        with self._counts_lock:
+            self.counts[name] += 1
+
+    def check(self, input_url):
+        """Check album of URL and return AlbumChange."""
+        url, site_parser = self.parser._route(input_url)
+        previous = self.store.get(url)
+
+        headers = {}
+        if previous is not None:
+            if previous.etag:
+                headers['If-None-Match'] = previous.etag
+            if previous.last_modified:
+                headers['If-Modified-Since'] = previous.last_modified
+
+        transport = site_parser._get_transport()
+        # Fresh page in response cache would hide changes, so pages are always requested from site.
+        options = {'use_cache': False} if getattr(transport, 'cache', None) is not None else {}
+        response = site_parser._measure('fetch', transport.get, url, headers=headers, **options)
+        if response.status_code == 304 and previous is not None:
+            self.store.touch(url)
+            return AlbumChange(url, 'not_modified', None, None)
+
+        etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+        content_hash = _hash(response.content)
+        if previous is not None and content_hash == previous.content_hash:
+            self.store.set(url, etag, last_modified, content_hash, previous.region_hash, previous.album)
+            return AlbumChange(url, 'unchanged', None, None)
+
+        soup = site_parser._measure('tree_build', site_parser._make_soup, response.content,
+                                    site_parser._get_encoding(response))
+        # Tree has only album regions (if parser is partial), so ads or counters outside of them are ignored.
+        region_hash = _hash(soup.encode('utf-8'))
+        if previous is not None and region_hash == previous.region_hash:
+            self.store.set(url, etag, last_modified, content_hash, region_hash, previous.album)
+            return AlbumChange(url, 'unchanged', None, None)
+
+        album = site_parser._parse_tree(soup).to_dict()
+        self.store.set(url, etag, last_modified, content_hash, region_hash, album)
+
+        if previous is None:
+            return AlbumChange(url, 'new', album, None)
+
+        diff = diff_albums(previous.album, album)
+        if not diff:
+            return AlbumChange(url, 'unchanged', None, None)
+
+        return AlbumChange(url, 'changed', album, diff)
+
+    def check_many(self, input_urls, max_workers=8, per_host=4, ordered=True):
+        """Check albums of many URLs concurrently. Yield BatchResult with AlbumChange for each URL."""
+        limiter = HostLimiter(per_host)
+
+        def work(input_url):
+            with limiter.slot(urlsplit(input_url).hostname), priority(BULK):
+                return self.check(input_url)
+
+        for item in run_batch(work, input_urls, max_workers=max_workers, ordered=ordered):
+            self._count(item.result.status if item.ok else 'errors')
+            yield item
+
+    def recrawl(self, input_urls, max_workers=8, per_host=4):
+        """Check albums of many URLs and yield AlbumChange only for new and changed albums."""
+        for item in self.check_many(input_urls, max_workers=max_workers, per_host=per_host, ordered=False):
+            if item.ok and item.result.status in ('new', 'changed'):
+                yield item.result
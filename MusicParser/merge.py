@@ -0,0 +1,201 @@
+"""
+Merging the same album parsed from several sites.
+
+Albums (dicts from to_dict) are indexed by normalized album title, and matched by aliases of artists,
+so finding an album is a dict lookup instead of comparing with every album. Tracks are aligned with
+a dict of normalized track titles in the same way.
+
+Author: Yungon Park
+"""
+import collections
+import re
+import unicodedata
+
+from . import router
+
+SITES = ('melon', 'bugs', 'allmusic')
+
+ALBUM_FIELDS = ('artist', 'album_title', 'album_cover')
+TRACK_FIELDS = ('disk', 'track_num', 'track_title', 'track_artist')
+
+Entry = collections.namedtuple('Entry', ['site', 'url', 'album'])
+
+_WORD_PATTERN = re.compile(r"[\W_]+")
+_ARTIST_SEPARATOR_PATTERN = re.compile(r"[,&/;]")
+_PARENTHESES_PATTERN = re.compile(r"[(\[]([^)\]]*)[)\]]")
+
+
+def normalize(text):
+    """Normalize text for comparing. (Width, case, spaces and punctuation are ignored)"""
+    return _WORD_PATTERN.sub('', unicodedata.normalize('NFKC', text or '').casefold())
+
+
+def artist_keys(artist):
+    """
+    Get normalized names of artists, including names in parentheses.
+
+    e.g. "크라잉넛(Crying Nut), 노브레인" -> {'크라잉넛', 'cryingnut', '노브레인'}
+    """
+    keys = set()
+
+    for part in _ARTIST_SEPARATOR_PATTERN.split(artist or ''):
+        names = _PARENTHESES_PATTERN.findall(part)
+        names.append(_PARENTHESES_PATTERN.sub('', part))
+        keys.update(normalize(name) for name in names)
+
+    keys.discard('')
+    return keys
+
+
+def align_tracks(tracks, other_tracks):
+    """
+    Align tracks of two albums by normalized track title.
+
+    Return list of (track, other track) pairs. A track without its pair is paired with None, and
+    tracks only in other_tracks come last in their order.
+    """
+    # Normalized title: indexes of other tracks. (Same titles are paired in their order)
+    other_indexes = collections.defaultdict(collections.deque)
+    for i, track in enumerate(other_tracks):
+        other_indexes[normalize(track['track_title'])].append(i)
+
+    pairs = []
+    paired = set()
+    for track in tracks:
+        indexes = other_indexes.get(normalize(track['track_title']))
+        if indexes:
+            i = indexes.popleft()
+            paired.add(i)
+            pairs.append((track, other_tracks[i]))
+        else:
+            pairs.append((track, None))
+
+    pairs.extend((None, track) for i, track in enumerate(other_tracks) if i not in paired)
+    return pairs
+
+
+def _pick(values, fields):
+    # values: list of (site, dict). The first non-empty value of each field is used.
+    result = {}
+    provenance = {}
+
+    for field in fields:
+        for site, value in values:
+            if value is not None and value.get(field) not in (None, ''):
+                result[field] = value[field]
+                provenance[field] = site
+                break
+        else:
+            result[field] = None
+
+    return result, provenance
+
+
+def merge_albums(entries, priority=SITES):
+    """
+    Merge entries of the same album into one dict.
+
+    Each field is taken from the first site in priority which has it, and 'provenance' has the site of
+    each field. Tracks are in the order of the first site, followed by tracks only in other sites.
+    'sources' has the URL of each site.
+    """
+    order = {site: i for i, site in enumerate(priority)}
+    entries = sorted(entries, key=lambda entry: order.get(entry.site, len(order)))
+    if not entries:
+        raise ValueError("No album to merge.")
+
+    merged, provenance = _pick([(entry.site, entry.album) for entry in entries], ALBUM_FIELDS)
+
+    # Rows of (site, track) for each aligned track, in priority order.
+    rows = [[(entries[0].site, track)] for track in entries[0].album['tracks']]
+    for entry in entries[1:]:
+        # Tracks are aligned with the first track of each row. (Pairs are in the order of rows)
+        pairs = align_tracks([row[0][1] for row in rows], entry.album['tracks'])
+
+        for row, (_, other) in zip(rows, pairs):
+            if other is not None:
+                row.append((entry.site, other))
+        rows.extend([(entry.site, other)] for _, other in pairs[len(rows):])
+
+    tracks = []
+    for row in rows:
+        track, track_provenance = _pick(row, TRACK_FIELDS)
+        track['sources'] = [site for site, _ in row]
+        track['provenance'] = track_provenance
+        tracks.append(track)
+
+    merged['tracks'] = tracks
+    merged['sources'] = collections.OrderedDict((entry.site, entry.url) for entry in entries)
+    merged['provenance'] = provenance
+    return merged
+
+
+class AlbumIndex(object):
+    """
+    Index of albums from several sites, grouping the same album.
+
+    Albums are the same if their normalized titles are the same and they have a common artist name.
+    A group has at most one album of each site.
+    """
+
+    def __init__(self, priority=SITES):
+        self.priority = priority
+        # Normalized album title: list of groups. (A group is a list of entries)
+        self._groups = collections.defaultdict(list)
+        # Artist keys of each group. (By id of group)
+        self._artist_keys = {}
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _find_group(self, title_key, keys, site=None):
+        for group in self._groups.get(title_key, ()):
+            if site is not None and any(entry.site == site for entry in group):
+                continue
+            if keys & self._artist_keys[id(group)]:
+                return group
+
+        return None
+
+    def add(self, url, album):
+        """Add album (dict from to_dict) parsed from url. Return Entry of the album."""
+        route = router.route(url)
+        if route is None:
+            raise ValueError("Album URL is not valid: %s" % url)
+
+        entry = Entry(route.site, route.url, album)
+        title_key = normalize(album['album_title'])
+        keys = artist_keys(album['artist'])
+
+        group = self._find_group(title_key, keys, entry.site)
+        if group is None:
+            group = []
+            self._groups[title_key].append(group)
+            self._artist_keys[id(group)] = set()
+
+        group.append(entry)
+        self._artist_keys[id(group)].update(keys)
+        self._size += 1
+        return entry
+
+    def add_many(self, albums):
+        """Add (url, album) pairs."""
+        for url, album in albums:
+            self.add(url, album)
+
+    def find(self, artist, album_title):
+        """Get entries of the album. Return an empty list if not found."""
+        group = self._find_group(normalize(album_title), artist_keys(artist))
+        return list(group) if group is not None else []
+
+    def groups(self):
+        """Yield entries of each album."""
+        for groups in self._groups.values():
+            for group in groups:
+                yield list(group)
+
+    def merged(self):
+        """Yield merged dict of each album. (See merge_albums)"""
+        for group in self.groups():
+            yield merge_albums(group, self.priority)
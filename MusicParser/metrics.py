@@ -0,0 +1,96 @@
+"""
+Metrics of parsing album information.
+
+Parsers send metrics to a sink given as 'metrics' argument:
+
+* Timings (seconds): fetch, decode, tree_build, get_artist, get_track_list, serialize
+  (decode is only finding the encoding. Pages are decoded by tree builder in tree_build.)
+* Counts: bytes_downloaded, track_count
+
+Author: Yungon Park
+"""
+import collections
+import threading
+
+
+class MetricsSink(object):
+    """Base class of metrics sink. Override methods to send metrics to your own metrics system."""
+
+    def timing(self, name, seconds, site):
+        """Receive elapsed time of a stage."""
+        pass
+
+    def count(self, name, value, site):
+        """Receive a counted value."""
+        pass
+
+
+class CallbackSink(MetricsSink):
+    """Metrics sink calling functions for each metric."""
+
+    def __init__(self, on_timing=None, on_count=None):
+        self.on_timing = on_timing
+        self.on_count = on_count
+
+    def timing(self, name, seconds, site):
+        if self.on_timing is not None:
+            self.on_timing(name, seconds, site)
+
+    def count(self, name, value, site):
+        if self.on_count is not None:
+            self.on_count(name, value, site)
+
+
+class ListSink(MetricsSink):
+    """Metrics sink keeping metrics in lists, to send them to another sink later. (e.g. from worker processes)"""
+
+    def __init__(self):
+        self.timings = []
+        self.counts = []
+
+    def timing(self, name, seconds, site):
+        self.timings.append((name, seconds, site))
+
+    def count(self, name, value, site):
+        self.counts.append((name, value, site))
+
+    def send_to(self, sink):
+        """Send kept metrics to sink."""
+        for item in self.timings:
+            sink.timing(*item)
+        for item in self.counts:
+            sink.count(*item)
+
+
+class StatsSink(MetricsSink):
+    """Metrics sink collecting count, total, min and max of each metric per site. (Thread safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = collections.defaultdict(lambda: {'count': 0, 'total': 0, 'min': None, 'max': None})
+
+    def _add(self, name, value, site):
+        with self._lock:
+            stat = self._stats[(site, name)]
+            stat['count'] += 1
+            stat['total'] += value
+            stat['min'] = value if stat['min'] is None else min(stat['min'], value)
+            stat['max'] = value if stat['max'] is None else max(stat['max'], value)
+
+    def timing(self, name, seconds, site):
+        self._add(name, seconds, site)
+
+    def count(self, name, value, site):
+        self._add(name, value, site)
+
+    def summary(self):
+        """Return {site: {name: {'count', 'total', 'min', 'max', 'mean'}}}."""
+        result = collections.defaultdict(dict)
+
+        with self._lock:
+            for (site, name), stat in self._stats.items():
+                item = dict(stat)
+                item['mean'] = stat['total'] / stat['count']
+                result[site][name] = item
+
+        return dict(result)
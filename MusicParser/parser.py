@@ -1,90 +1,327 @@
 """
 Music Parser from music information sites.
 
+Heavy modules (requests, bs4, asyncio, ...) are imported on first use, not when this module is imported.
+So checking URLs (check_input, get_album_key) doesn't pay for loading them.
+
 Author: Yungon Park
 """
+import importlib.util
 import json
 import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+from . import router
+from .extract import scan, selector
+from .records import Album, Track
+
+# SoupStrainer for album regions of each site. (Created once for each site)
+_strainers = {}
+
+_CHARSET_PATTERN = re.compile(r"charset=[\"']?([^\"';\s]+)", re.IGNORECASE)
+
+
+_default_backend = None
 
-import requests
-from bs4 import BeautifulSoup
+
+def get_default_backend():
+    """Get the fastest HTML tree builder installed. ('lxml' if installed, or 'html.parser')"""
+    global _default_backend
+
+    if _default_backend is None:
+        # Find lxml without importing it.
+        _default_backend = "lxml" if importlib.util.find_spec('lxml') is not None else "html.parser"
+
+    return _default_backend
 
 
 class MusicParser(object):
     """Base parser class for parsing album information from music sites."""
 
+    # Name of site for metrics.
+    site = None
+    # Regions of a page read by _parse_soup, as (tag name, class) pairs.
+    album_regions = ()
+    # Tag containing track table, as (tag name, class). (Tracks can't be streamed if None)
+    track_container = None
+    # Encoding of pages if response doesn't tell it. (Detected from page if None)
+    encoding = None
+
+    def __init__(self, transport=None, async_transport=None, backend=None, partial=True, album_cache=None,
+                 metrics=None):
+        # Parsers without their own transport share the default connection pool.
+        self.transport = transport
+        self.async_transport = async_transport
+        # Tree builder for BeautifulSoup. ('lxml', 'html.parser', ...)
+        self.backend = backend or get_default_backend()
+        # If True, build tree only for album regions instead of the whole page.
+        self.partial = partial
+        # AlbumCache for parsed albums. (Not used if None)
+        self.album_cache = album_cache
+        # MetricsSink receiving timings of each stage. (Not measured if None)
+        self.metrics = metrics
+        # Parsers for each site sharing settings of this parser.
+        self._site_parsers = {}
+        self._site_parsers_lock = threading.Lock()
+
     @staticmethod
     def check_album_cover_pattern(original_url):
         """Check album cover file pattern."""
-        # naver_pattern = re.compile('http://musicmeta[.]phinf[.]naver[.]net/album/.*[.]jpg[?].*')
-        melon_pattern = re.compile('http://cdnimg[.]melon[.]co[.]kr/cm/album/images/.*[.]jpg')
-        bugs_pattern = re.compile('https://image[.]bugsm[.]co[.]kr/album/images/.*[.]jpg')
-        allmusic_pattern = re.compile('https://cps-static[.]rovicorp[.]com/.*[.]jpg.*')
+        return router.is_album_cover(original_url)
+
+    def _get_transport(self):
+        """Get transport to send requests."""
+        from .transport import resolve_transport
+        return resolve_transport(self.transport)
+
+    def _measure(self, stage, func, *args, **kwargs):
+        """Call function and send elapsed time to metrics sink."""
+        if self.metrics is None:
+            return func(*args, **kwargs)
+
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.metrics.timing(stage, time.perf_counter() - start, self.site)
+
+    def _get_encoding(self, response):
+        """Get encoding of page from Content-Type header, or encoding of the site. (Without detecting it)"""
+        return self._get_encoding_from_type(response.headers.get('Content-Type'))
+
+    def _get_encoding_from_type(self, content_type):
+        """Get encoding from charset of Content-Type, or encoding of the site."""
+        match = _CHARSET_PATTERN.search(content_type or '')
+        if match:
+            return match.group(1)
 
-        # result = naver_pattern.search(original_url)
-        # if result:
-        #     return True
+        return self.encoding
 
-        result = melon_pattern.search(original_url)
-        if result:
-            return True
+    def _get_original_data(self, album_url):
+        """Get original data for an album from web sites."""
+        data = self._measure('fetch', self._get_transport().get, album_url)
 
-        result = bugs_pattern.search(original_url)
-        if result:
-            return True
+        if self.metrics is not None:
+            self.metrics.count('bytes_downloaded', len(data.content), self.site)
 
-        result = allmusic_pattern.search(original_url)
-        if result:
-            return True
+        # Tree builder decodes bytes with known encoding, instead of requests detecting it and decoding them first.
+        encoding = self._measure('decode', self._get_encoding, data)
+        return self._measure('tree_build', self._make_soup, data.content, encoding)
 
-        return False
+    async def _get_original_page_async(self, album_url):
+        """Get original page (bytes and its encoding) for an album from web sites without blocking event loop."""
+        start = time.perf_counter()
 
-    @staticmethod
-    def _get_original_data(album_url):
-        """Get original data for an album from web sites."""
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:49.0) Gecko/20100101 Firefox/49.0'
-        }
-        data = requests.get(album_url, headers=headers)
+        if self.async_transport is not None:
+            content, content_type = await self.async_transport.get_content(album_url)
+        else:
+            # Without async transport, send request with blocking transport in default executor.
+            import asyncio
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(None, self._get_transport().get, album_url)
+            content, content_type = response.content, response.headers.get('Content-Type')
+
+        if self.metrics is not None:
+            self.metrics.timing('fetch', time.perf_counter() - start, self.site)
+            self.metrics.count('bytes_downloaded', len(content), self.site)
+
+        # Like _get_original_data, tree builder decodes bytes with known encoding.
+        return content, self._measure('decode', self._get_encoding_from_type, content_type)
+
+    def _get_strainer(self):
+        """Get SoupStrainer for album regions. (All tags with these names and classes are kept.)"""
+        if not self.partial or not self.album_regions:
+            return None
 
-        return BeautifulSoup(data.text, "html.parser")
+        strainer = _strainers.get(self.album_regions)
+        if strainer is None:
+            from bs4 import SoupStrainer
+
+            names = sorted(set(name for name, _ in self.album_regions))
+            classes = sorted(set(class_name for _, class_name in self.album_regions))
+            # Match one of classes in 'class' attribute whether it was split into a list or not.
+            class_pattern = re.compile(r"(?:^|\s)(?:" + "|".join(re.escape(item) for item in classes) + r")(?:\s|$)")
+
+            strainer = _strainers[self.album_regions] = SoupStrainer(names, attrs={'class': class_pattern})
+
+        return strainer
+
+    def _make_soup(self, markup, encoding=None):
+        """Build tree from page. (str, or bytes in encoding)"""
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(markup, self.backend, parse_only=self._get_strainer(),
+                             from_encoding=encoding if isinstance(markup, bytes) else None)
 
     @staticmethod
     def check_input(url_input):
-        """Check if input URL is valid and return normalized URL."""
-        bugs_pattern = re.compile("bugs[.]co[.]kr/album/[0-9]{1,8}")
-        # naver_music_pattern = re.compile("music[.]naver[.]com/album/index.nhn[?]albumId=[0-9]{1,8}")
-        melon_pattern = re.compile("melon[.]com/album/detail[.]htm[?]albumId=[0-9]{1,8}")
-        allmusic_pattern = re.compile("allmusic[.]com/album/.*mw[0-9]{10}")
+        """
+        Check if input URL is valid and return normalized URL.
 
-        match = bugs_pattern.search(url_input)
-        if match:
-            return "https://music." + match.group(), BugsParser()
+        Returned parser is shared by all callers, so don't change its settings.
+        """
+        route = router.route(url_input)
+        if route is None:
+            raise InvalidURLError
 
-        # match = naver_music_pattern.search(url_input)
-        # if match:
-        #     return "https://" + match.group(), NaverMusicParser()
+        return route.url, get_site_parser(route.site)
 
-        match = melon_pattern.search(url_input)
-        if match:
-            return "https://www." + match.group(), MelonParser()
+    @staticmethod
+    def get_album_key(url_input):
+        """Get (site, album ID) from URL. Return None if URL is not valid."""
+        route = router.route(url_input)
+        if route is None:
+            return None
 
-        match = allmusic_pattern.search(url_input)
-        if match:
-            return "https://www." + match.group(), AllMusicParser()
+        return route.site, route.album_id
+
+    @staticmethod
+    def classify_many(url_inputs):
+        """Get Route(site, album_id, url) for each URL. (None if URL is not valid)"""
+        return router.classify_many(url_inputs)
+
+    def _get_site_parser(self, site):
+        """Get parser for site which shares settings of this parser."""
+        parser = self._site_parsers.get(site)
+        if parser is None:
+            with self._site_parsers_lock:
+                parser = self._site_parsers.get(site)
+                if parser is None:
+                    parser = self._site_parsers[site] = PARSER_CLASSES[site]()
+
+        # Settings are copied for each call, so changing settings of this parser takes effect. (It's cheap)
+        return self._bind(parser)
+
+    def _route(self, input_url):
+        """Check if input URL is valid and return normalized URL and parser for the site."""
+        route = router.route(input_url)
+        if route is None:
+            raise InvalidURLError
+
+        return route.url, self._get_site_parser(route.site)
 
-        raise InvalidURLError
+    def _bind(self, parser):
+        """Share settings of this parser with a parser for specific site."""
+        parser.transport = self.transport
+        parser.async_transport = self.async_transport
+        parser.backend = self.backend
+        parser.partial = self.partial
+        parser.album_cache = self.album_cache
+        parser.metrics = self.metrics
+        return parser
 
     def to_dict(self, input_url):
         """ Parse album information from music sites to dict. """
-        url, parser = self.check_input(input_url)
+        url, parser = self._route(input_url)
         return parser.to_dict(url)
 
     def to_json(self, input_url):
         """ Parse album information from music sites to JSON. """
-        url, parser = self.check_input(input_url)
+        url, parser = self._route(input_url)
         return parser.to_json(url)
 
+    def to_album(self, input_url):
+        """ Parse album information from music sites to Album record. """
+        url, parser = self._route(input_url)
+        return parser.to_album(url)
+
+    def _map_many(self, method_name, input_urls, max_workers, per_host, ordered, processes=None):
+        """Call method of site parsers for many URLs with a thread pool."""
+        from .batch import HostLimiter, run_batch
+        from .scheduler import BULK, priority
+
+        limiter = HostLimiter(per_host)
+
+        if processes is None:
+            def work(input_url):
+                url, parser = self._route(input_url)
+                with limiter.slot(urlsplit(url).hostname), priority(BULK):
+                    return getattr(parser, method_name)(url)
+
+            return run_batch(work, input_urls, max_workers=max_workers, ordered=ordered)
+
+        return self._map_many_processes(method_name, input_urls, limiter, max_workers, ordered, processes)
+
+    def _map_many_processes(self, method_name, input_urls, limiter, max_workers, ordered, processes):
+        """Fetch pages with a thread pool, and parse them with a process pool."""
+        from concurrent.futures import ProcessPoolExecutor
+
+        from .batch import run_batch
+        from .scheduler import BULK, priority
+
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            def work(input_url):
+                url, parser = self._route(input_url)
+                with limiter.slot(urlsplit(url).hostname), priority(BULK):
+                    album = parser._get_album(url, executor)
+
+                if method_name == 'to_album':
+                    return album
+                return album.to_dict() if method_name == 'to_dict' else parser._serialize(album)
+
+            for result in run_batch(work, input_urls, max_workers=max_workers, ordered=ordered):
+                yield result
+
+    def to_dict_many(self, input_urls, max_workers=8, per_host=4, ordered=True, processes=None):
+        """
+        Parse album information from many URLs concurrently to dict.
+
+        Yield BatchResult for each URL. If parsing failed, its error has the exception.
+        If processes is given, pages are fetched by threads and parsed by a pool of worker processes.
+        """
+        return self._map_many('to_dict', input_urls, max_workers, per_host, ordered, processes)
+
+    def to_album_many(self, input_urls, max_workers=8, per_host=4, ordered=True, processes=None):
+        """
+        Parse album information from many URLs concurrently to Album record.
+
+        Yield BatchResult for each URL. If parsing failed, its error has the exception.
+        If processes is given, pages are fetched by threads and parsed by a pool of worker processes.
+        """
+        return self._map_many('to_album', input_urls, max_workers, per_host, ordered, processes)
+
+    def to_json_many(self, input_urls, max_workers=8, per_host=4, ordered=True, processes=None):
+        """
+        Parse album information from many URLs concurrently to JSON.
+
+        Yield BatchResult for each URL. If parsing failed, its error has the exception.
+        If processes is given, pages are fetched by threads and parsed by a pool of worker processes.
+        """
+        return self._map_many('to_json', input_urls, max_workers, per_host, ordered, processes)
+
+    def iter_tracks(self, input_url):
+        """
+        Parse tracks of album while its page is downloaded, and yield each track as Track record.
+
+        Only supported for sites with track_container. (Bugs, Melon)
+        """
+        url, parser = self._route(input_url)
+        if parser.track_container is None:
+            raise NotImplementedError("Tracks of %s can't be streamed." % parser.site)
+
+        return parser.iter_tracks(url)
+
+    async def to_dict_async(self, input_url, executor=None):
+        """
+        Parse album information from music sites to dict asynchronously.
+
+        If executor is given, building and parsing the tree run in it instead of event loop.
+        (ThreadPoolExecutor, or ProcessPoolExecutor to parse pages in parallel)
+        """
+        url, parser = self._route(input_url)
+        return await parser.to_dict_async(url, executor)
+
+    async def to_json_async(self, input_url, executor=None):
+        """
+        Parse album information from music sites to JSON asynchronously.
+
+        If executor is given, building and parsing the tree run in it instead of event loop.
+        (ThreadPoolExecutor, or ProcessPoolExecutor to parse pages in parallel)
+        """
+        url, parser = self._route(input_url)
+        return await parser.to_json_async(url, executor)
+
     def _get_artist(self, artist_data):
         """Get artist information"""
         raise NotImplementedError
@@ -97,9 +334,149 @@ class MusicParser(object):
         """Get track list from 'tr' tags."""
         raise NotImplementedError
 
+    def _iter_track_list(self, rows):
+        """Get tracks from (table index, row index in table, 'tr' tag) of streamed track table."""
+        raise NotImplementedError
+
+    def _parse_soup(self, soup):
+        """Parse album data from a page of music information site."""
+        raise NotImplementedError
+
+    def _parse_tree(self, soup):
+        """Parse album data from tree, and count tracks. Raise ParseError if album data is not in the tree."""
+        try:
+            album = self._parse_soup(soup)
+        except (AttributeError, IndexError, KeyError, TypeError, ValueError) as e:
+            # Error pages (or throttled responses) don't have the tags of album pages.
+            raise ParseError("Album information was not found in the page from %s." % self.site) from e
+
+        if self.metrics is not None:
+            self.metrics.count('track_count', len(album.tracks), self.site)
+
+        return album
+
+    def _parse_page(self, markup, encoding=None):
+        """Build tree from page (str, or bytes in encoding) and parse album data."""
+        return self._parse_tree(self._measure('tree_build', self._make_soup, markup, encoding))
+
     def _parse_album(self, album_url):
         """Parse album data from music information site."""
-        raise NotImplementedError
+        return self._parse_tree(self._get_original_data(album_url))
+
+    def _make_row(self, row_html):
+        """Build tree for a row of track table."""
+        from bs4 import BeautifulSoup
+        return BeautifulSoup('<table>' + row_html + '</table>', self.backend).tr
+
+    def _stream_track_rows(self, album_url):
+        """Download page for an album, and yield (table index, row index in table, 'tr' tag) of track table."""
+        if self.track_container is None:
+            raise NotImplementedError("Tracks of %s can't be streamed." % self.site)
+
+        from . import streaming
+
+        response = self._measure('fetch', self._get_transport().get, album_url, stream=True)
+        try:
+            texts = streaming.iter_text(response, encoding=self._get_encoding(response))
+            for table_index, row_index, row_html in streaming.iter_rows(texts, self.track_container):
+                yield table_index, row_index, self._make_row(row_html)
+        finally:
+            # Download stops here if track table ended before the page.
+            response.close()
+
+    def _parse_album_in_process(self, album_url, executor):
+        """Fetch page for an album, and parse it in process pool."""
+        data = self._measure('fetch', self._get_transport().get, album_url)
+
+        if self.metrics is not None:
+            self.metrics.count('bytes_downloaded', len(data.content), self.site)
+
+        encoding = self._measure('decode', self._get_encoding, data)
+        album, metrics = executor.submit(parse_page, self.site, data.content, encoding, self.backend, self.partial,
+                                         self.metrics is not None).result()
+
+        if metrics is not None:
+            # Timings of tree_build, get_artist, get_track_list and track count measured in worker process.
+            metrics.send_to(self.metrics)
+
+        return album
+
+    def _serialize(self, album):
+        """Convert album data to JSON string."""
+        return self._measure('serialize', json.dumps, album.to_dict(), ensure_ascii=False)
+
+    async def _parse_album_async(self, album_url, executor=None):
+        """Parse album data from music information site asynchronously."""
+        content, encoding = await self._get_original_page_async(album_url)
+
+        if executor is None:
+            return self._parse_page(content, encoding)
+
+        # Parse with picklable function and values, so executor can be a process pool.
+        import asyncio
+        loop = asyncio.get_running_loop()
+        album, metrics = await loop.run_in_executor(executor, parse_page, self.site, content, encoding,
+                                                    self.backend, self.partial, self.metrics is not None)
+
+        if metrics is not None:
+            metrics.send_to(self.metrics)
+
+        return album
+
+    def _forget_page(self, album_url):
+        """Remove page from response cache of transport, so a page which isn't an album page is fetched again."""
+        cache = getattr(self._get_transport(), 'cache', None)
+        if cache is not None:
+            cache.delete(album_url)
+
+    def _get_cache_key(self, album_url):
+        """Get key for album cache. Return None if album cache is not used."""
+        if self.album_cache is None:
+            return None
+
+        return self.get_album_key(album_url)
+
+    def _get_album(self, album_url, executor=None):
+        """
+        Get album data from album cache, or parse it from music information site.
+
+        If executor (ProcessPoolExecutor) is given, page is parsed in it.
+        """
+        if executor is None:
+            parse = self._parse_album
+        else:
+            def parse(url):
+                return self._parse_album_in_process(url, executor)
+
+        key = self._get_cache_key(album_url)
+        album = self.album_cache.get(key) if key is not None else None
+        if album is None:
+            try:
+                album = parse(album_url)
+            except ParseError:
+                self._forget_page(album_url)
+                raise
+
+            if key is not None:
+                self.album_cache.set(key, album)
+
+        return album
+
+    async def _get_album_async(self, album_url, executor=None):
+        """Get album data from album cache, or parse it from music information site asynchronously."""
+        key = self._get_cache_key(album_url)
+        album = self.album_cache.get(key) if key is not None else None
+        if album is None:
+            try:
+                album = await self._parse_album_async(album_url, executor)
+            except ParseError:
+                self._forget_page(album_url)
+                raise
+
+            if key is not None:
+                self.album_cache.set(key, album)
+
+        return album
 
 
 # class NaverMusicParser(MusicParser):
@@ -180,6 +557,23 @@ class MusicParser(object):
 class BugsParser(MusicParser):
     """ Parsing album information from Bugs. """
 
+    site = 'bugs'
+    encoding = 'utf-8'
+    album_regions = (('header', 'pgTitle'), ('table', 'info'), ('div', 'photos'), ('table', 'trackList'))
+    track_container = ('table', 'trackList')
+    # Tags read from each row of track table.
+    row_selectors = (
+        selector('disk', 'th', attr=('scope', 'colgroup')),
+        selector('index', 'p', 'trackIndex'),
+        selector('index_em', 'em', within='index'),
+        selector('title', 'p', 'title'),
+        selector('title_a', 'a', within='title'),
+        selector('title_span', 'span', within='title'),
+        selector('artist', 'p', 'artist'),
+        selector('artist_more', 'a', 'more', within='artist'),
+        selector('artist_a', 'a', within='artist'),
+    )
+
     def _get_artist(self, artist_data):
         """Get artist information"""
         if artist_data.find('a'):
@@ -193,21 +587,21 @@ class BugsParser(MusicParser):
 
         return artist
 
-    def _get_track(self, track_data, disk_num):
-        """Get single track information from tag."""
-        track = dict()
+    def _scan_row(self, row):
+        """Find tags of a row of track table in one traversal."""
+        return scan(row, self.row_selectors)
 
-        track['disk'] = disk_num
-        track['track_num'] = int(track_data.find('p', class_='trackIndex').em.text)
-        track_title_data = track_data.find('p', class_='title')
+    @staticmethod
+    def _make_track(tags, disk_num):
+        """Make track from tags found in a row."""
+        track_num = int(tags['index_em'].text)
 
-        if track_title_data.find('a'):
-            track['track_title'] = track_title_data.a.text.strip()
+        if tags['title_a']:
+            track_title = tags['title_a'].text.strip()
         else:
-            track['track_title'] = track_title_data.span.text.strip()
+            track_title = tags['title_span'].text.strip()
 
-        track_artist_tag = track_data.find('p', class_='artist')
-        track_artists = track_artist_tag.find('a', class_='more')
+        track_artists = tags['artist_more']
 
         if track_artists:
             onclick_text = track_artists['onclick'].split(",")[1].split("||")
@@ -218,61 +612,105 @@ class BugsParser(MusicParser):
                 else:
                     artist_list.append(onclick_text[i])
 
-            track['track_artist'] = ", ".join(artist_list).strip()
+            track_artist = ", ".join(artist_list).strip()
         else:
-            track['track_artist'] = track_artist_tag.a.text.strip()
+            track_artist = tags['artist_a'].text.strip()
+
+        return Track(disk_num, track_num, track_title, track_artist)
 
-        return track
+    def _get_track(self, track_data, disk_num):
+        """Get single track information from tag."""
+        return self._make_track(self._scan_row(track_data), disk_num)
 
     def _get_track_list(self, track_row_list):
-        """Get track list from 'tr' tags."""
+        """Get track list from 'tr' tags. (Each row is walked once)"""
         disk_num = 1    # Set default disk number.
 
         tracks = []
 
         for row in track_row_list:
-            if row.find('th', attrs={'scope': 'colgroup'}):
+            tags = self._scan_row(row)
+            if tags['disk']:
                 # Get disk number
-                disk = row.find('th', attrs={'scope': 'colgroup'})
-                disk_num = int(disk.text.split(' ')[1])
+                disk_num = int(tags['disk'].text.split(' ')[1])
             else:
-                tracks.append(self._get_track(row, disk_num))
+                tracks.append(self._make_track(tags, disk_num))
 
         return tracks
 
-    def _parse_album(self, album_url):
-        """Parse album data from music information site."""
-        soup = self._get_original_data(album_url)
+    def _iter_track_list(self, rows):
+        """Get tracks from (table index, row index in table, 'tr' tag) of streamed track table."""
+        disk_num = 1
 
+        for _, row_index, row in rows:
+            if row_index == 0:
+                # Header of table.
+                continue
+
+            tags = self._scan_row(row)
+            if tags['disk']:
+                disk_num = int(tags['disk'].text.split(' ')[1])
+            else:
+                yield self._make_track(tags, disk_num)
+
+    def _parse_soup(self, soup):
+        """Parse album data from a page of music information site."""
         # Get artist information.
-        album_data = dict()
-        album_data['artist'] = self._get_artist(soup.find('table', class_='info').tr)
-        album_data['album_title'] = soup.find('header', class_='pgTitle').h1.text
-        album_data['album_cover'] = soup.find('div', class_='photos').img['src']
+        artist = self._measure('get_artist', self._get_artist, soup.find('table', class_='info').tr)
+        album_title = soup.find('header', class_='pgTitle').h1.text
+        album_cover = soup.find('div', class_='photos').img['src']
 
         # For supporting multiple disks (And try to parse except first row)
         table_row_list = soup.find('table', class_='trackList').find_all('tr')[1:]
-        album_data['tracks'] = self._get_track_list(table_row_list)
+        tracks = self._measure('get_track_list', self._get_track_list, table_row_list)
 
-        return album_data
+        return Album(artist, album_title, album_cover, tracks)
+
+    def to_album(self, input_url):
+        """Get parsed data and return Album record."""
+        match = router.SITE_PATTERNS['bugs'].search(input_url)
+        if match:
+            return self._get_album(input_url)
+        else:
+            raise InvalidURLError
+
+    def iter_tracks(self, input_url):
+        """Parse tracks while the page is downloaded and yield each track as Track record."""
+        match = router.SITE_PATTERNS['bugs'].search(input_url)
+        if match:
+            return self._iter_track_list(self._stream_track_rows(input_url))
+        else:
+            raise InvalidURLError
 
     def to_dict(self, input_url):
         """Get parsed data and return dict."""
-        pattern = re.compile("bugs[.]co[.]kr")
-
-        match = pattern.search(input_url)
+        match = router.SITE_PATTERNS['bugs'].search(input_url)
         if match:
-            return self._parse_album(input_url)
+            return self._get_album(input_url).to_dict()
         else:
             raise InvalidURLError
 
     def to_json(self, input_url):
         """Get parsed data and return JSON string."""
-        pattern = re.compile("bugs[.]co[.]kr")
+        match = router.SITE_PATTERNS['bugs'].search(input_url)
+        if match:
+            return self._serialize(self._get_album(input_url))
+        else:
+            raise InvalidURLError
 
-        match = pattern.search(input_url)
+    async def to_dict_async(self, input_url, executor=None):
+        """Get parsed data asynchronously and return dict."""
+        match = router.SITE_PATTERNS['bugs'].search(input_url)
         if match:
-            return json.dumps(self._parse_album(input_url), ensure_ascii=False)
+            return (await self._get_album_async(input_url, executor)).to_dict()
+        else:
+            raise InvalidURLError
+
+    async def to_json_async(self, input_url, executor=None):
+        """Get parsed data asynchronously and return JSON string."""
+        match = router.SITE_PATTERNS['bugs'].search(input_url)
+        if match:
+            return self._serialize(await self._get_album_async(input_url, executor))
         else:
             raise InvalidURLError
 
@@ -280,6 +718,21 @@ class BugsParser(MusicParser):
 class MelonParser(MusicParser):
     """ Parsing album information from Melon. """
 
+    site = 'melon'
+    encoding = 'utf-8'
+    album_regions = (('div', 'song_name'), ('div', 'artist'), ('div', 'thumb'), ('div', 'd_song_list'))
+    track_container = ('div', 'd_song_list')
+    # Tags read from each row of track table.
+    row_selectors = (
+        selector('rank', 'span', 'rank'),
+        selector('title', 'div', 'ellipsis'),
+        selector('title_a', 'a', within='title'),
+        selector('title_disabled', 'span', 'disabled', within='title'),
+        selector('artist', 'div', 'rank02'),
+        selector('artist_span', 'span', 'checkEllipsis', within='artist'),
+        selector('artist_a', 'a', within='artist_span', many=True),
+    )
+
     def _get_artist(self, artist_data):
         """Get artist information"""
         if artist_data.find('span'):
@@ -293,33 +746,35 @@ class MelonParser(MusicParser):
 
         return artist
 
+    def _scan_row(self, row):
+        """Find tags of a row of track table in one traversal."""
+        return scan(row, self.row_selectors)
+
     def _get_track(self, track_data, disk_num):
-        """Get single track information from tag."""
-        track = dict()
-        track['disk'] = disk_num
-        track['track_num'] = int(track_data.find('span', class_='rank').text)
-        track_title_data = track_data.find('div', class_='ellipsis')
-        check_track_info = track_title_data.find('a')
+        """Get single track information from tag. (The row is walked once)"""
+        tags = self._scan_row(track_data)
+        track_num = int(tags['rank'].text)
+        check_track_info = tags['title_a']
 
         if check_track_info:
             # Song you can play.
-            track['track_title'] = check_track_info.text.strip()
+            track_title = check_track_info.text.strip()
         else:
             # Song you can't play.
-            track['track_title'] = track_title_data.find('span', class_='disabled').text.strip()
+            track_title = tags['title_disabled'].text.strip()
 
         # Get track artist
-        track_artist_list = track_data.find('div', class_='rank02') \
-                                      .find('span', class_='checkEllipsis') \
-                                      .find_all('a')
+        if tags['artist_span'] is None:
+            raise AttributeError("Artists of track are not found.")
+        track_artist_list = tags['artist_a']
 
         if len(track_artist_list) == 1:
-            track['track_artist'] = track_artist_list[0].text.strip()
+            track_artist = track_artist_list[0].text.strip()
         else:
             # Support multiple artists for one song.
-            track['track_artist'] = ", ".join(item.text for item in track_artist_list).strip()
+            track_artist = ", ".join(item.text for item in track_artist_list).strip()
 
-        return track
+        return Track(disk_num, track_num, track_title, track_artist)
 
     def _get_track_list(self, track_row_list):
         """Get track list from 'tr' tags."""
@@ -338,37 +793,77 @@ class MelonParser(MusicParser):
 
         return tracks
 
-    def _parse_album(self, album_url):
-        """Parse album data from music information site."""
-        soup = self._get_original_data(album_url)
+    def _iter_track_list(self, rows):
+        """Get tracks from (table index, row index in table, 'tr' tag) of streamed track table."""
+        disk_num = 1
+
+        for _, row_index, row in rows:
+            if row_index == 0:
+                # Header of each table.
+                continue
+
+            if 'class' in row.attrs:
+                disk_num = int(row.find('strong').text[2:])
+                continue
+
+            yield self._get_track(row, disk_num)
 
-        album_data = dict()
-        album_data['artist'] = self._get_artist(soup.find('div', class_='artist'))
+    def _parse_soup(self, soup):
+        """Parse album data from a page of music information site."""
+        artist = self._measure('get_artist', self._get_artist, soup.find('div', class_='artist'))
         # Exclude strong and span tag when getting album title.
-        album_data['album_title'] = soup.find('div', class_='song_name').find_all(text=True)[-1].strip()
-        album_data['album_cover'] = soup.find('div', class_='thumb').find('img')['src']
-        album_data['tracks'] = self._get_track_list(soup.find('div', class_='d_song_list').
-                                                    find_all('table'))
+        album_title = soup.find('div', class_='song_name').find_all(text=True)[-1].strip()
+        album_cover = soup.find('div', class_='thumb').find('img')['src']
+        tracks = self._measure('get_track_list', self._get_track_list,
+                               soup.find('div', class_='d_song_list').find_all('table'))
+
+        return Album(artist, album_title, album_cover, tracks)
+
+    def to_album(self, input_url):
+        """Get parsed data and return Album record."""
+        match = router.SITE_PATTERNS['melon'].search(input_url)
+        if match:
+            return self._get_album(input_url)
+        else:
+            raise InvalidURLError
 
-        return album_data
+    def iter_tracks(self, input_url):
+        """Parse tracks while the page is downloaded and yield each track as Track record."""
+        match = router.SITE_PATTERNS['melon'].search(input_url)
+        if match:
+            return self._iter_track_list(self._stream_track_rows(input_url))
+        else:
+            raise InvalidURLError
 
     def to_dict(self, input_url):
         """Get parsed data and return dict."""
-        pattern = re.compile("melon[.]com")
-
-        match = pattern.search(input_url)
+        match = router.SITE_PATTERNS['melon'].search(input_url)
         if match:
-            return self._parse_album(input_url)
+            return self._get_album(input_url).to_dict()
         else:
             raise InvalidURLError
 
     def to_json(self, input_url):
         """Get parsed data and return JSON string."""
-        pattern = re.compile("melon[.]com")
+        match = router.SITE_PATTERNS['melon'].search(input_url)
+        if match:
+            return self._serialize(self._get_album(input_url))
+        else:
+            raise InvalidURLError
+
+    async def to_dict_async(self, input_url, executor=None):
+        """Get parsed data asynchronously and return dict."""
+        match = router.SITE_PATTERNS['melon'].search(input_url)
+        if match:
+            return (await self._get_album_async(input_url, executor)).to_dict()
+        else:
+            raise InvalidURLError
 
-        match = pattern.search(input_url)
+    async def to_json_async(self, input_url, executor=None):
+        """Get parsed data asynchronously and return JSON string."""
+        match = router.SITE_PATTERNS['melon'].search(input_url)
         if match:
-            return json.dumps(self._parse_album(input_url), ensure_ascii=False)
+            return self._serialize(await self._get_album_async(input_url, executor))
         else:
             raise InvalidURLError
 
@@ -376,6 +871,10 @@ class MelonParser(MusicParser):
 class AllMusicParser(MusicParser):
     """ Parsing album information from AllMusic. """
 
+    site = 'allmusic'
+    encoding = 'utf-8'
+    album_regions = (('div', 'sidebar'), ('div', 'content'))
+
     def _get_artist(self, artist_data):
         """Get artist information"""
         if artist_data.find('a'):
@@ -391,18 +890,16 @@ class AllMusicParser(MusicParser):
 
     def _get_track(self, track_data, disk_num):
         """Get single track information from tag."""
-        track = dict()
-        track['disk'] = disk_num
-        track['track_num'] = track_data.find('td', class_='tracknum').text
-        track['track_title'] = track_data.find('div', class_='title').find('a').text
+        track_num = int(track_data.find('td', class_='tracknum').text)
+        track_title = track_data.find('div', class_='title').find('a').text
         track_artist_list = track_data.find('td', class_='performer').find_all('a')
 
         if len(track_artist_list) == 1:
-            track['track_artist'] = track_artist_list[0].text
+            track_artist = track_artist_list[0].text
         else:
-            track['track_artist'] = ", ".join(item.text for item in track_artist_list)
+            track_artist = ", ".join(item.text for item in track_artist_list)
 
-        return track
+        return Track(disk_num, track_num, track_title, track_artist)
 
     def _get_track_list(self, track_row_list):
         """Get track list from 'tr' tags."""
@@ -421,45 +918,112 @@ class AllMusicParser(MusicParser):
 
         return tracks
 
-    def _parse_album(self, album_url):
-        """Parse album data from music information site."""
-        soup = self._get_original_data(album_url)
-
-        album_data = dict()
-
+    def _parse_soup(self, soup):
+        """Parse album data from a page of music information site."""
         sidebar = soup.find('div', class_='sidebar')        # To get album cover.
         content = soup.find('div', class_='content')        # To get artist, album title, track lists.
 
-        album_data['artist'] = self._get_artist(content.find('h2', class_='album-artist'))
-        album_data['album_title'] = content.find('h1', class_='album-title').text.strip()
-        album_data['album_cover'] = sidebar.find('div', class_='album-contain').find(
+        artist = self._measure('get_artist', self._get_artist, content.find('h2', class_='album-artist'))
+        album_title = content.find('h1', class_='album-title').text.strip()
+        album_cover = sidebar.find('div', class_='album-contain').find(
             'img', class_='media-gallery-image'
         )['src']
-        album_data['tracks'] = self._get_track_list(content.find_all('div', class_='disc'))
+        tracks = self._measure('get_track_list', self._get_track_list,
+                               content.find_all('div', class_='disc'))
 
-        return album_data
+        return Album(artist, album_title, album_cover, tracks)
+
+    def to_album(self, input_url):
+        """Get parsed data and return Album record."""
+        match = router.SITE_PATTERNS['allmusic'].search(input_url)
+        if match:
+            return self._get_album(input_url)
+        else:
+            raise InvalidURLError
 
     def to_dict(self, input_url):
         """Get parsed data and return dict."""
-        pattern = re.compile("allmusic[.]com")
-
-        match = pattern.search(input_url)
+        match = router.SITE_PATTERNS['allmusic'].search(input_url)
         if match:
-            return self._parse_album(input_url)
+            return self._get_album(input_url).to_dict()
         else:
             raise InvalidURLError
 
     def to_json(self, input_url):
         """Get parsed data and return JSON string."""
-        pattern = re.compile("allmusic[.]com")
+        match = router.SITE_PATTERNS['allmusic'].search(input_url)
+        if match:
+            return self._serialize(self._get_album(input_url))
+        else:
+            raise InvalidURLError
+
+    async def to_dict_async(self, input_url, executor=None):
+        """Get parsed data asynchronously and return dict."""
+        match = router.SITE_PATTERNS['allmusic'].search(input_url)
+        if match:
+            return (await self._get_album_async(input_url, executor)).to_dict()
+        else:
+            raise InvalidURLError
 
-        match = pattern.search(input_url)
+    async def to_json_async(self, input_url, executor=None):
+        """Get parsed data asynchronously and return JSON string."""
+        match = router.SITE_PATTERNS['allmusic'].search(input_url)
         if match:
-            return json.dumps(self._parse_album(input_url), ensure_ascii=False)
+            return self._serialize(await self._get_album_async(input_url, executor))
         else:
             raise InvalidURLError
 
 
+PARSER_CLASSES = {
+    'bugs': BugsParser,
+    'melon': MelonParser,
+    'allmusic': AllMusicParser,
+}
+
+_site_parsers = {}
+
+
+def get_site_parser(site):
+    """Get parser for site with default settings. (Created once for each site)"""
+    parser = _site_parsers.get(site)
+    if parser is None:
+        parser = _site_parsers.setdefault(site, PARSER_CLASSES[site]())
+
+    return parser
+
+
+# Parsers in a worker process for each (site, backend, partial).
+_worker_parsers = {}
+
+
+def parse_page(site, content, encoding=None, backend=None, partial=True, measure=False):
+    """
+    Parse album data from page of site, and return (album, ListSink with metrics of parsing, or None).
+
+    This is called in worker processes, so only picklable values are passed and returned.
+    If measure is True, metrics are kept in ListSink to be sent to metrics sink of the caller.
+    """
+    if measure:
+        from .metrics import ListSink
+
+        # Parsers are shared in a worker process, so a parser with its own sink is made for each page.
+        metrics = ListSink()
+        parser = PARSER_CLASSES[site](backend=backend, partial=partial, metrics=metrics)
+        return parser._parse_page(content, encoding), metrics
+
+    key = (site, backend, partial)
+    parser = _worker_parsers.get(key)
+    if parser is None:
+        parser = _worker_parsers[key] = PARSER_CLASSES[site](backend=backend, partial=partial)
+
+    return parser._parse_page(content, encoding), None
+
+
 class InvalidURLError(Exception):
     """ If an user try to parse album information from sites not supported by MusicParser, raise this error. """
     pass
+
+
+class ParseError(Exception):
+    """ If a page doesn't have album information (e.g. an error page from sites), raise this error. """
+    pass
@@ -0,0 +1,92 @@
+"""
+Compact records of parsed albums.
+
+Records use __slots__ instead of a dict for each track, so many albums can be kept in memory.
+They can be converted to dicts of the same shape as before. (Strings are shared, not copied.)
+Records are immutable (tracks are a tuple, and attributes can't be set), because they are shared by caches.
+
+Author: Yungon Park
+"""
+
+
+def _read_only(self, name, value=None):
+    raise AttributeError("%s is read-only." % type(self).__name__)
+
+
+class Track(object):
+    """Track of an album."""
+
+    __slots__ = ('disk', 'track_num', 'track_title', 'track_artist')
+
+    def __init__(self, disk, track_num, track_title, track_artist):
+        object.__setattr__(self, 'disk', disk)
+        object.__setattr__(self, 'track_num', track_num)
+        object.__setattr__(self, 'track_title', track_title)
+        object.__setattr__(self, 'track_artist', track_artist)
+
+    __setattr__ = _read_only
+    __delattr__ = _read_only
+
+    def __reduce__(self):
+        return Track, (self.disk, self.track_num, self.track_title, self.track_artist)
+
+    def to_dict(self):
+        return {
+            'disk': self.disk,
+            'track_num': self.track_num,
+            'track_title': self.track_title,
+            'track_artist': self.track_artist,
+        }
+
+    @classmethod
+    def from_dict(cls, track):
+        return cls(track['disk'], int(track['track_num']), track['track_title'], track['track_artist'])
+
+    def __eq__(self, other):
+        if not isinstance(other, Track):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return "Track(disk=%r, track_num=%r, track_title=%r, track_artist=%r)" % (
+            self.disk, self.track_num, self.track_title, self.track_artist)
+
+
+class Album(object):
+    """Album with its tracks."""
+
+    __slots__ = ('artist', 'album_title', 'album_cover', 'tracks')
+
+    def __init__(self, artist, album_title, album_cover, tracks):
+        object.__setattr__(self, 'artist', artist)
+        object.__setattr__(self, 'album_title', album_title)
+        object.__setattr__(self, 'album_cover', album_cover)
+        object.__setattr__(self, 'tracks', tuple(tracks))
+
+    __setattr__ = _read_only
+    __delattr__ = _read_only
+
+    def __reduce__(self):
+        return Album, (self.artist, self.album_title, self.album_cover, self.tracks)
+
+    def to_dict(self):
+        return {
+            'artist': self.artist,
+            'album_title': self.album_title,
+            'album_cover': self.album_cover,
+            'tracks': [track.to_dict() for track in self.tracks],
+        }
+
+    @classmethod
+    def from_dict(cls, album):
+        return cls(album['artist'], album['album_title'], album['album_cover'],
+                   [Track.from_dict(track) for track in album['tracks']])
+
+    def __eq__(self, other):
+        if not isinstance(other, Album):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return "Album(artist=%r, album_title=%r, album_cover=%r, tracks=<%d tracks>)" % (
+            self.artist, self.album_title, self.album_cover, len(self.tracks))
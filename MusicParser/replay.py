@@ -0,0 +1,288 @@
+"""
+Recording album pages and replaying them without music sites.
+
+RecordingTransport saves pages fetched by parsers to PageStore, keyed by normalized album URL.
+ReplayTransport serves them from the store, and ReplayServer serves them over HTTP with latency,
+errors and limited bandwidth, so batch and async paths can be load-tested offline.
+
+    python -m MusicParser.replay pages.sqlite3 --port 8000 --latency 0.05 --error-rate 0.01
+
+Pages are requested from the server as http://127.0.0.1:8000/<host>/<path>. (See LocalTransport and
+LocalAsyncTransport)
+
+Author: Yungon Park
+"""
+import argparse
+import collections
+import random
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from . import router
+
+StoredPage = collections.namedtuple('StoredPage', ['url', 'content', 'content_type'])
+
+CHUNK_SIZE = 16 * 1024
+
+
+def canonical_url(url):
+    """Get normalized album URL, or URL itself if it is not an album URL."""
+    route = router.route(url)
+    return route.url if route is not None else url
+
+
+def rewrite_url(server_url, url):
+    """Get URL of ReplayServer for URL. (https://www.melon.com/album/... -> <server_url>/www.melon.com/album/...)"""
+    parts = urlsplit(url)
+    return "%s/%s%s%s" % (server_url.rstrip('/'), parts.netloc, parts.path or '/',
+                          '?' + parts.query if parts.query else '')
+
+
+class PageStore(object):
+    """Recorded pages stored in a SQLite file. Pages are compressed, and kept until removed."""
+
+    def __init__(self, path):
+        self.path = path
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "url TEXT PRIMARY KEY, content BLOB, content_type TEXT, stored_at REAL)"
+            )
+
+    def get(self, url):
+        """Get recorded page for URL. Return None if it doesn't exist."""
+        url = canonical_url(url)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT content, content_type FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return StoredPage(url, zlib.decompress(row[0]), row[1])
+
+    def set(self, url, content, content_type=None):
+        """Store page for URL."""
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)",
+                                     (canonical_url(url), zlib.compress(content), content_type, time.time()))
+
+    def urls(self):
+        """Get URLs of recorded pages."""
+        with self._lock:
+            return [row[0] for row in self._connection.execute("SELECT url FROM pages ORDER BY url")]
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class RecordingTransport(object):
+    """
+    Transport saving pages to store while getting them with transport. (Default transport if None)
+
+    Streamed responses are read to the end to be saved.
+    """
+
+    def __init__(self, store, transport=None):
+        self.store = store
+        self.transport = transport
+
+    def _get_transport(self):
+        from .transport import resolve_transport
+        return resolve_transport(self.transport)
+
+    def get(self, url, headers=None, stream=False):
+        response = self._get_transport().get(url, headers=headers, stream=stream)
+        self.store.set(url, response.content, response.headers.get('Content-Type'))
+
+        return response
+
+
+class ReplayTransport(object):
+    """Transport serving recorded pages. Raise HTTPError (404) for pages not in store."""
+
+    def __init__(self, store):
+        self.store = store
+
+    def get(self, url, headers=None, stream=False):
+        from .transport import make_response
+
+        page = self.store.get(url)
+        if page is None:
+            response = make_response(url, b'Not Found', status_code=404)
+            response.raise_for_status()
+
+        return make_response(url, page.content, headers={'Content-Type': page.content_type})
+
+
+class LocalTransport(object):
+    """Transport sending requests for music sites to ReplayServer at server_url instead."""
+
+    def __init__(self, server_url, transport=None):
+        self.server_url = server_url
+        self.transport = transport
+
+    def _get_transport(self):
+        from .transport import resolve_transport
+        return resolve_transport(self.transport)
+
+    def get(self, url, headers=None, stream=False):
+        return self._get_transport().get(rewrite_url(self.server_url, url), headers=headers, stream=stream)
+
+
+class LocalAsyncTransport(object):
+    """Async transport sending requests for music sites to ReplayServer at server_url with async_transport."""
+
+    def __init__(self, server_url, async_transport):
+        self.server_url = server_url
+        self.async_transport = async_transport
+
+    async def get_text(self, url):
+        return await self.async_transport.get_text(rewrite_url(self.server_url, url))
+
+    async def get_content(self, url):
+        return await self.async_transport.get_content(rewrite_url(self.server_url, url))
+
+    async def close(self):
+        await self.async_transport.close()
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        # Path is '/<host>/<path>'.
+        url = 'https://' + self.path.lstrip('/')
+
+        if server.latency or server.jitter:
+            time.sleep(server.latency + server.random_uniform(0, server.jitter))
+
+        page = server.store.get(url)
+        if server.random_uniform(0, 1) < server.error_rate:
+            status, body, content_type = 503, b'Service Unavailable', 'text/plain'
+        elif page is None:
+            status, body, content_type = 404, b'Not Found', 'text/plain'
+        else:
+            status, body, content_type = 200, page.content, page.content_type
+        server.count(status, len(body))
+
+        self.send_response(status)
+        if content_type:
+            self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+
+        if not server.bandwidth:
+            self.wfile.write(body)
+            return
+
+        for start in range(0, len(body), CHUNK_SIZE):
+            chunk = body[start:start + CHUNK_SIZE]
+            # Wait for the time to send the chunk, then send it.
+            time.sleep(len(chunk) / float(server.bandwidth))
+            self.wfile.write(chunk)
+
+    def log_message(self, *args):
+        pass
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """
+    Local HTTP server replaying recorded pages.
+
+    Each response waits latency seconds (plus up to jitter seconds), error_rate of requests get 503,
+    and bodies are sent at bandwidth bytes per second for each connection. (Unlimited if None)
+    Use it with 'with' to serve in a background thread.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, store, host='127.0.0.1', port=0, latency=0, jitter=0, error_rate=0, bandwidth=None,
+                 seed=None):
+        super().__init__((host, port), _ReplayHandler)
+        self.store = store
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.bandwidth = bandwidth
+        self.url = 'http://%s:%d' % (host, self.server_address[1])
+
+        self.requests = 0
+        self.errors = 0
+        self.bytes_sent = 0
+
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._thread = None
+
+    def random_uniform(self, low, high):
+        with self._lock:
+            return self._random.uniform(low, high)
+
+    def count(self, status, size):
+        with self._lock:
+            self.requests += 1
+            if status >= 500:
+                self.errors += 1
+            self.bytes_sent += size
+
+    def start(self):
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+def main(argv=None):
+    """Serve recorded pages until interrupted."""
+    arg_parser = argparse.ArgumentParser(prog='python -m MusicParser.replay',
+                                         description="Serve recorded album pages over HTTP.")
+    arg_parser.add_argument('store', help="SQLite file of recorded pages.")
+    arg_parser.add_argument('--host', default='127.0.0.1', help="Address to listen.")
+    arg_parser.add_argument('--port', type=int, default=8000, help="Port to listen.")
+    arg_parser.add_argument('--latency', type=float, default=0, help="Seconds before each response.")
+    arg_parser.add_argument('--jitter', type=float, default=0, help="Random seconds added to latency.")
+    arg_parser.add_argument('--error-rate', type=float, default=0, help="Fraction of requests answered with 503.")
+    arg_parser.add_argument('--bandwidth', type=int, help="Bytes per second for each connection.")
+    args = arg_parser.parse_args(argv)
+
+    store = PageStore(args.store)
+    server = ReplayServer(store, args.host, args.port, args.latency, args.jitter, args.error_rate, args.bandwidth)
+    sys.stderr.write("Serving %d pages at %s\n" % (len(store), server.url))
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Routing URLs to music information sites.
+
+All patterns are compiled once. A URL is dispatched by its hostname first,
+so only the pattern of that site runs.
+
+Author: Yungon Park
+"""
+import collections
+import functools
+import re
+
+Route = collections.namedtuple('Route', ['site', 'album_id', 'url'])
+
+# Site: (album URL pattern with album ID as group 1, prefix of normalized URL)
+ALBUM_PATTERNS = collections.OrderedDict([
+    ('bugs', (re.compile("bugs[.]co[.]kr/album/([0-9]{1,8})"), "https://music.")),
+    # ('naver', (re.compile("music[.]naver[.]com/album/index.nhn[?]albumId=([0-9]{1,8})"), "https://")),
+    ('melon', (re.compile("melon[.]com/album/detail[.]htm[?]albumId=([0-9]{1,8})"), "https://www.")),
+    ('allmusic', (re.compile("allmusic[.]com/album/.*(mw[0-9]{10})"), "https://www.")),
+])
+
+# Patterns to check if URL is for a site. (Used by site parsers)
+SITE_PATTERNS = {
+    'bugs': re.compile("bugs[.]co[.]kr"),
+    'melon': re.compile("melon[.]com"),
+    'allmusic': re.compile("allmusic[.]com"),
+}
+
+HOST_SITES = {
+    'bugs.co.kr': 'bugs',
+    'melon.com': 'melon',
+    'allmusic.com': 'allmusic',
+}
+
+# Hostname of URL with scheme. (Faster than urllib.parse.urlsplit)
+HOST_PATTERN = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.-]*://(?:[^/?#@]*@)?([^/?#:]+)")
+
+ALBUM_COVER_PATTERNS = [
+    # re.compile('http://musicmeta[.]phinf[.]naver[.]net/album/.*[.]jpg[?].*'),
+    re.compile('https?://cdnimg[.]melon[.]co[.]kr/cm/album/images/.*[.]jpg'),
+    re.compile('https://image[.]bugsm[.]co[.]kr/album/images/.*[.]jpg'),
+    re.compile('https://cps-static[.]rovicorp[.]com/.*[.]jpg.*'),
+]
+
+
+@functools.lru_cache(maxsize=1024)
+def _get_site_by_hostname(host):
+    # Try 'music.bugs.co.kr', 'bugs.co.kr', 'co.kr', ...
+    labels = host.lower().split('.')
+    for i in range(len(labels) - 1):
+        site = HOST_SITES.get('.'.join(labels[i:]))
+        if site is not None:
+            return site
+
+    return None
+
+
+def get_site_by_host(url_input):
+    """Get site from hostname of URL. Return None if it is not a known site."""
+    match = HOST_PATTERN.match(url_input)
+    if match is None:
+        return None
+
+    return _get_site_by_hostname(match.group(1))
+
+
+def _match(site, url_input):
+    pattern, prefix = ALBUM_PATTERNS[site]
+
+    match = pattern.search(url_input)
+    if match:
+        return Route(site, match.group(1), prefix + match.group())
+
+    return None
+
+
+def route(url_input):
+    """Get Route(site, album ID, normalized URL) for URL. Return None if URL is not valid."""
+    site = get_site_by_host(url_input)
+    if site is not None:
+        return _match(site, url_input)
+
+    # URL without scheme or from other hosts. (e.g. 'bugs.co.kr/album/450734')
+    for site in ALBUM_PATTERNS:
+        result = _match(site, url_input)
+        if result is not None:
+            return result
+
+    return None
+
+
+def classify_many(url_inputs):
+    """Get Route (or None if not valid) for each URL."""
+    return [route(url_input) for url_input in url_inputs]
+
+
+def is_album_cover(original_url):
+    """Check if URL is an album cover image of music sites."""
+    return any(pattern.search(original_url) for pattern in ALBUM_COVER_PATTERNS)
@@ -0,0 +1,205 @@
+"""
+Scheduling requests to music sites.
+
+For each host, a scheduler limits the rate of requests (token bucket) and the number of requests
+in flight. The concurrency limit is adaptive: it is halved when the site throttles (429), fails (5xx)
+or gets slower, and grows back slowly while the site is healthy.
+
+Waiting requests are served by priority. Batch APIs send requests with BULK priority,
+so single album requests (INTERACTIVE) don't wait behind a long batch.
+
+Author: Yungon Park
+"""
+import contextlib
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from urllib.parse import urlsplit
+
+INTERACTIVE = 0
+BULK = 10
+
+_priority = contextvars.ContextVar('priority', default=INTERACTIVE)
+
+
+@contextlib.contextmanager
+def priority(level):
+    """Send requests in this context with priority level. (Lower is served first)"""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def get_priority():
+    """Get priority level of requests in current context."""
+    return _priority.get()
+
+
+class TokenBucket(object):
+    """Token bucket allowing rate requests per second on average and burst requests at once. (Not thread safe)"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1, rate)
+        self.tokens = self.burst
+        self._updated_at = time.monotonic()
+
+    def try_acquire(self):
+        """Take a token. Return 0 if it was taken, or seconds to wait for the next token."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+
+        return (1 - self.tokens) / self.rate
+
+
+class HostScheduler(object):
+    """Rate limit and adaptive concurrency limit of a host. (Thread safe)"""
+
+    def __init__(self, rate=None, burst=None, concurrency=4, min_concurrency=1, max_concurrency=16,
+                 latency_factor=2.0, cooldown=1.0):
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.limit = float(concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.latency_factor = latency_factor
+        self.cooldown = cooldown
+
+        self.in_flight = 0
+        # Moving average of latency, and the latency when the site was healthy.
+        self.latency = None
+        self.baseline = None
+
+        self._paused_until = 0
+        self._decreased_at = 0
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def acquire(self, level=INTERACTIVE):
+        """Wait until a request with priority level can be sent."""
+        entry = (level, next(self._sequence))
+
+        with self._condition:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    timeout = None
+                    if self._waiters[0] == entry and self.in_flight < int(self.limit):
+                        timeout = self._paused_until - time.monotonic()
+                        if timeout <= 0 and self.bucket is not None:
+                            timeout = self.bucket.try_acquire()
+                        if timeout <= 0:
+                            break
+                    self._condition.wait(timeout)
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+
+            self.in_flight += 1
+            # Next waiter may be able to send a request too.
+            self._condition.notify_all()
+
+    def release(self, status=None, latency=None, retry_after=None):
+        """
+        Finish a request and adjust concurrency limit.
+
+        status is None if request failed without response.
+        """
+        with self._condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+
+            if status is None or status == 429 or status >= 500:
+                self._decrease(now)
+            elif latency is not None:
+                self.latency = latency if self.latency is None else self.latency * 0.8 + latency * 0.2
+                if self.baseline is None or self.latency < self.baseline:
+                    self.baseline = self.latency
+                else:
+                    # Follow slowly, so a site which became slower for good is the new normal.
+                    self.baseline = self.baseline * 0.99 + self.latency * 0.01
+
+                if self.latency > self.baseline * self.latency_factor:
+                    self._decrease(now)
+                else:
+                    self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+
+            self._condition.notify_all()
+
+    def _decrease(self, now):
+        """Halve concurrency limit. (Once in cooldown, for failures of requests sent at the same time)"""
+        if now - self._decreased_at < self.cooldown:
+            return
+
+        self.limit = max(self.min_concurrency, self.limit / 2)
+        self._decreased_at = now
+
+
+def _get_retry_after(response):
+    try:
+        return float(response.headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+
+class Scheduler(object):
+    """
+    Scheduler of requests for each host.
+
+    rate (requests per second) and burst apply to every host, unless host_rates has {host: (rate, burst)}.
+    Other arguments are for HostScheduler.
+    """
+
+    def __init__(self, rate=None, burst=None, host_rates=None, **kwargs):
+        self.rate = rate
+        self.burst = burst
+        self.host_rates = host_rates or {}
+        self._kwargs = kwargs
+
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def get_host(self, host):
+        """Get HostScheduler for host."""
+        with self._lock:
+            scheduler = self._hosts.get(host)
+            if scheduler is None:
+                rate, burst = self.host_rates.get(host, (self.rate, self.burst))
+                scheduler = self._hosts[host] = HostScheduler(rate, burst, **self._kwargs)
+
+        return scheduler
+
+    def call(self, url, send):
+        """Call send() to request URL when the host allows it, and return the response."""
+        scheduler = self.get_host(urlsplit(url).hostname)
+        scheduler.acquire(get_priority())
+
+        start = time.perf_counter()
+        try:
+            response = send()
+        except Exception:
+            scheduler.release(None, time.perf_counter() - start)
+            raise
+
+        scheduler.release(response.status_code, time.perf_counter() - start, _get_retry_after(response))
+        return response
+
+    def stats(self):
+        """Return {host: {'limit', 'in_flight', 'latency'}}."""
+        with self._lock:
+            hosts = dict(self._hosts)
+
+        return {host: {'limit': scheduler.limit, 'in_flight': scheduler.in_flight, 'latency': scheduler.latency}
+                for host, scheduler in hosts.items()}
@@ -0,0 +1,172 @@
+"""
+Finding album URLs from artist and album title.
+
+Search result pages of Bugs, Melon and AllMusic are requested, and album links in them are found
+with the router without building trees. Results are cached for each (site, query).
+
+Author: Yungon Park
+"""
+import collections
+import re
+from urllib.parse import quote, quote_plus, urljoin, urlsplit
+
+from . import router
+from .cache import AlbumCache, TTLCache
+from .merge import artist_keys, normalize
+from .parser import InvalidURLError, MusicParser, ParseError, get_site_parser
+
+SEARCH_URLS = {
+    'bugs': lambda query: "https://music.bugs.co.kr/search/album?q=" + quote_plus(query),
+    'melon': lambda query: "https://www.melon.com/search/album/index.htm?q=" + quote_plus(query),
+    'allmusic': lambda query: "https://www.allmusic.com/search/albums/" + quote(query, safe=''),
+}
+
+HREF_PATTERN = re.compile(r"""href\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+# Melon links albums with script. (e.g. javascript:melon.link.goAlbumDetail('2281828'))
+MELON_ALBUM_PATTERN = re.compile(r"goAlbumDetail\(\s*'([0-9]{1,8})'\s*\)")
+MELON_ALBUM_URL = "https://www.melon.com/album/detail.htm?albumId=%s"
+
+Match = collections.namedtuple('Match', ['query', 'url', 'album'])
+
+_SPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_query(artist, title):
+    """Make search query from artist and title."""
+    return _SPACE_PATTERN.sub(' ', "%s %s" % (artist or '', title or '')).strip().lower()
+
+
+def find_album_urls(site, search_url, text):
+    """Find album URLs of site in search result page, in the order of the page."""
+    # (Position in page, URL) of album links.
+    urls = []
+
+    for match in HREF_PATTERN.finditer(text):
+        route = router.route(urljoin(search_url, match.group(1)))
+        if route is not None and route.site == site:
+            urls.append((match.start(), route.url))
+
+    if site == 'melon':
+        urls.extend((match.start(), MELON_ALBUM_URL % match.group(1)) for match in MELON_ALBUM_PATTERN.finditer(text))
+
+    urls.sort()
+    # Remove duplicates, keeping the first one.
+    return list(collections.OrderedDict.fromkeys(url for _, url in urls))
+
+
+def is_match(artist, title, album):
+    """Check if album (Album record) is the album of artist and title. (Normalized with merge.normalize)"""
+    if normalize(album.album_title) != normalize(title):
+        return False
+
+    # Artist is checked only if it is given. Any name of artists (including names in parentheses) can match.
+    return not artist_keys(artist) or bool(artist_keys(artist) & artist_keys(album.artist))
+
+
+class AlbumResolver(object):
+    """
+    Resolve (artist, title) queries to album URLs.
+
+    Sites are searched in order, and candidate albums are parsed until one matches the query. (See is_match)
+    Search results are cached for ttl seconds, and least recently used ones are removed if more than
+    max_size results are cached. Albums are parsed with parser. (A parser with AlbumCache if None)
+    """
+
+    def __init__(self, transport=None, sites=('melon', 'bugs', 'allmusic'), max_size=10000, ttl=24 * 60 * 60,
+                 max_candidates=5, parser=None):
+        self.transport = transport
+        self.sites = sites
+        self.max_candidates = max_candidates
+        self.cache = TTLCache(max_size=max_size, ttl=ttl)
+        # Candidates parsed for checking are kept, so parsing a matched album doesn't fetch it again.
+        self.parser = parser or MusicParser(transport=transport, album_cache=AlbumCache(max_size=max_size, ttl=ttl))
+
+    def _get_transport(self):
+        from .transport import resolve_transport
+        return resolve_transport(self.transport)
+
+    def search(self, site, artist, title, limiter=None):
+        """Get candidate album URLs of site for artist and title. (limiter is HostLimiter for requests)"""
+        query = normalize_query(artist, title)
+        key = (site, query)
+
+        urls = self.cache.get(key)
+        if urls is None:
+            search_url = SEARCH_URLS[site](query)
+            if limiter is None:
+                response = self._get_transport().get(search_url)
+            else:
+                with limiter.slot(urlsplit(search_url).hostname):
+                    response = self._get_transport().get(search_url)
+
+            # Decode with charset of response or encoding of the site, without requests guessing it.
+            text = response.content.decode(get_site_parser(site)._get_encoding(response), 'replace')
+            urls = tuple(find_album_urls(site, search_url, text)[:self.max_candidates])
+            self.cache.set(key, urls)
+
+        return list(urls)
+
+    def find(self, artist, title, limiter=None):
+        """Get Match(query, url, album) of the first candidate matching artist and title. Return None if not found."""
+        import requests
+
+        for site in self.sites:
+            for url in self.search(site, artist, title, limiter):
+                try:
+                    if limiter is None:
+                        album = self.parser.to_album(url)
+                    else:
+                        with limiter.slot(urlsplit(url).hostname):
+                            album = self.parser.to_album(url)
+                except (InvalidURLError, ParseError, requests.RequestException):
+                    # Removed album (404) or a failed request doesn't stop trying next candidates.
+                    continue
+
+                if is_match(artist, title, album):
+                    return Match((artist, title), url, album)
+
+        return None
+
+    def resolve(self, artist, title, limiter=None):
+        """Get URL of the first album matching artist and title. Return None if not found in any site."""
+        match = self.find(artist, title, limiter)
+        return match.url if match is not None else None
+
+    def resolve_many(self, queries, max_workers=8, per_host=4, ordered=True):
+        """
+        Resolve many (artist, title) queries concurrently.
+
+        Yield BatchResult for each query. Its result is album URL, or None if not found.
+        """
+        from .batch import HostLimiter, run_batch
+        from .scheduler import BULK, priority
+
+        limiter = HostLimiter(per_host)
+
+        def work(query):
+            with priority(BULK):
+                return self.resolve(*query, limiter=limiter)
+
+        return run_batch(work, queries, max_workers=max_workers, ordered=ordered)
+
+    def parse_many(self, queries, max_workers=8, per_host=4, ordered=True):
+        """
+        Resolve many (artist, title) queries and parse albums concurrently.
+
+        Yield BatchResult for each query. Its result is Match(query, url, album). If not found,
+        its error is InvalidURLError.
+        """
+        from .batch import HostLimiter, run_batch
+        from .scheduler import BULK, priority
+
+        limiter = HostLimiter(per_host)
+
+        def work(query):
+            with priority(BULK):
+                match = self.find(*query, limiter=limiter)
+
+            if match is None:
+                raise InvalidURLError("Album is not found: %s - %s" % tuple(query))
+            return match
+
+        return run_batch(work, queries, max_workers=max_workers, ordered=ordered)
@@ -0,0 +1,132 @@
+"""
+Reading rows of track table while a page is downloaded.
+
+The page is fed to an incremental HTML tokenizer chunk by chunk. Rows ('tr') in the first tag
+containing the track table are yielded as HTML as soon as they are closed, so the whole page is
+never kept in memory, and download stops when the track table ends.
+
+Author: Yungon Park
+"""
+import codecs
+from html.parser import HTMLParser
+
+CHUNK_SIZE = 16 * 1024
+
+
+def iter_text(response, chunk_size=CHUNK_SIZE, encoding=None):
+    """Decode body of streamed response chunk by chunk. (In encoding of response if encoding is None)"""
+    decoder = codecs.getincrementaldecoder(encoding or response.encoding or 'utf-8')(errors='replace')
+
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+
+    text = decoder.decode(b'', final=True)
+    if text:
+        yield text
+
+
+class TrackRowReader(HTMLParser):
+    """
+    HTML tokenizer collecting rows in container, given as (tag name, class).
+
+    Collected rows are in rows as (table index, row index in table, HTML of row).
+    """
+
+    def __init__(self, container):
+        super().__init__(convert_charrefs=False)
+        self.container_tag, self.container_class = container
+        self.rows = []
+        self.finished = False
+
+        # Depth of container tag in container. (0 if not in container)
+        self._depth = 0
+        self._table_index = -1
+        self._row_index = -1
+        # Depth of 'tr' and HTML of the current row.
+        self._row_depth = 0
+        self._row = []
+
+    def _is_container(self, tag, attrs):
+        if tag != self.container_tag or self._depth or self.finished:
+            return False
+
+        classes = dict(attrs).get('class') or ''
+        return self.container_class in classes.split()
+
+    def handle_starttag(self, tag, attrs):
+        if self._is_container(tag, attrs):
+            self._depth = 1
+        elif self._depth == 0:
+            return
+        elif tag == self.container_tag:
+            self._depth += 1
+
+        if tag == 'table':
+            self._table_index += 1
+            self._row_index = -1
+
+        if tag == 'tr':
+            if self._row_depth == 0:
+                self._row_index += 1
+                self._row = []
+            self._row_depth += 1
+
+        if self._row_depth:
+            self._row.append(self.get_starttag_text())
+
+    def handle_startendtag(self, tag, attrs):
+        if self._row_depth:
+            self._row.append(self.get_starttag_text())
+
+    def handle_endtag(self, tag):
+        if self._depth == 0:
+            return
+
+        if self._row_depth:
+            self._row.append('</%s>' % tag)
+            if tag == 'tr':
+                self._row_depth -= 1
+                if self._row_depth == 0:
+                    self.rows.append((self._table_index, self._row_index, ''.join(self._row)))
+
+        if tag == self.container_tag:
+            self._depth -= 1
+            if self._depth == 0:
+                self.finished = True
+
+    def handle_data(self, data):
+        if self._row_depth:
+            self._row.append(data)
+
+    def handle_entityref(self, name):
+        if self._row_depth:
+            self._row.append('&%s;' % name)
+
+    def handle_charref(self, name):
+        if self._row_depth:
+            self._row.append('&#%s;' % name)
+
+
+def iter_rows(texts, container):
+    """
+    Feed texts to tokenizer and yield (table index, row index in table, HTML of row) in container.
+
+    Stop reading texts when the container ends.
+    """
+    reader = TrackRowReader(container)
+
+    for text in texts:
+        reader.feed(text)
+
+        rows, reader.rows = reader.rows, []
+        for row in rows:
+            yield row
+
+        if reader.finished:
+            return
+
+    reader.close()
+    for row in reader.rows:
+        yield row
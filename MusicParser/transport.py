@@ -0,0 +1,185 @@
+"""
+HTTP transport shared by parsers for music information sites.
+
+Author: Yungon Park
+"""
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.utils import get_encoding_from_headers
+from urllib3.util.retry import Retry
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:49.0) Gecko/20100101 Firefox/49.0'
+}
+
+
+class Transport(object):
+    """
+    Pooled HTTP client for music sites.
+
+    One session keeps connections alive per host, so repeated requests to the same site
+    don't pay TCP/TLS handshake again. A transport can be shared by many parsers and threads.
+
+    If cache (ResponseCache) is given, fresh pages are read from cache, and stale pages are
+    revalidated with ETag/Last-Modified.
+
+    If scheduler (Scheduler) is given, requests (and each retry of them) are sent when their hosts allow them.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, timeout=(3.05, 10),
+                 retries=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                 headers=None, cache=None, scheduler=None):
+        self.timeout = timeout
+        self.cache = cache
+        self.scheduler = scheduler
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.status_forcelist = status_forcelist
+        self.headers = dict(DEFAULT_HEADERS)
+        if headers:
+            self.headers.update(headers)
+
+        # With scheduler, requests are retried through it instead of adapter. (See _send)
+        retry = Retry(total=retries if scheduler is None else 0,
+                      backoff_factor=backoff_factor,
+                      status_forcelist=status_forcelist,
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize,
+                              max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, url, headers=None, stream=False, use_cache=True):
+        """
+        Send GET request and return response. Raise HTTPError if retries didn't help.
+
+        If use_cache is False, request is sent to site without reading or writing cache.
+        """
+        if self.cache is not None and use_cache and not stream:
+            return self._get_with_cache(url, headers)
+
+        response = self._send(url, headers, stream)
+        response.raise_for_status()
+
+        return response
+
+    def _send(self, url, headers=None, stream=False):
+        """
+        Send GET request through scheduler if it is given.
+
+        Each retry goes through scheduler too, so it waits for the rate limit and doesn't hold a slot
+        while backing off. (Retry-After pauses the host in scheduler.)
+        """
+        if self.scheduler is None:
+            return self.session.get(url, headers=headers, timeout=self.timeout, stream=stream)
+
+        def send():
+            return self.session.get(url, headers=headers, timeout=self.timeout, stream=stream)
+
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                response = self.scheduler.call(url, send)
+            except (requests.ConnectionError, requests.Timeout):
+                if last:
+                    raise
+            else:
+                if last or response.status_code not in self.status_forcelist:
+                    return response
+                response.close()
+
+            time.sleep(self.backoff_factor * (2 ** attempt))
+
+    def _get_with_cache(self, url, headers=None):
+        """Get response from cache, or from site and store it to cache."""
+        cached = self.cache.get(url)
+        if cached is not None and cached.fresh:
+            return _make_cached_response(cached)
+
+        headers = dict(headers or {})
+        if cached is not None:
+            # Ask site to send the page only if it was modified.
+            if cached.etag:
+                headers['If-None-Match'] = cached.etag
+            if cached.last_modified:
+                headers['If-Modified-Since'] = cached.last_modified
+
+        response = self._send(url, headers)
+
+        if response.status_code == 304:
+            if cached is None:
+                # Caller sent its own validators, so 304 is for the caller's copy. (Nothing to cache)
+                return response
+
+            self.cache.refresh(url)
+            return _make_cached_response(cached)
+
+        response.raise_for_status()
+        if 200 <= response.status_code < 300:
+            self.cache.set(url, response.content,
+                           content_type=response.headers.get('Content-Type'),
+                           etag=response.headers.get('ETag'),
+                           last_modified=response.headers.get('Last-Modified'))
+
+        return response
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def make_response(url, content, status_code=200, headers=None):
+    """Make response object like one from requests, with body already read. (Headers of None value are skipped)"""
+    response = requests.Response()
+    response.url = url
+    response.status_code = status_code
+    response._content = content
+    # Body was already read, so iter_content() yields it in chunks.
+    response._content_consumed = True
+    for name, value in (headers or {}).items():
+        if value:
+            response.headers[name] = value
+    response.encoding = get_encoding_from_headers(response.headers)
+
+    return response
+
+
+def _make_cached_response(cached):
+    """Make response object from cached page."""
+    return make_response(cached.url, cached.content, headers={'Content-Type': cached.content_type,
+                                                              'ETag': cached.etag,
+                                                              'Last-Modified': cached.last_modified})
+
+
+_default_transport = None
+_default_transport_lock = threading.Lock()
+
+
+def get_default_transport():
+    """Return transport shared by parsers which are created without their own transport."""
+    global _default_transport
+
+    if _default_transport is None:
+        with _default_transport_lock:
+            if _default_transport is None:
+                _default_transport = Transport()
+
+    return _default_transport
+
+
+def resolve_transport(transport):
+    """Return transport, or the default transport if it is None."""
+    return transport if transport is not None else get_default_transport()
@@ -0,0 +1,3 @@
+"""
+Benchmarks for MusicParser. (Run from the repository root, e.g. 'python -m benchmark.bench_parsers')
+"""
@@ -0,0 +1,91 @@
+"""
+Import time benchmark.
+
+Each case runs in a new Python process, so nothing is imported beforehand. Wall time of the case
+and heavy modules (requests, bs4, ...) loaded by it are reported as JSON.
+
+    $ python -m benchmark.bench_import --repeat 20 --output import_output.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('requests', 'urllib3', 'bs4', 'lxml', 'asyncio', 'aiohttp', 'concurrent.futures.process')
+
+# Case: statements to measure.
+CASES = {
+    'import_parser': "import MusicParser.parser",
+    'check_input': ("import MusicParser.parser\n"
+                    "MusicParser.parser.MusicParser.check_input('https://music.bugs.co.kr/album/450734')"),
+    'import_router': "import MusicParser.router",
+    'import_cli': "import MusicParser.cli",
+}
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+{statements}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'elapsed': elapsed, 'heavy': [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def run_case(case, repeat):
+    """Run a case in new processes and return its result."""
+    script = SCRIPT.format(statements=CASES[case], heavy=HEAVY_MODULES)
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+
+    timings, heavy = [], []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', script], env=env, cwd=ROOT, check=True,
+                                stdout=subprocess.PIPE, universal_newlines=True).stdout
+        result = json.loads(output)
+        timings.append(result['elapsed'])
+        heavy = result['heavy']
+
+    return {
+        'case': case,
+        'repeat': repeat,
+        'median_ms': statistics.median(timings) * 1000,
+        'min_ms': min(timings) * 1000,
+        'heavy_modules': heavy,
+    }
+
+
+def run(repeat=10, cases=None):
+    """Run cases and return report."""
+    return {
+        'python': platform.python_version(),
+        'results': [run_case(case, repeat) for case in (cases or CASES)],
+    }
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--repeat', type=int, default=10, help="Number of processes for each case.")
+    arg_parser.add_argument('--case', action='append', choices=sorted(CASES), help="Cases to run.")
+    arg_parser.add_argument('--output', help="File to write JSON report. (Default: stdout)")
+    args = arg_parser.parse_args(argv)
+
+    report = run(args.repeat, args.case)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+    for result in report['results']:
+        sys.stderr.write('{case:14} {median:8.2f} ms  heavy: {heavy}\n'.format(
+            case=result['case'], median=result['median_ms'], heavy=', '.join(result['heavy_modules']) or '-'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+Offline benchmark for site parsers.
+
+Each album page of the corpus is parsed repeatedly through a stand-in transport, and timings of each stage
+(fetch, decode, tree build, field extraction, JSON serialization), throughput and peak memory are reported as JSON.
+
+    $ python -m benchmark.bench_parsers --repeat 20 --output bench_output.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from MusicParser.parser import AllMusicParser, BugsParser, MelonParser, get_default_backend
+
+from .corpus import StandInTransport, load_corpus
+
+PARSERS = {
+    'bugs': BugsParser,
+    'melon': MelonParser,
+    'allmusic': AllMusicParser,
+}
+
+STAGES = ('fetch', 'decode', 'tree_build', 'extract', 'serialize')
+
+
+def parse_once(parser, url, text=False):
+    """
+    Parse an album once and return (timings of stages, album).
+
+    If text is True, page is decoded by requests before building tree. Otherwise, tree builder decodes bytes
+    with encoding known for the site. (Like parsers do)
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    response = parser._get_transport().get(url)
+    timings['fetch'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if text:
+        markup, encoding = response.text, None
+    else:
+        markup, encoding = response.content, parser._get_encoding(response)
+    timings['decode'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    soup = parser._make_soup(markup, encoding)
+    timings['tree_build'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    album = parser._parse_soup(soup)
+    timings['extract'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    json.dumps(album.to_dict(), ensure_ascii=False)
+    timings['serialize'] = time.perf_counter() - start
+
+    return timings, album
+
+
+def measure_peak_memory(parser, url, text=False):
+    """Measure peak memory (bytes) allocated while parsing an album once."""
+    tracemalloc.start()
+    try:
+        parse_once(parser, url, text)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(parser, url, page_size, repeat, text=False):
+    """Run benchmark for an album page."""
+    samples = {stage: [] for stage in STAGES}
+    track_count = 0
+
+    for _ in range(repeat):
+        timings, album = parse_once(parser, url, text)
+        track_count = len(album.tracks)
+        for stage in STAGES:
+            samples[stage].append(timings[stage])
+
+    total = sum(sum(values) for values in samples.values())
+
+    return {
+        'page_bytes': page_size,
+        'tracks': track_count,
+        'stages_ms': {
+            stage: {
+                'median': statistics.median(values) * 1000,
+                'mean': statistics.mean(values) * 1000,
+                'min': min(values) * 1000,
+            } for stage, values in samples.items()
+        },
+        'albums_per_sec': repeat / total,
+        'tracks_per_sec': repeat * track_count / total,
+        'peak_memory_bytes': measure_peak_memory(parser, url, text),
+    }
+
+
+def run(repeat=10, backend=None, partial=True, sites=None, cases=None, text=False, charset=True):
+    """
+    Run benchmark for corpus and return report as dict.
+
+    If charset is False, pages are served without charset, so requests detects it when decoding (text is True).
+    """
+    corpus = load_corpus()
+    transport = StandInTransport(((url, page) for _, _, url, page in corpus),
+                                 content_type='text/html; charset=utf-8' if charset else None)
+    backend = backend or get_default_backend()
+
+    results = []
+    for site, case, url, page in corpus:
+        if (sites and site not in sites) or (cases and case not in cases):
+            continue
+
+        parser = PARSERS[site](transport=transport, backend=backend, partial=partial)
+        result = run_case(parser, url, len(page), repeat, text)
+        result.update({'site': site, 'case': case})
+        results.append(result)
+
+    return {
+        'python': platform.python_version(),
+        'backend': backend,
+        'partial': partial,
+        'input': 'text' if text else 'bytes',
+        'charset': charset,
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--repeat', type=int, default=10, help="Number of parsing for each page.")
+    arg_parser.add_argument('--backend', help="Tree builder. (Default: fastest one installed)")
+    arg_parser.add_argument('--full', action='store_true', help="Build the whole page instead of album regions.")
+    arg_parser.add_argument('--text', action='store_true',
+                            help="Decode pages with requests before building tree, instead of passing bytes.")
+    arg_parser.add_argument('--no-charset', action='store_true', help="Serve pages without charset in header.")
+    arg_parser.add_argument('--site', action='append', choices=sorted(PARSERS), help="Sites to run.")
+    arg_parser.add_argument('--case', action='append', help="Cases to run. (small, huge-multi-disc, ...)")
+    arg_parser.add_argument('--output', help="File to write JSON report. (Default: stdout)")
+    args = arg_parser.parse_args(argv)
+
+    report = run(args.repeat, args.backend, not args.full, args.site, args.case, args.text, not args.no_charset)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+    for result in report['results']:
+        sys.stderr.write('{site:9} {case:16} {tracks:4} tracks {rate:8.1f} albums/s  tree {tree:7.2f} ms  '
+                         'decode {decode:6.2f} ms  extract {extract:7.2f} ms  peak {memory:8.0f} KiB\n'.format(
+                             site=result['site'], case=result['case'], tracks=result['tracks'],
+                             rate=result['albums_per_sec'],
+                             tree=result['stages_ms']['tree_build']['median'],
+                             decode=result['stages_ms']['decode']['median'],
+                             extract=result['stages_ms']['extract']['median'],
+                             memory=result['peak_memory_bytes'] / 1024.0))
+
+
+if __name__ == '__main__':
+    main()
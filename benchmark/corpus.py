@@ -0,0 +1,173 @@
+"""
+Album pages for benchmarks, and a stand-in transport serving them without network.
+
+Corpus has saved pages (test/fixtures) and generated pages of the same structure:
+huge multi-disc albums and various-artists albums for each site.
+"""
+import os
+from html import escape
+
+from MusicParser.transport import make_response
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test', 'fixtures')
+
+SAVED_PAGES = [
+    ('bugs', 'small', "https://music.bugs.co.kr/album/450734", 'bugs_450734.html'),
+    ('melon', 'small', "https://www.melon.com/album/detail.htm?albumId=2281828", 'melon_2281828.html'),
+    ('allmusic', 'small', "https://www.allmusic.com/album/judgment-night-mw0000101514", 'allmusic_mw0000101514.html'),
+]
+
+# Page header and footer which are not used by parsers. (Navigation, scripts and comments)
+NOISE = (
+    '<script type="text/javascript">var page = {album: true}; function noop() { return "<div></div>"; }</script>\n'
+    '<nav class="gnb"><ul>' + ''.join('<li><a href="/menu/%d">메뉴 %d</a></li>' % (i, i) for i in range(40)) +
+    '</ul></nav>\n'
+)
+COMMENTS = (
+    '<div class="comments"><ul>' +
+    ''.join('<li><p class="comment">앨범 좋아요 &lt;3 #%d</p><span class="date">2017.01.%02d</span></li>'
+            % (i, i % 28 + 1) for i in range(200)) +
+    '</ul></div>\n'
+)
+
+
+def _artist_name(disc, track, various):
+    if various:
+        return ['Artist %d-%d' % (disc, track), '아티스트 %d' % track]
+    return ['Pink Floyd']
+
+
+def bugs_page(title, artist, discs, various=False):
+    """Make album page of Bugs. discs is a list of the number of tracks."""
+    rows = []
+    for disc, count in enumerate(discs, start=1):
+        rows.append('<tr><th scope="colgroup" colspan="4">CD %d</th></tr>' % disc)
+        for track in range(1, count + 1):
+            artists = _artist_name(disc, track, various)
+            if len(artists) == 1:
+                artist_html = '<a href="/artist/1" title="{0}">{0}</a>'.format(escape(artists[0]))
+            else:
+                onclick = "bugs.layermenu.openMultiArtistSearchResultPopLayer(this,%s, '');" % \
+                          '||'.join('%d||%s' % (i, name) for i, name in enumerate(artists))
+                artist_html = '<a href="/artist/1">{0}</a><a href="javascript:;" class="more" onclick="{1}">{0} 외</a>' \
+                    .format(escape(artists[0]), escape(onclick))
+            rows.append(
+                '<tr rowType="track"><td class="check"><input type="checkbox"></td>'
+                '<td><p class="trackIndex"><em>{0}</em><span>곡 번호</span></p></td>'
+                '<th scope="row"><p class="title" title="{1}"><a href="/track/{0}" title="{1}">{1}</a></p></th>'
+                '<td class="left"><p class="artist">{2}</p></td></tr>'.format(
+                    track, escape('Track %d-%d' % (disc, track)), artist_html))
+
+    return (
+        '<!DOCTYPE html><html lang="ko"><head><meta charset="utf-8"><title>{0}</title></head><body>\n{1}'
+        '<header class="pgTitle"><div class="innerContainer"><h1>{0}</h1></div></header>\n'
+        '<div class="photos"><ul><li><a href="#"><img src="https://image.bugsm.co.kr/album/images/200/1/1.jpg"></a>'
+        '</li></ul></div>\n'
+        '<table class="info"><tbody><tr><th scope="row">아티스트</th><td><a href="/artist/1">{2}</a></td></tr>'
+        '<tr><th scope="row">발매일</th><td>1979.11.30</td></tr></tbody></table>\n'
+        '<table class="list trackList byAlbum"><thead><tr><th scope="col">곡</th></tr></thead><tbody>\n{3}\n'
+        '</tbody></table>\n{4}</body></html>'
+    ).format(escape(title), NOISE, escape(artist), '\n'.join(rows), COMMENTS)
+
+
+def melon_page(title, artist, discs, various=False):
+    """Make album page of Melon. discs is a list of the number of tracks."""
+    tables = []
+    for disc, count in enumerate(discs, start=1):
+        rows = ['<tr class="cd_divide"><td colspan="3"><strong>CD%d</strong></td></tr>' % disc]
+        for track in range(1, count + 1):
+            artists = _artist_name(disc, track, various)
+            rows.append(
+                '<tr><td><div class="wrap"><input type="checkbox" class="input_check"></div></td>'
+                '<td><div class="wrap t_center"><span class="rank">{0}</span></div></td>'
+                '<td><div class="wrap"><div class="wrap_song_info">'
+                '<div class="ellipsis rank01"><span><a href="javascript:;" title="{1} 재생">{1}</a></span></div>'
+                '<div class="ellipsis rank02"><span class="checkEllipsis">{2}</span></div>'
+                '</div></div></td></tr>'.format(
+                    track, escape('Track %d-%d' % (disc, track)),
+                    ', '.join('<a href="javascript:;">%s</a>' % escape(name) for name in artists)))
+        tables.append('<table><caption>곡 리스트</caption><thead><tr><th scope="col">곡정보</th></tr></thead>'
+                      '<tbody>\n%s\n</tbody></table>' % '\n'.join(rows))
+
+    return (
+        '<!DOCTYPE html><html lang="ko"><head><meta charset="UTF-8"><title>{0}</title></head><body>\n{1}'
+        '<div class="thumb"><a href="javascript:;"><img src="https://cdnimg.melon.co.kr/cm/album/images/1/1.jpg">'
+        '</a></div>\n'
+        '<div class="song_name"><strong class="none">앨범명</strong>\n{0}\n</div>\n'
+        '<div class="artist"><a href="javascript:;" class="artist_name"><span>{2}</span>'
+        '<span class="blind">- 페이지 이동</span></a></div>\n'
+        '<div class="d_song_list"><form>\n{3}\n</form></div>\n{4}</body></html>'
+    ).format(escape(title), NOISE, escape(artist), '\n'.join(tables), COMMENTS)
+
+
+def allmusic_page(title, artist, discs, various=False):
+    """Make album page of AllMusic. discs is a list of the number of tracks."""
+    disc_list = []
+    for disc, count in enumerate(discs, start=1):
+        rows = []
+        for track in range(1, count + 1):
+            artists = _artist_name(disc, track, various)
+            rows.append(
+                '<tr class="track"><td class="tracknum">{0}</td>'
+                '<td class="title-composer"><div class="title"><a href="/song/{0}">{1}</a></div></td>'
+                '<td class="performer"><div class="primary">{2}</div></td></tr>'.format(
+                    track, escape('Track %d-%d' % (disc, track)),
+                    ' / '.join('<a href="/artist/1">%s</a>' % escape(name) for name in artists)))
+        disc_list.append('<div class="disc"><div class="headline"><h3>Disc %d</h3></div><table><tbody>\n%s\n'
+                         '</tbody></table></div>' % (disc, '\n'.join(rows)))
+
+    return (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8"><title>{0}</title></head><body>\n{1}'
+        '<div class="sidebar"><div class="album-contain"><img class="media-gallery-image" '
+        'src="https://cps-static.rovicorp.com/3/JPG_500/MI0001/1/MI0001.jpg?partner=allrovi.com"></div></div>\n'
+        '<div class="content"><h2 class="album-artist"><span><a href="/artist/1">{2}</a></span></h2>'
+        '<h1 class="album-title">{0}</h1>\n<section class="track-listing">{3}</section></div>\n{4}</body></html>'
+    ).format(escape(title), NOISE, escape(artist), '\n'.join(disc_list), COMMENTS)
+
+
+GENERATED_PAGES = [
+    ('bugs', 'huge-multi-disc', "https://music.bugs.co.kr/album/90000001", bugs_page, [60, 60, 60, 60], False),
+    ('bugs', 'various-artists', "https://music.bugs.co.kr/album/90000002", bugs_page, [40], True),
+    ('melon', 'huge-multi-disc', "https://www.melon.com/album/detail.htm?albumId=90000001", melon_page,
+     [60, 60, 60, 60], False),
+    ('melon', 'various-artists', "https://www.melon.com/album/detail.htm?albumId=90000002", melon_page, [40], True),
+    ('allmusic', 'huge-multi-disc', "https://www.allmusic.com/album/the-wall-mw9000000001", allmusic_page,
+     [60, 60, 60, 60], False),
+    ('allmusic', 'various-artists', "https://www.allmusic.com/album/compilation-mw9000000002", allmusic_page,
+     [40], True),
+]
+
+
+def load_corpus():
+    """Return list of (site, case, URL, page bytes)."""
+    corpus = []
+
+    for site, case, url, file_name in SAVED_PAGES:
+        with open(os.path.join(FIXTURE_DIR, file_name), 'rb') as f:
+            corpus.append((site, case, url, f.read()))
+
+    for site, case, url, make_page, discs, various in GENERATED_PAGES:
+        title = "The Wall" if not various else "Now That's What I Call Music"
+        artist = "Pink Floyd" if not various else "Various Artists"
+        corpus.append((site, case, url, make_page(title, artist, discs, various).encode('utf-8')))
+
+    return corpus
+
+
+class StandInTransport(object):
+    """
+    Transport serving corpus pages from memory, instead of music sites.
+
+    If content_type is None, pages are served without Content-Type header, so its charset is unknown.
+    """
+
+    def __init__(self, pages, content_type='text/html; charset=utf-8'):
+        self.pages = dict(pages)
+        self.content_type = content_type
+
+    def get(self, url, headers=None, stream=False):
+        response = make_response(url, self.pages.get(url, b'Not Found'), 200 if url in self.pages else 404,
+                                 headers={'Content-Type': self.content_type})
+        response.raise_for_status()
+
+        return response
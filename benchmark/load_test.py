@@ -0,0 +1,171 @@
+"""
+Load test of batch, executor and async parsing against a local replay server.
+
+Recorded pages (or the benchmark corpus) are served by ReplayServer with latency, errors and limited bandwidth,
+and albums are parsed with many concurrent requests. Throughput, latency percentiles and errors are reported as JSON.
+'executor' mode runs the blocking transport of to_dict_async in threads, and 'async' mode uses AsyncTransport.
+(Requires aiohttp)
+
+    $ python -m benchmark.load_test --requests 2000 --concurrency 64 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import collections
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+from MusicParser.cli import PERCENTILES, percentile
+from MusicParser.parser import MusicParser, get_default_backend
+from MusicParser.replay import LocalAsyncTransport, LocalTransport, PageStore, ReplayServer
+from MusicParser.transport import Transport
+
+from .corpus import load_corpus
+
+MODES = ('batch', 'executor', 'async')
+
+
+def _run_batch(parser, urls, concurrency):
+    # (elapsed, error) of each album.
+    return [(item.elapsed, item.error)
+            for item in parser.to_dict_many(urls, max_workers=concurrency, per_host=concurrency, ordered=False)]
+
+
+async def _parse_timed(parser, url, semaphore):
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            await parser.to_dict_async(url)
+            error = None
+        except Exception as e:
+            error = e
+        return time.perf_counter() - start, error
+
+
+def _run_executor(parser, urls, concurrency):
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+
+    async def parse_all():
+        # Blocking transport runs in the default executor, so it needs a thread for each request.
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(concurrency))
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(_parse_timed(parser, url, semaphore) for url in urls))
+
+    return asyncio.run(parse_all())
+
+
+def _run_async(parser, urls, concurrency):
+    import asyncio
+    from MusicParser.aio import AsyncTransport
+
+    async def parse_all():
+        # AsyncTransport should be created in the event loop.
+        async with AsyncTransport(limit=concurrency, limit_per_host=concurrency) as async_transport:
+            parser.async_transport = LocalAsyncTransport(parser.transport.server_url, async_transport)
+            semaphore = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(*(_parse_timed(parser, url, semaphore) for url in urls))
+
+    return asyncio.run(parse_all())
+
+
+RUNNERS = {'batch': _run_batch, 'executor': _run_executor, 'async': _run_async}
+
+
+def run(store_path=None, requests=500, concurrency=32, mode='batch', latency=0.02, jitter=0, error_rate=0,
+        bandwidth=None, seed=0, backend=None):
+    """
+    Run load test and return report as dict.
+
+    Pages in store_path (PageStore) are requested in turn. If store_path is None, the benchmark corpus is served.
+    """
+    directory = None
+    if store_path is None:
+        directory = tempfile.mkdtemp()
+        store = PageStore(os.path.join(directory, 'pages.sqlite3'))
+        for _, _, url, page in load_corpus():
+            store.set(url, page, 'text/html; charset=utf-8')
+    else:
+        store = PageStore(store_path)
+
+    backend = backend or get_default_backend()
+    urls = store.urls()
+    urls = [urls[i % len(urls)] for i in range(requests)]
+
+    try:
+        with ReplayServer(store, latency=latency, jitter=jitter, error_rate=error_rate, bandwidth=bandwidth,
+                          seed=seed) as server:
+            # No retries, so errors of server are counted as they are.
+            transport = Transport(pool_connections=1, pool_maxsize=concurrency, retries=0)
+            parser = MusicParser(transport=LocalTransport(server.url, transport), backend=backend)
+
+            start = time.perf_counter()
+            results = RUNNERS[mode](parser, urls, concurrency)
+            elapsed = time.perf_counter() - start
+
+            transport.close()
+            server_stats = {'requests': server.requests, 'errors': server.errors, 'bytes_sent': server.bytes_sent}
+    finally:
+        store.close()
+        if directory is not None:
+            shutil.rmtree(directory)
+
+    latencies = sorted(item_elapsed for item_elapsed, _ in results)
+    errors = collections.Counter(type(error).__name__ for _, error in results if error is not None)
+    albums = len(results) - sum(errors.values())
+
+    return {
+        'python': platform.python_version(),
+        'backend': backend,
+        'mode': mode,
+        'requests': requests,
+        'concurrency': concurrency,
+        'latency': latency,
+        'jitter': jitter,
+        'error_rate': error_rate,
+        'bandwidth': bandwidth,
+        'elapsed': elapsed,
+        'albums': albums,
+        'albums_per_sec': albums / elapsed if elapsed else 0,
+        'latency_ms': dict([('p%d' % p, percentile(latencies, p) * 1000) for p in PERCENTILES] +
+                           [('max', latencies[-1] * 1000 if latencies else None)]),
+        'errors': dict(errors),
+        'server': server_stats,
+    }
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--store', help="SQLite file of recorded pages. (Default: benchmark corpus)")
+    arg_parser.add_argument('--requests', type=int, default=500, help="Number of albums to parse.")
+    arg_parser.add_argument('--concurrency', type=int, default=32, help="Number of concurrent requests.")
+    arg_parser.add_argument('--mode', choices=MODES, default='batch', help="Parsing path to test.")
+    arg_parser.add_argument('--latency', type=float, default=0.02, help="Seconds before each response.")
+    arg_parser.add_argument('--jitter', type=float, default=0, help="Random seconds added to latency.")
+    arg_parser.add_argument('--error-rate', type=float, default=0, help="Fraction of requests answered with 503.")
+    arg_parser.add_argument('--bandwidth', type=int, help="Bytes per second for each connection.")
+    arg_parser.add_argument('--backend', help="Tree builder. (Default: fastest one installed)")
+    arg_parser.add_argument('--output', help="File to write JSON report. (Default: stdout)")
+    args = arg_parser.parse_args(argv)
+
+    report = run(args.store, args.requests, args.concurrency, args.mode, args.latency, args.jitter, args.error_rate,
+                 args.bandwidth, backend=args.backend)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+    sys.stderr.write('{mode:8} {albums:6} albums {rate:8.1f} albums/s  p50 {p50:7.1f} ms  p99 {p99:7.1f} ms  '
+                     'errors {errors}\n'.format(mode=report['mode'], albums=report['albums'],
+                                                rate=report['albums_per_sec'], p50=report['latency_ms']['p50'],
+                                                p99=report['latency_ms']['p99'], errors=sum(report['errors'].values())))
+
+
+if __name__ == '__main__':
+    main()
@@ -11,5 +11,13 @@ setup(
         "requests==2.28.1",
         "beautifulsoup4==4.11.1"
     ],
-    packages=find_packages()
+    extras_require={
+        "async": ["aiohttp"],
+        "lxml": ["lxml"],
+        "parquet": ["pyarrow"],
+    },
+    packages=find_packages(exclude=['benchmark', 'benchmark.*']),
+    entry_points={
+        "console_scripts": ["musicparser=MusicParser.cli:main"],
+    },
 )
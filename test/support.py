@@ -0,0 +1,103 @@
+"""
+Helpers to run parsers against saved album pages without network.
+"""
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from MusicParser import transport
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+BUGS_URL = "https://music.bugs.co.kr/album/450734"
+MELON_URL = "https://www.melon.com/album/detail.htm?albumId=2281828"
+ALLMUSIC_URL = "https://www.allmusic.com/album/judgment-night-mw0000101514"
+
+FIXTURES = {
+    BUGS_URL: 'bugs_450734.html',
+    MELON_URL: 'melon_2281828.html',
+    ALLMUSIC_URL: 'allmusic_mw0000101514.html',
+}
+
+
+def read_fixture(file_name):
+    """Read saved page as bytes."""
+    with open(os.path.join(FIXTURE_DIR, file_name), 'rb') as f:
+        return f.read()
+
+
+def make_response(url, content, status_code=200, headers=None):
+    """Make response object like one from requests. (HTML in UTF-8 if headers are not given)"""
+    return transport.make_response(url, content, status_code, headers or {'Content-Type': 'text/html; charset=utf-8'})
+
+
+class FixtureTransport(object):
+    """Transport serving saved pages instead of music sites."""
+
+    def __init__(self, pages=None):
+        self.pages = FIXTURES if pages is None else pages
+        self.requested = []
+
+    def get(self, url, headers=None, stream=False):
+        self.requested.append(url)
+
+        if url not in self.pages:
+            response = make_response(url, b'Not Found', status_code=404)
+            response.raise_for_status()
+
+        return make_response(url, read_fixture(self.pages[url]))
+
+
+class _LocalHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        server.clients.add(self.client_address)
+        server.requests.append((self.path, dict(self.headers)))
+
+        headers = {'Content-Type': 'text/html; charset=utf-8'}
+        if self.path == '/flaky' and server.failures > 0:
+            server.failures -= 1
+            status, body = 503, b'busy'
+        elif self.path == '/missing':
+            status, body = 404, b'missing'
+        elif self.path == '/etag':
+            headers['ETag'] = '"%d"' % server.version
+            if self.headers.get('If-None-Match') == headers['ETag']:
+                status, body = 304, b''
+            else:
+                status, body = 200, ('<html><body>version %d</body></html>' % server.version).encode('utf-8')
+        else:
+            status, body = 200, b'<html><body>ok</body></html>'
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class LocalServer(object):
+    """Local HTTP server for testing transports."""
+
+    def __init__(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _LocalHandler)
+        self.server.clients = set()
+        self.server.requests = []
+        self.server.failures = 0
+        self.server.version = 1
+        self.url = 'http://127.0.0.1:%d' % self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self.server
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from MusicParser import aio
+from MusicParser.parser import BugsParser, InvalidURLError, MusicParser
+from test.support import (ALLMUSIC_URL, BUGS_URL, FIXTURES, MELON_URL, FixtureTransport, make_response,
+                          read_fixture)
+
+
+class FixtureAsyncTransport(object):
+    """Async transport serving saved pages."""
+
+    def __init__(self):
+        self.requested = []
+
+    async def get_content(self, url):
+        self.requested.append(url)
+        await asyncio.sleep(0)
+        return read_fixture(FIXTURES[url]), 'text/html'
+
+
+class TestAsyncParser(unittest.TestCase):
+    """Test for parsing album information with asyncio."""
+
+    def test_to_dict_async(self):
+        transport = FixtureAsyncTransport()
+        parser = MusicParser(async_transport=transport)
+
+        async def parse_all():
+            return await asyncio.gather(*[parser.to_dict_async(url) for url in [BUGS_URL, MELON_URL, ALLMUSIC_URL]])
+
+        bugs, melon, allmusic = asyncio.run(parse_all())
+        self.assertEqual(bugs['artist'], "크라잉넛(Crying Nut), 노브레인(No Brain)")
+        self.assertEqual(melon['album_title'], "96")
+        self.assertEqual(allmusic['album_title'], "Judgment Night")
+        self.assertEqual(len(transport.requested), 3)
+
+    def test_to_json_async_with_executor(self):
+        parser = BugsParser(async_transport=FixtureAsyncTransport())
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            result = json.loads(asyncio.run(parser.to_json_async(BUGS_URL, executor)))
+
+        self.assertEqual(result, BugsParser(transport=FixtureTransport()).to_dict(BUGS_URL))
+
+    def test_process_executor(self):
+        parser = MusicParser(async_transport=FixtureAsyncTransport())
+
+        async def parse_all(executor):
+            return await asyncio.gather(*[parser.to_dict_async(url, executor) for url in [BUGS_URL, MELON_URL]])
+
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            bugs, melon = asyncio.run(parse_all(executor))
+
+        self.assertEqual(bugs, MusicParser(transport=FixtureTransport()).to_dict(BUGS_URL))
+        self.assertEqual(melon['album_title'], "96")
+
+    def test_blocking_transport_fallback(self):
+        parser = MusicParser(transport=FixtureTransport())
+
+        result = asyncio.run(parser.to_dict_async(MELON_URL))
+        self.assertEqual(result['artist'], "크라잉넛 (CRYING NUT), 노브레인")
+
+    def test_fallback_without_charset(self):
+        # Page is decoded as UTF-8 (encoding of the site), not ISO-8859-1 guessed from 'text/html'.
+        parser = MusicParser(transport=FixtureTransport())
+        parser.transport.get = lambda url, headers=None, stream=False: make_response(
+            url, read_fixture(FIXTURES[url]), headers={'Content-Type': 'text/html'})
+
+        result = asyncio.run(parser.to_dict_async(BUGS_URL))
+        self.assertEqual(result['artist'], "크라잉넛(Crying Nut), 노브레인(No Brain)")
+
+    def test_invalid_url(self):
+        with self.assertRaises(InvalidURLError):
+            asyncio.run(BugsParser().to_dict_async(MELON_URL))
+
+    @unittest.skipIf(aio.aiohttp is not None, "aiohttp is installed.")
+    def test_async_transport_requires_aiohttp(self):
+        self.assertRaises(ImportError, aio.AsyncTransport)
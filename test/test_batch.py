@@ -0,0 +1,84 @@
+import json
+import threading
+import time
+import unittest
+
+from MusicParser.batch import HostLimiter, run_batch
+from MusicParser.parser import InvalidURLError, MusicParser
+from test.support import ALLMUSIC_URL, BUGS_URL, MELON_URL, FixtureTransport
+
+
+class TestBatch(unittest.TestCase):
+    """Test for parsing many albums concurrently."""
+
+    def test_to_dict_many(self):
+        parser = MusicParser(transport=FixtureTransport())
+        urls = [BUGS_URL, "https://example.com/album/1", MELON_URL, ALLMUSIC_URL]
+
+        results = list(parser.to_dict_many(urls, max_workers=4))
+
+        self.assertEqual([r.url for r in results], urls)
+        self.assertEqual(results[0].result['album_title'], "96")
+        self.assertIsInstance(results[1].error, InvalidURLError)
+        self.assertFalse(results[1].ok)
+        self.assertEqual(results[2].result['artist'], "크라잉넛 (CRYING NUT), 노브레인")
+        self.assertEqual(results[3].result['album_title'], "Judgment Night")
+
+    def test_to_json_many(self):
+        parser = MusicParser(transport=FixtureTransport())
+
+        results = list(parser.to_json_many([BUGS_URL, MELON_URL], ordered=False))
+
+        self.assertEqual(sorted(r.url for r in results), sorted([BUGS_URL, MELON_URL]))
+        for r in results:
+            self.assertEqual(json.loads(r.result)['album_title'], "96")
+
+    def test_ordered(self):
+        def work(item):
+            time.sleep(item / 100.0)
+            return item
+
+        items = [5, 1, 4, 2, 3, 0]
+        self.assertEqual([r.result for r in run_batch(work, items, max_workers=3)], items)
+
+        unordered = [r.result for r in run_batch(work, items, max_workers=6, ordered=False)]
+        self.assertEqual(sorted(unordered), sorted(items))
+
+    def test_host_limiter(self):
+        limiter = HostLimiter(2)
+        lock = threading.Lock()
+        state = {'running': 0, 'max': 0}
+
+        def work(item):
+            with limiter.slot('www.melon.com'):
+                with lock:
+                    state['running'] += 1
+                    state['max'] = max(state['max'], state['running'])
+                time.sleep(0.01)
+                with lock:
+                    state['running'] -= 1
+
+        list(run_batch(work, range(20), max_workers=8))
+        self.assertEqual(state['max'], 2)
+
+
+class TestProcessPool(unittest.TestCase):
+    """Test for parsing albums with worker processes."""
+
+    def test_to_dict_many_with_processes(self):
+        transport = FixtureTransport()
+        parser = MusicParser(transport=transport)
+        urls = [BUGS_URL, MELON_URL, "https://example.com/album/1", ALLMUSIC_URL]
+
+        results = list(parser.to_dict_many(urls, max_workers=4, processes=2))
+
+        expected = [MusicParser(transport=transport).to_dict(url) if url != urls[2] else None for url in urls]
+        self.assertEqual([r.result for r in results], expected)
+        self.assertIsInstance(results[2].error, InvalidURLError)
+
+    def test_to_json_many_with_processes(self):
+        parser = MusicParser(transport=FixtureTransport())
+
+        results = list(parser.to_json_many([BUGS_URL], processes=1))
+
+        self.assertEqual(json.loads(results[0].result)['album_title'], "96")
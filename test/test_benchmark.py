@@ -0,0 +1,41 @@
+import unittest
+
+from MusicParser import aio
+from benchmark import bench_import, bench_parsers, load_test
+from benchmark.corpus import load_corpus
+
+
+class TestBenchmark(unittest.TestCase):
+    """Test for offline benchmark of parsers."""
+
+    def test_corpus(self):
+        cases = set((site, case) for site, case, _, _ in load_corpus())
+
+        for site in ('bugs', 'melon', 'allmusic'):
+            for case in ('small', 'huge-multi-disc', 'various-artists'):
+                self.assertIn((site, case), cases)
+
+    def test_run(self):
+        report = bench_parsers.run(repeat=1, cases=['huge-multi-disc', 'various-artists'])
+
+        for result in report['results']:
+            self.assertEqual(set(result['stages_ms']), set(bench_parsers.STAGES))
+            self.assertGreater(result['peak_memory_bytes'], 0)
+            self.assertEqual(result['tracks'], 240 if result['case'] == 'huge-multi-disc' else 40)
+
+    def test_load_test(self):
+        for mode in load_test.MODES:
+            if mode == 'async' and aio.aiohttp is None:
+                continue
+            report = load_test.run(requests=12, concurrency=4, mode=mode, latency=0.001)
+
+            self.assertEqual(report['albums'], 12)
+            self.assertEqual(report['server']['requests'], 12)
+            self.assertLessEqual(report['latency_ms']['p50'], report['latency_ms']['max'])
+
+    def test_lazy_import(self):
+        report = bench_import.run(repeat=1, cases=['import_parser', 'check_input'])
+
+        # Checking URLs doesn't load HTTP client or HTML parser.
+        for result in report['results']:
+            self.assertEqual(result['heavy_modules'], [])
@@ -0,0 +1,173 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from MusicParser.cache import AlbumCache, ResponseCache, TTLCache
+from MusicParser.parser import MusicParser, ParseError
+from MusicParser.transport import Transport
+from test.support import BUGS_URL, FixtureTransport, LocalServer, make_response
+
+
+class ErrorPageSiteTransport(Transport):
+    """Transport whose site answers an error page with status 200, like throttled sites."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.requested = []
+
+    def _send(self, url, headers=None, stream=False):
+        self.requested.append(url)
+        return make_response(url, b'<html><body><h1>Too many requests</h1></body></html>')
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test for response cache stored in SQLite."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'responses.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_get_and_set(self):
+        cache = ResponseCache(self.path)
+        self.assertIsNone(cache.get('https://music.bugs.co.kr/album/1'))
+
+        cache.set('https://music.bugs.co.kr/album/1', '벅스'.encode('utf-8'), 'text/html; charset=utf-8', '"a"')
+        cache.close()
+
+        # Cached pages are kept after reopening.
+        cache = ResponseCache(self.path)
+        page = cache.get('https://music.bugs.co.kr/album/1')
+        self.assertEqual(page.content.decode('utf-8'), '벅스')
+        self.assertEqual(page.etag, '"a"')
+        self.assertTrue(page.fresh)
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+    def test_ttl(self):
+        cache = ResponseCache(self.path, ttl=0)
+        cache.set('https://music.bugs.co.kr/album/1', b'page')
+        self.assertFalse(cache.get('https://music.bugs.co.kr/album/1').fresh)
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(self.path, max_size=2500)
+        pages = [os.urandom(1000) for _ in range(3)]
+
+        cache.set('url1', pages[0])
+        cache.set('url2', pages[1])
+        cache.get('url1')
+        cache.set('url3', pages[2])
+
+        self.assertEqual(cache.get('url1').content, pages[0])
+        self.assertIsNone(cache.get('url2'))
+        self.assertEqual(cache.get('url3').content, pages[2])
+        self.assertEqual(cache.evictions, 1)
+
+    def test_transport_with_cache(self):
+        with LocalServer() as server:
+            url = 'http://127.0.0.1:%d/etag' % server.server_address[1]
+
+            with Transport(cache=ResponseCache(self.path, ttl=60)) as transport:
+                self.assertIn('version 1', transport.get(url).text)
+                self.assertIn('version 1', transport.get(url).text)
+            self.assertEqual(len(server.requests), 1)
+
+            # Stale page is revalidated and site answers 304.
+            cache = ResponseCache(self.path, ttl=0)
+            with Transport(cache=cache) as transport:
+                self.assertIn('version 1', transport.get(url).text)
+            self.assertEqual(server.requests[-1][1]['If-None-Match'], '"1"')
+            self.assertEqual(cache.revalidated, 1)
+
+            # Modified page is downloaded again.
+            server.version = 2
+            with Transport(cache=cache) as transport:
+                self.assertIn('version 2', transport.get(url).text)
+            self.assertEqual(len(server.requests), 3)
+
+    def test_transport_with_own_validators(self):
+        with LocalServer() as server:
+            url = 'http://127.0.0.1:%d/etag' % server.server_address[1]
+            cache = ResponseCache(self.path, ttl=60)
+
+            with Transport(cache=cache) as transport:
+                # 304 for the caller's copy is returned as it is, and not cached.
+                self.assertEqual(transport.get(url, headers={'If-None-Match': '"1"'}).status_code, 304)
+                self.assertIsNone(cache.get(url))
+
+                response = transport.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('version 1', response.text)
+            self.assertEqual(len(server.requests), 2)
+
+
+    def test_error_page_is_not_kept(self):
+        cache = ResponseCache(self.path, ttl=60)
+        with ErrorPageSiteTransport(cache=cache) as transport:
+            parser = MusicParser(transport=transport)
+
+            self.assertRaises(ParseError, parser.to_dict, BUGS_URL)
+            self.assertIsNone(cache.get(BUGS_URL))
+            # Page is requested again instead of read from cache.
+            self.assertRaises(ParseError, parser.to_dict, BUGS_URL)
+            self.assertEqual(transport.requested, [BUGS_URL, BUGS_URL])
+
+
+class TestAlbumCache(unittest.TestCase):
+    """Test for in-memory cache of parsed albums."""
+
+    def test_album_key(self):
+        self.assertEqual(MusicParser.get_album_key("https://music.bugs.co.kr/album/450734?wl_ref=list_ab_03"),
+                         ('bugs', '450734'))
+        self.assertEqual(MusicParser.get_album_key("melon.com/album/detail.htm?albumId=2281828&x=1"),
+                         ('melon', '2281828'))
+        self.assertEqual(MusicParser.get_album_key("https://www.allmusic.com/album/judgment-night-mw0000101514"),
+                         ('allmusic', 'mw0000101514'))
+        self.assertIsNone(MusicParser.get_album_key("https://example.com/album/1"))
+
+    def test_parser_with_album_cache(self):
+        transport = FixtureTransport()
+        cache = AlbumCache()
+        parser = MusicParser(transport=transport, album_cache=cache)
+
+        first = parser.to_dict(BUGS_URL)
+        first['album_title'] = "changed"
+        second = parser.to_dict(BUGS_URL + "?wl_ref=list_ab_03")
+        third = parser.to_json(BUGS_URL)
+
+        self.assertEqual(second['album_title'], "96")
+        self.assertIn('"album_title": "96"', third)
+        self.assertEqual(transport.requested, [BUGS_URL])
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_lru_eviction(self):
+        cache = AlbumCache(max_size=2)
+        cache.set(('bugs', '1'), {'album_title': '1'})
+        cache.set(('bugs', '2'), {'album_title': '2'})
+        cache.get(('bugs', '1'))
+        cache.set(('bugs', '3'), {'album_title': '3'})
+
+        self.assertIsNone(cache.get(('bugs', '2')))
+        self.assertEqual(cache.get(('bugs', '1')), {'album_title': '1'})
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(len(cache), 2)
+
+    def test_ttl(self):
+        cache = AlbumCache(ttl=-1)
+        cache.set(('bugs', '1'), {'album_title': '1'})
+
+        self.assertIsNone(cache.get(('bugs', '1')))
+        self.assertEqual(len(cache), 0)
+
+    def test_ttl_cache(self):
+        # AlbumCache is TTLCache for albums. Other values can be cached with TTLCache.
+        cache = TTLCache(max_size=1)
+        cache.set(('melon', 'query'), (BUGS_URL,))
+        self.assertEqual(cache.get(('melon', 'query')), (BUGS_URL,))
+
+        cache.set(('bugs', 'query'), ())
+        self.assertIsNone(cache.get(('melon', 'query')))
+        self.assertEqual(cache.get(('bugs', 'query')), ())
+        self.assertTrue(issubclass(AlbumCache, TTLCache))
@@ -0,0 +1,95 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from MusicParser.cli import main, percentile
+from MusicParser.export import read_records
+from test.support import BUGS_URL, MELON_URL, FixtureTransport
+
+INVALID_URL = "https://example.com/album/1"
+
+
+class TestCommandLine(unittest.TestCase):
+    """Test for command line tool."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.transport = FixtureTransport()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _run(self, argv, urls):
+        stdout, stderr = io.BytesIO(), io.StringIO()
+        status = main(argv, stdin=io.StringIO('\n'.join(urls) + '\n'), stdout=stdout, stderr=stderr,
+                      transport=self.transport)
+        return status, stdout, stderr.getvalue()
+
+    def test_stdin_to_stdout(self):
+        status, stdout, stderr = self._run([], [BUGS_URL, '# comment', '', INVALID_URL, MELON_URL])
+
+        records = [json.loads(line) for line in stdout.getvalue().decode('utf-8').splitlines()]
+        self.assertEqual(status, 0)
+        self.assertEqual([record['url'] for record in records], [BUGS_URL, INVALID_URL, MELON_URL])
+        self.assertIn("Albums: 2 (skipped 0), tracks: 8, errors: 1", stderr)
+        self.assertIn("Errors by site: invalid 1", stderr)
+        self.assertIn("Latency: p50", stderr)
+
+    def test_file_to_file_with_resume(self):
+        input_path = os.path.join(self.directory, 'urls.txt')
+        output_path = os.path.join(self.directory, 'albums.jsonl.gz')
+        with open(input_path, 'w') as f:
+            f.write(BUGS_URL + '\n')
+
+        self._run([input_path, '-o', output_path, '--album-cache', '10'], [])
+
+        with open(input_path, 'a') as f:
+            f.write(MELON_URL + '\n' + BUGS_URL + '\n')
+        self.transport.requested = []
+        status, _, stderr = self._run([input_path, '-o', output_path, '--resume', '--album-cache', '10',
+                                       '--workers', '1'], [])
+
+        self.assertEqual(status, 0)
+        self.assertEqual([record['url'] for record in read_records(output_path)], [BUGS_URL, MELON_URL, BUGS_URL])
+        self.assertEqual(self.transport.requested, [MELON_URL, BUGS_URL])
+        self.assertIn("skipped 1", stderr)
+        self.assertIn("Album cache: 0 hits / 2 lookups", stderr)
+
+    def test_all_failed(self):
+        status, _, stderr = self._run(['--quiet'], [INVALID_URL])
+
+        self.assertEqual(status, 1)
+        self.assertEqual(stderr, '')
+
+    def test_record_and_replay(self):
+        store_path = os.path.join(self.directory, 'pages.sqlite3')
+        self._run(['--record', store_path], [BUGS_URL, MELON_URL])
+
+        self.transport.requested = []
+        status, stdout, _ = self._run(['--replay', store_path], [MELON_URL, BUGS_URL])
+
+        records = [json.loads(line) for line in stdout.getvalue().decode('utf-8').splitlines()]
+        self.assertEqual(status, 0)
+        self.assertEqual([record['album']['album_title'] for record in records], ["96", "96"])
+        self.assertEqual(self.transport.requested, [])
+
+    def test_options_for_own_transport(self):
+        for option in (['--cache', os.path.join(self.directory, 'pages.sqlite3')], ['--rate', '5']):
+            with self.assertRaises(SystemExit):
+                self._run(option, [BUGS_URL])
+
+        self.assertEqual(self.transport.requested, [])
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertIsNone(percentile([], 50))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+
+from MusicParser import columnar
+from MusicParser.columnar import ColumnarWriter, export_columnar
+from MusicParser.parser import MusicParser
+from test.support import ALLMUSIC_URL, BUGS_URL, MELON_URL, FixtureTransport
+
+INVALID_URL = "https://example.com/album/1"
+
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+class TestColumnarExport(unittest.TestCase):
+    """Test for exporting albums to album/track tables."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.parser = MusicParser(transport=FixtureTransport())
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_export_csv(self):
+        counts = export_columnar([BUGS_URL, INVALID_URL, MELON_URL, ALLMUSIC_URL], self.directory,
+                                 parser=self.parser, format='csv', chunk_size=5)
+
+        albums = read_csv(os.path.join(self.directory, 'albums.csv'))
+        tracks = read_csv(os.path.join(self.directory, 'tracks.csv'))
+
+        self.assertEqual(counts['albums'], 3)
+        self.assertEqual(counts['errors'], 1)
+        self.assertEqual(counts['tracks'], len(tracks))
+        self.assertEqual(sorted(album['album_id'] for album in albums),
+                         ['allmusic:mw0000101514', 'bugs:450734', 'melon:2281828'])
+
+        # Tracks of each album are joined by album_id.
+        for album in albums:
+            album_tracks = [track for track in tracks if track['album_id'] == album['album_id']]
+            self.assertEqual(len(album_tracks), int(album['track_count']))
+
+        bugs = self.parser.to_album(BUGS_URL)
+        bugs_tracks = [track for track in tracks if track['album_id'] == 'bugs:450734']
+        self.assertEqual([track['track_title'] for track in bugs_tracks],
+                         [track.track_title for track in bugs.tracks])
+
+    def test_flush_by_chunk(self):
+        album = self.parser.to_album(BUGS_URL)
+
+        with ColumnarWriter(self.directory, format='csv', chunk_size=len(album.tracks)) as writer:
+            writer.add(BUGS_URL, album)
+            # Buffers were flushed as soon as chunk_size tracks were collected.
+            self.assertEqual(writer._tracks['album_id'], [])
+            self.assertEqual(len(read_csv(writer.track_path)), len(album.tracks))
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            ColumnarWriter(self.directory, format='xlsx')
+
+    @unittest.skipIf(columnar.pyarrow is None, "pyarrow is not installed")
+    def test_export_parquet(self):
+        import pyarrow.parquet
+
+        counts = export_columnar([BUGS_URL, MELON_URL], self.directory, parser=self.parser, format='parquet')
+
+        albums = pyarrow.parquet.read_table(os.path.join(self.directory, 'albums.parquet'))
+        tracks = pyarrow.parquet.read_table(os.path.join(self.directory, 'tracks.parquet'))
+        self.assertEqual(albums.num_rows, 2)
+        self.assertEqual(tracks.num_rows, counts['tracks'])
+
+
+if __name__ == '__main__':
+    unittest.main()
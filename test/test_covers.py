@@ -0,0 +1,113 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from MusicParser.covers import CoverFetcher, resize_cover_url
+from test.support import make_response
+
+MELON_COVER = ("https://cdnimg.melon.co.kr/cm/album/images/002/28/182/2281828_500.jpg"
+               "/melon/resize/282/quality/80/optimize")
+BUGS_COVER = "https://image.bugsm.co.kr/album/images/200/4507/450734.jpg"
+REISSUE_COVER = "https://image.bugsm.co.kr/album/images/200/4507/450735.jpg"
+ALLMUSIC_COVER = "https://cps-static.rovicorp.com/3/JPG_500/MI0001/380/MI0001380432.jpg?partner=allrovi.com"
+
+
+class CoverTransport(object):
+    """Transport serving cover images, counting requests for each URL."""
+
+    def __init__(self, images):
+        self.images = images
+        self.requested = []
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, stream=False):
+        with self._lock:
+            self.requested.append(url)
+
+        response = make_response(url, self.images.get(url, b''), headers={'Content-Type': 'image/jpeg'},
+                                 status_code=200 if url in self.images else 404)
+        response.raise_for_status()
+        return response
+
+
+class TestCovers(unittest.TestCase):
+    """Test for downloading album covers."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.transport = CoverTransport({
+            MELON_COVER: b'melon' * 100,
+            BUGS_COVER: b'bugs' * 100,
+            REISSUE_COVER: b'bugs' * 100,
+            ALLMUSIC_COVER: b'allmusic' * 100,
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_fetch_and_cache(self):
+        with CoverFetcher(self.directory, transport=self.transport) as fetcher:
+            cover = fetcher.fetch(MELON_COVER)
+            self.assertFalse(cover.cached)
+            self.assertTrue(cover.path.endswith('.jpg'))
+            with open(cover.path, 'rb') as f:
+                self.assertEqual(f.read(), b'melon' * 100)
+
+        # Index is kept in the directory.
+        with CoverFetcher(self.directory, transport=self.transport) as fetcher:
+            self.assertTrue(fetcher.fetch(MELON_COVER).cached)
+
+        self.assertEqual(self.transport.requested, [MELON_COVER])
+
+    def test_deduplicate(self):
+        with CoverFetcher(self.directory, transport=self.transport) as fetcher:
+            results = list(fetcher.fetch_many([BUGS_COVER, REISSUE_COVER, BUGS_COVER, BUGS_COVER]))
+
+            self.assertTrue(all(item.ok for item in results))
+            self.assertEqual(len(set(item.result.path for item in results)), 1)
+            self.assertEqual(self.transport.requested.count(BUGS_COVER), 1)
+            self.assertEqual(fetcher.deduplicated, 1)
+            # Temporary file of the duplicate is removed.
+            self.assertEqual(os.listdir(os.path.dirname(results[0].result.path)),
+                             [os.path.basename(results[0].result.path)])
+
+    def test_evict(self):
+        with CoverFetcher(self.directory, transport=self.transport, max_size=900) as fetcher:
+            melon = fetcher.fetch(MELON_COVER)
+            fetcher.fetch(BUGS_COVER)
+            fetcher.fetch(ALLMUSIC_COVER)
+
+            self.assertEqual(fetcher.evictions, 2)
+            self.assertFalse(os.path.exists(melon.path))
+            self.assertFalse(fetcher.fetch(MELON_COVER).cached)
+
+    def test_resize(self):
+        self.assertEqual(resize_cover_url(MELON_COVER, 1000),
+                         MELON_COVER.replace('/resize/282/', '/resize/1000/'))
+        self.assertEqual(resize_cover_url(BUGS_COVER, 500),
+                         "https://image.bugsm.co.kr/album/images/500/4507/450734.jpg")
+        self.assertEqual(resize_cover_url(ALLMUSIC_COVER, 250), ALLMUSIC_COVER.replace('JPG_500', 'JPG_250'))
+        self.assertEqual(resize_cover_url("https://cdnimg.melon.co.kr/cm/album/images/002/28/182/2281828.jpg", 300),
+                         "https://cdnimg.melon.co.kr/cm/album/images/002/28/182/2281828.jpg"
+                         "/melon/resize/300/quality/80/optimize")
+        # Resizing options are added to the path, before the query.
+        original = "https://cdnimg.melon.co.kr/cm/album/images/002/28/182/2281828_500.jpg"
+        self.assertEqual(resize_cover_url(original + "?1234", 300),
+                         original + "/melon/resize/300/quality/80/optimize?1234")
+        self.assertEqual(resize_cover_url("https://example.com/cover.jpg", 300), "https://example.com/cover.jpg")
+
+    def test_fetch_resized(self):
+        self.transport.images[resize_cover_url(BUGS_COVER, 500)] = b'large'
+
+        with CoverFetcher(self.directory, transport=self.transport, size=500) as fetcher:
+            self.assertEqual(fetcher.fetch(BUGS_COVER).size, 5)
+
+    def test_invalid_url(self):
+        with CoverFetcher(self.directory, transport=self.transport) as fetcher:
+            self.assertRaises(ValueError, fetcher.fetch, "https://example.com/cover.jpg")
+
+
+if __name__ == '__main__':
+    unittest.main()
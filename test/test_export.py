@@ -0,0 +1,80 @@
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from MusicParser.export import JsonLinesWriter, export_jsonl, read_records, skip_written
+from MusicParser.parser import MusicParser
+from test.support import ALLMUSIC_URL, BUGS_URL, MELON_URL, FixtureTransport
+
+INVALID_URL = "https://example.com/album/1"
+
+
+class TestExport(unittest.TestCase):
+    """Test for exporting albums as JSON Lines."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.transport = FixtureTransport()
+        self.parser = MusicParser(transport=self.transport)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_export_to_stream(self):
+        stream = io.StringIO()
+
+        counts = export_jsonl([BUGS_URL, INVALID_URL, MELON_URL], stream, parser=self.parser)
+
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(counts, {'written': 2, 'errors': 1, 'skipped': 0})
+        self.assertEqual([record['url'] for record in records], [BUGS_URL, INVALID_URL, MELON_URL])
+        self.assertEqual(records[0]['album']['artist'], "크라잉넛(Crying Nut), 노브레인(No Brain)")
+        self.assertTrue(records[1]['error'].startswith('InvalidURLError'))
+
+    def _check_resume(self, path):
+        export_jsonl([BUGS_URL, MELON_URL], path, parser=self.parser)
+
+        # Simulate crash while writing a record.
+        with (gzip.open(path, 'ab') if path.endswith('.gz') else open(path, 'ab')) as f:
+            f.write(b'{"url": "https://www.allmusic.com/album/')
+
+        self.transport.requested = []
+        counts = export_jsonl([BUGS_URL, MELON_URL, ALLMUSIC_URL], path, parser=self.parser, resume=True)
+
+        self.assertEqual(counts, {'written': 1, 'errors': 0, 'skipped': 2})
+        self.assertEqual(self.transport.requested, [ALLMUSIC_URL])
+        self.assertEqual([record['url'] for record in read_records(path)], [BUGS_URL, MELON_URL, ALLMUSIC_URL])
+
+    def test_resume(self):
+        self._check_resume(os.path.join(self.directory, 'albums.jsonl'))
+
+    def test_resume_gzip(self):
+        self._check_resume(os.path.join(self.directory, 'albums.jsonl.gz'))
+
+    def test_resume_with_other_input(self):
+        path = os.path.join(self.directory, 'albums.jsonl')
+        export_jsonl([BUGS_URL], path, parser=self.parser)
+
+        with self.assertRaises(ValueError):
+            export_jsonl([MELON_URL, ALLMUSIC_URL], path, parser=self.parser, resume=True)
+
+    def test_skip_written(self):
+        path = os.path.join(self.directory, 'albums.jsonl')
+        export_jsonl([BUGS_URL, MELON_URL], path, parser=self.parser)
+
+        count, urls = skip_written([BUGS_URL, MELON_URL, ALLMUSIC_URL], path)
+
+        self.assertEqual(count, 2)
+        self.assertEqual(list(urls), [ALLMUSIC_URL])
+
+    def test_gzip_stream(self):
+        stream = io.BytesIO()
+        with JsonLinesWriter(stream, compress=True) as writer:
+            writer.write(BUGS_URL, album={'album_title': "96"})
+
+        self.assertEqual(json.loads(gzip.decompress(stream.getvalue())),
+                         {'url': BUGS_URL, 'album': {'album_title': "96"}})
@@ -0,0 +1,52 @@
+import unittest
+
+from bs4 import BeautifulSoup
+
+from MusicParser.extract import scan, selector
+
+ROW = ('<tr><td><p class="index first"><em>3</em></p></td>'
+       '<td><p class="title"><span>Title</span><a href="#">Link</a></p><a class="more">Outside</a></td>'
+       '<td><p class="artist"><a>A</a><a class="more">B</a></p></td>'
+       '<th scope="row">Row header</th></tr>')
+
+SELECTORS = (
+    selector('index', 'p', 'index'),
+    selector('index_em', 'em', within='index'),
+    selector('title', 'p', 'title'),
+    selector('title_a', 'a', within='title'),
+    selector('artist', 'p', 'artist'),
+    selector('more', 'a', 'more', within='artist'),
+    selector('artists', 'a', within='artist', many=True),
+    selector('disk', 'th', attr=('scope', 'colgroup')),
+    selector('header', 'th', attr=('scope', 'row')),
+)
+
+
+class TestExtract(unittest.TestCase):
+    """Test for finding tags of a row in one traversal."""
+
+    def setUp(self):
+        self.row = BeautifulSoup('<table>' + ROW + '</table>', 'html.parser').tr
+
+    def test_scan(self):
+        tags = scan(self.row, SELECTORS)
+
+        self.assertEqual(tags['index_em'].text, "3")
+        self.assertEqual(tags['title_a'].text, "Link")
+        # 'a.more' in title is not in artist.
+        self.assertEqual(tags['more'].text, "B")
+        self.assertEqual([tag.text for tag in tags['artists']], ["A", "B"])
+        self.assertIsNone(tags['disk'])
+        self.assertEqual(tags['header'].text, "Row header")
+
+    def test_same_as_find(self):
+        tags = scan(self.row, SELECTORS)
+
+        self.assertIs(tags['index'], self.row.find('p', class_='index'))
+        self.assertIs(tags['title_a'], self.row.find('p', class_='title').find('a'))
+        self.assertIs(tags['more'], self.row.find('p', class_='artist').find('a', class_='more'))
+        self.assertEqual(tags['artists'], self.row.find('p', class_='artist').find_all('a'))
+
+
+if __name__ == '__main__':
+    unittest.main()
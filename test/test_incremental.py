@@ -0,0 +1,133 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from MusicParser.cache import ResponseCache
+from MusicParser.incremental import FingerprintStore, IncrementalCrawler, diff_albums
+from MusicParser.parser import MusicParser
+from MusicParser.transport import Transport
+from test.support import BUGS_URL, FIXTURES, MELON_URL, make_response, read_fixture
+
+
+class EditableTransport(object):
+    """Transport serving pages which can be changed, with ETag of each version."""
+
+    def __init__(self, use_etag=False):
+        self.pages = {url: read_fixture(file_name) for url, file_name in FIXTURES.items()}
+        self.versions = {url: 1 for url in FIXTURES}
+        self.use_etag = use_etag
+        self.requested = []
+
+    def edit(self, url, old, new):
+        self.pages[url] = self.pages[url].replace(old.encode('utf-8'), new.encode('utf-8'))
+        self.versions[url] += 1
+
+    def get(self, url, headers=None, stream=False):
+        self.requested.append((url, dict(headers or {})))
+
+        response_headers = {'Content-Type': 'text/html; charset=utf-8'}
+        if self.use_etag:
+            etag = response_headers['ETag'] = '"%d"' % self.versions[url]
+            if (headers or {}).get('If-None-Match') == etag:
+                return make_response(url, b'', status_code=304, headers=response_headers)
+
+        return make_response(url, self.pages[url], headers=response_headers)
+
+
+class CachedSiteTransport(Transport):
+    """Transport with response cache, sending requests to site (EditableTransport) instead of network."""
+
+    def __init__(self, site, **kwargs):
+        super().__init__(**kwargs)
+        self.site = site
+
+    def _send(self, url, headers=None, stream=False):
+        return self.site.get(url, headers=headers, stream=stream)
+
+
+class TestIncrementalCrawler(unittest.TestCase):
+    """Test for re-crawling only changed albums."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = FingerprintStore(os.path.join(self.directory, 'fingerprints.sqlite3'))
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.directory)
+
+    def _make_crawler(self, transport):
+        return IncrementalCrawler(self.store, parser=MusicParser(transport=transport))
+
+    def test_new_and_unchanged(self):
+        crawler = self._make_crawler(EditableTransport())
+
+        changes = list(crawler.recrawl([BUGS_URL, MELON_URL]))
+        self.assertEqual(sorted(change.status for change in changes), ['new', 'new'])
+        self.assertEqual(len(self.store), 2)
+
+        self.assertEqual(list(crawler.recrawl([BUGS_URL, MELON_URL])), [])
+        self.assertEqual(crawler.counts['unchanged'], 2)
+
+    def test_not_modified(self):
+        transport = EditableTransport(use_etag=True)
+        crawler = self._make_crawler(transport)
+        crawler.check(BUGS_URL)
+
+        change = crawler.check(BUGS_URL)
+
+        self.assertEqual(change.status, 'not_modified')
+        self.assertEqual(transport.requested[-1][1], {'If-None-Match': '"1"'})
+
+    def test_change_outside_album_regions(self):
+        transport = EditableTransport()
+        crawler = self._make_crawler(transport)
+        crawler.check(BUGS_URL)
+
+        transport.edit(BUGS_URL, '</body>', '<div class="ad">new ad</div></body>')
+
+        self.assertEqual(crawler.check(BUGS_URL).status, 'unchanged')
+
+    def test_changed_album(self):
+        transport = EditableTransport()
+        crawler = self._make_crawler(transport)
+        old_album = crawler.check(BUGS_URL).album
+
+        old_title = old_album['tracks'][0]['track_title']
+        transport.edit(BUGS_URL, old_title, old_title + ' (Remastered)')
+
+        change = crawler.check(BUGS_URL)
+        self.assertEqual(change.status, 'changed')
+        self.assertEqual(change.diff['tracks']['changed'][0]['new']['track_title'], old_title + ' (Remastered)')
+        self.assertEqual(self.store.get(BUGS_URL).album, change.album)
+
+    def test_transport_with_cache(self):
+        site = EditableTransport()
+        cache = ResponseCache(os.path.join(self.directory, 'responses.sqlite3'), ttl=60)
+        crawler = self._make_crawler(CachedSiteTransport(site, cache=cache))
+        old_album = crawler.check(BUGS_URL).album
+
+        old_title = old_album['tracks'][0]['track_title']
+        site.edit(BUGS_URL, old_title, old_title + ' (Remastered)')
+
+        # Page is requested from site, not read from cache.
+        self.assertEqual(crawler.check(BUGS_URL).status, 'changed')
+        self.assertEqual(len(site.requested), 2)
+        cache.close()
+
+    def test_diff_albums(self):
+        old = {'artist': 'A', 'album_title': 'T', 'album_cover': 'C',
+               'tracks': [{'disk': 1, 'track_num': 1, 'track_title': 'X', 'track_artist': 'A'}]}
+        new = {'artist': 'B', 'album_title': 'T', 'album_cover': 'C',
+               'tracks': [{'disk': 1, 'track_num': 2, 'track_title': 'Y', 'track_artist': 'A'}]}
+
+        self.assertEqual(diff_albums(old, old), {})
+        self.assertEqual(diff_albums(old, new), {
+            'artist': {'old': 'A', 'new': 'B'},
+            'tracks': {'added': new['tracks'], 'removed': old['tracks']},
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
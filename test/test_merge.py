@@ -0,0 +1,84 @@
+import unittest
+
+from MusicParser.merge import AlbumIndex, align_tracks, artist_keys, merge_albums, normalize
+from MusicParser.parser import MusicParser
+from test.support import ALLMUSIC_URL, BUGS_URL, MELON_URL, FixtureTransport
+
+
+class TestMerge(unittest.TestCase):
+    """Test for merging the same album from several sites."""
+
+    @classmethod
+    def setUpClass(cls):
+        parser = MusicParser(transport=FixtureTransport())
+        cls.albums = [(url, parser.to_dict(url)) for url in (BUGS_URL, MELON_URL, ALLMUSIC_URL)]
+
+    def test_normalize(self):
+        self.assertEqual(normalize("Rock & Roll!"), normalize("rock&roll"))
+        self.assertEqual(normalize("Ｒｏｃｋ"), "rock")
+        self.assertEqual(artist_keys("크라잉넛(Crying Nut), 노브레인(No Brain)"),
+                         {"크라잉넛", "cryingnut", "노브레인", "nobrain"})
+        self.assertEqual(artist_keys("크라잉넛 (CRYING NUT), 노브레인"), {"크라잉넛", "cryingnut", "노브레인"})
+
+    def test_align_tracks(self):
+        tracks = [{'track_title': "A"}, {'track_title': "B"}, {'track_title': "B"}]
+        other_tracks = [{'track_title': "b"}, {'track_title': "C"}, {'track_title': "b "}]
+
+        pairs = align_tracks(tracks, other_tracks)
+
+        self.assertEqual(pairs, [(tracks[0], None), (tracks[1], other_tracks[0]), (tracks[2], other_tracks[2]),
+                                 (None, other_tracks[1])])
+
+    def test_index(self):
+        index = AlbumIndex()
+        index.add_many(self.albums)
+
+        self.assertEqual(len(index), 3)
+        groups = sorted(index.groups(), key=len)
+        self.assertEqual([[entry.site for entry in group] for group in groups], [['allmusic'], ['bugs', 'melon']])
+        self.assertEqual([entry.url for entry in index.find("크라잉넛", "96")], [BUGS_URL, MELON_URL])
+        self.assertEqual(index.find("Someone Else", "96"), [])
+
+        # Another album of the same site is not grouped together.
+        index.add(BUGS_URL.replace('450734', '1'), self.albums[0][1])
+        self.assertEqual(len(list(index.groups())), 3)
+
+    def test_merge(self):
+        index = AlbumIndex()
+        index.add_many(self.albums[:2])
+
+        merged, = index.merged()
+
+        self.assertEqual(merged['artist'], "크라잉넛 (CRYING NUT), 노브레인")
+        self.assertEqual(merged['provenance'], {'artist': 'melon', 'album_title': 'melon', 'album_cover': 'melon'})
+        self.assertEqual(list(merged['sources'].items()), [('melon', MELON_URL), ('bugs', BUGS_URL)])
+        self.assertEqual([(track['track_title'], track['sources']) for track in merged['tracks']], [
+            ("명동콜링", ['melon', 'bugs']),
+            ("청춘 96 (Inst.)", ['melon']),
+            ("Rock & Roll", ['melon', 'bugs']),
+            ("청춘 96", ['bugs']),
+            ("말달리자 (Live)", ['bugs']),
+            ("넌 내게 반했어", ['bugs']),
+        ])
+
+    def test_merge_missing_field(self):
+        bugs_url, bugs = self.albums[0]
+        melon_url, melon = self.albums[1]
+        melon = dict(melon, album_cover=None, tracks=[dict(melon['tracks'][0], track_artist='')])
+        index = AlbumIndex()
+        entries = [index.add(bugs_url, bugs), index.add(melon_url, melon)]
+
+        merged = merge_albums(entries)
+
+        self.assertEqual(merged['album_cover'], bugs['album_cover'])
+        self.assertEqual(merged['provenance']['album_cover'], 'bugs')
+        self.assertEqual(merged['tracks'][0]['track_artist'], "크라잉넛(Crying Nut)")
+        self.assertEqual(merged['tracks'][0]['provenance'],
+                         {'disk': 'melon', 'track_num': 'melon', 'track_title': 'melon', 'track_artist': 'bugs'})
+
+        self.assertEqual(merge_albums(entries, priority=('bugs', 'melon'))['artist'], bugs['artist'])
+        self.assertRaises(ValueError, merge_albums, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import asyncio
+import unittest
+
+from MusicParser.metrics import CallbackSink, StatsSink
+from MusicParser.parser import MusicParser
+from test.support import BUGS_URL, FIXTURES, MELON_URL, FixtureTransport, read_fixture
+
+
+class TestMetrics(unittest.TestCase):
+    """Test for metrics of each parsing stage."""
+
+    def test_stats_sink(self):
+        sink = StatsSink()
+        parser = MusicParser(transport=FixtureTransport(), metrics=sink)
+
+        self.assertIn("크라잉넛", parser.to_json(BUGS_URL))
+        parser.to_dict(MELON_URL)
+
+        summary = sink.summary()
+        self.assertEqual(set(summary), {'bugs', 'melon'})
+        self.assertEqual(set(summary['bugs']), {'fetch', 'decode', 'tree_build', 'get_artist', 'get_track_list',
+                                                'serialize', 'bytes_downloaded', 'track_count'})
+        self.assertEqual(summary['bugs']['track_count']['total'], 5)
+        self.assertEqual(summary['bugs']['bytes_downloaded']['total'], len(read_fixture(FIXTURES[BUGS_URL])))
+        self.assertNotIn('serialize', summary['melon'])
+
+    def test_callback_sink_with_async(self):
+        timings = []
+        counts = []
+        parser = MusicParser(transport=FixtureTransport(),
+                             metrics=CallbackSink(lambda *args: timings.append(args),
+                                                  lambda *args: counts.append(args)))
+
+        asyncio.run(parser.to_dict_async(MELON_URL))
+
+        self.assertEqual([name for name, _, _ in timings],
+                         ['fetch', 'decode', 'tree_build', 'get_artist', 'get_track_list'])
+        self.assertEqual(counts, [('bytes_downloaded', len(read_fixture(FIXTURES[MELON_URL])), 'melon'),
+                                  ('track_count', 3, 'melon')])
+
+    def test_process_pool(self):
+        sink = StatsSink()
+        parser = MusicParser(transport=FixtureTransport(), metrics=sink)
+
+        results = list(parser.to_dict_many([BUGS_URL, MELON_URL], processes=2))
+
+        self.assertTrue(all(item.ok for item in results))
+        summary = sink.summary()
+        for site in ('bugs', 'melon'):
+            # Stages in worker processes are sent to the sink too.
+            self.assertEqual(set(summary[site]), {'fetch', 'decode', 'tree_build', 'get_artist', 'get_track_list',
+                                                  'bytes_downloaded', 'track_count'})
+        self.assertEqual(summary['bugs']['track_count']['total'], 5)
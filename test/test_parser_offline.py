@@ -0,0 +1,100 @@
+import unittest
+
+from MusicParser.parser import AllMusicParser, BugsParser, MelonParser, MusicParser, get_default_backend
+from test.support import ALLMUSIC_URL, BUGS_URL, FIXTURES, MELON_URL, FixtureTransport, make_response, read_fixture
+
+try:
+    import lxml
+except ImportError:
+    lxml = None
+
+
+class NoCharsetTransport(FixtureTransport):
+    """Transport serving saved pages with Content-Type header without charset."""
+
+    def get(self, url, headers=None, stream=False):
+        return make_response(url, read_fixture(FIXTURES[url]), headers={'Content-Type': 'text/html'})
+
+
+class TestParserOffline(unittest.TestCase):
+    """Test for parsers with saved album pages."""
+
+    bugs_expected = {
+        'artist': "크라잉넛(Crying Nut), 노브레인(No Brain)",
+        'album_title': "96",
+        'album_cover': "https://image.bugsm.co.kr/album/images/200/4507/450734.jpg",
+        'tracks': [
+            {'disk': 1, 'track_num': 1, 'track_title': "명동콜링", 'track_artist': "크라잉넛(Crying Nut)"},
+            {'disk': 1, 'track_num': 2, 'track_title': "청춘 96",
+             'track_artist': "크라잉넛(Crying Nut), 노브레인(No Brain)"},
+            {'disk': 1, 'track_num': 3, 'track_title': "Rock & Roll", 'track_artist': "노브레인(No Brain)"},
+            {'disk': 2, 'track_num': 1, 'track_title': "말달리자 (Live)", 'track_artist': "크라잉넛(Crying Nut)"},
+            {'disk': 2, 'track_num': 2, 'track_title': "넌 내게 반했어", 'track_artist': "노브레인(No Brain)"},
+        ]
+    }
+
+    melon_expected = {
+        'artist': "크라잉넛 (CRYING NUT), 노브레인",
+        'album_title': "96",
+        'album_cover': "https://cdnimg.melon.co.kr/cm/album/images/002/28/182/2281828_500.jpg"
+                       "/melon/resize/282/quality/80/optimize",
+        'tracks': [
+            {'disk': 1, 'track_num': 1, 'track_title': "명동콜링", 'track_artist': "크라잉넛 (CRYING NUT)"},
+            {'disk': 1, 'track_num': 2, 'track_title': "청춘 96 (Inst.)",
+             'track_artist': "크라잉넛 (CRYING NUT), 노브레인"},
+            {'disk': 2, 'track_num': 1, 'track_title': "Rock & Roll", 'track_artist': "노브레인"},
+        ]
+    }
+
+    allmusic_expected = {
+        'artist': "Original Soundtrack",
+        'album_title': "Judgment Night",
+        'album_cover': "https://cps-static.rovicorp.com/3/JPG_500/MI0001/380/MI0001380432.jpg?partner=allrovi.com",
+        'tracks': [
+            {'disk': 1, 'track_num': 1, 'track_title': "Just Another Victim",
+             'track_artist': "Helmet, House of Pain"},
+            {'disk': 1, 'track_num': 2, 'track_title': "Fallin'", 'track_artist': "Teenage Fanclub, De La Soul"},
+            {'disk': 2, 'track_num': 1, 'track_title': "Judgment Night", 'track_artist': "Onyx"},
+        ]
+    }
+
+    def _check_backend(self, backend):
+        transport = FixtureTransport()
+
+        self.assertEqual(BugsParser(transport=transport, backend=backend).to_dict(BUGS_URL), self.bugs_expected)
+        self.assertEqual(MelonParser(transport=transport, backend=backend).to_dict(MELON_URL), self.melon_expected)
+        self.assertEqual(AllMusicParser(transport=transport, backend=backend).to_dict(ALLMUSIC_URL),
+                         self.allmusic_expected)
+
+    def test_html_parser_backend(self):
+        self._check_backend("html.parser")
+
+    @unittest.skipIf(lxml is None, "lxml is not installed.")
+    def test_lxml_backend(self):
+        self._check_backend("lxml")
+
+    def test_default_backend(self):
+        self.assertEqual(MusicParser().backend, get_default_backend())
+        self.assertEqual(MusicParser(backend="html.parser").backend, "html.parser")
+
+    def test_partial_parsing(self):
+        transport = FixtureTransport()
+
+        for parser_class, url in [(BugsParser, BUGS_URL), (MelonParser, MELON_URL), (AllMusicParser, ALLMUSIC_URL)]:
+            partial_parser = parser_class(transport=transport)
+            full_parser = parser_class(transport=transport, partial=False)
+
+            self.assertTrue(partial_parser.partial)
+            self.assertEqual(partial_parser.to_dict(url), full_parser.to_dict(url))
+
+            # Navigation, scripts and footer are not built into the tree.
+            soup = partial_parser._get_original_data(url)
+            self.assertIsNone(soup.find('script'))
+            self.assertIsNone(soup.find(id='footer'))
+
+    def test_page_without_charset(self):
+        # requests would decode it as ISO-8859-1. Parsers use encoding of the site.
+        parser = MusicParser(transport=NoCharsetTransport())
+
+        self.assertEqual(parser.to_dict(BUGS_URL), self.bugs_expected)
+        self.assertEqual(parser.to_dict(MELON_URL), self.melon_expected)
@@ -0,0 +1,71 @@
+import pickle
+import unittest
+
+from MusicParser.cache import AlbumCache
+
+from MusicParser.parser import AllMusicParser, MusicParser
+from MusicParser.records import Album, Track
+from test.support import ALLMUSIC_URL, BUGS_URL, FixtureTransport
+
+
+class TestRecords(unittest.TestCase):
+    """Test for Album and Track records."""
+
+    def test_to_album(self):
+        album = MusicParser(transport=FixtureTransport()).to_album(BUGS_URL)
+
+        self.assertIsInstance(album, Album)
+        self.assertEqual(album.album_title, "96")
+        self.assertEqual(album.tracks[1], Track(1, 2, "청춘 96", "크라잉넛(Crying Nut), 노브레인(No Brain)"))
+        self.assertFalse(hasattr(album.tracks[0], '__dict__'))
+
+    def test_track_num_is_int(self):
+        result = AllMusicParser(transport=FixtureTransport()).to_dict(ALLMUSIC_URL)
+
+        self.assertEqual([track['track_num'] for track in result['tracks']], [1, 2, 1])
+
+    def test_dict_conversion(self):
+        parser = MusicParser(transport=FixtureTransport())
+        album = parser.to_album(BUGS_URL)
+
+        self.assertEqual(album.to_dict(), parser.to_dict(BUGS_URL))
+        self.assertEqual(list(album.to_dict()), ['artist', 'album_title', 'album_cover', 'tracks'])
+        self.assertEqual(list(album.to_dict()['tracks'][0]), ['disk', 'track_num', 'track_title', 'track_artist'])
+        self.assertEqual(Album.from_dict(album.to_dict()), album)
+
+    def test_pickle(self):
+        album = MusicParser(transport=FixtureTransport()).to_album(BUGS_URL)
+
+        self.assertEqual(pickle.loads(pickle.dumps(album)), album)
+
+    def test_read_only(self):
+        album = MusicParser(transport=FixtureTransport()).to_album(BUGS_URL)
+
+        self.assertIsInstance(album.tracks, tuple)
+        with self.assertRaises(AttributeError):
+            album.album_title = "Changed"
+        with self.assertRaises(AttributeError):
+            album.tracks[0].track_title = "Changed"
+        with self.assertRaises(AttributeError):
+            del album.artist
+
+    def test_cached_album_is_not_changed(self):
+        transport = FixtureTransport()
+        parser = MusicParser(transport=transport, album_cache=AlbumCache())
+        album = parser.to_album(BUGS_URL)
+        expected = album.to_dict()
+
+        with self.assertRaises(AttributeError):
+            album.tracks.append(Track(9, 9, "Changed", "Changed"))
+        result = parser.to_dict(BUGS_URL)
+        result['tracks'].pop()
+        result['album_title'] = "Changed"
+
+        # Cache hits are the same as the first result.
+        self.assertEqual(parser.to_dict(BUGS_URL), expected)
+        self.assertEqual(parser.to_album(BUGS_URL), album)
+        self.assertEqual(len(transport.requested), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import requests
+
+from MusicParser.parser import MusicParser
+from MusicParser.replay import (LocalAsyncTransport, LocalTransport, PageStore, RecordingTransport, ReplayServer,
+                                ReplayTransport, rewrite_url)
+from MusicParser.transport import Transport
+from test.support import ALLMUSIC_URL, BUGS_URL, MELON_URL, FixtureTransport
+
+
+class TestReplay(unittest.TestCase):
+    """Test for recording pages and replaying them without sites."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = PageStore(os.path.join(self.directory, 'pages.sqlite3'))
+        self.fixture_transport = FixtureTransport()
+
+        parser = MusicParser(transport=RecordingTransport(self.store, self.fixture_transport))
+        self.expected = {url: parser.to_dict(url) for url in (BUGS_URL, MELON_URL, ALLMUSIC_URL)}
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.directory)
+
+    def test_store(self):
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual(self.store.urls(), sorted([BUGS_URL, MELON_URL, ALLMUSIC_URL]))
+
+        # Pages are keyed by normalized album URL.
+        page = self.store.get("http://www.melon.com/album/detail.htm?albumId=2281828&ref=search")
+        self.assertEqual(page.url, MELON_URL)
+        self.assertEqual(page.content_type, 'text/html; charset=utf-8')
+        self.assertIsNone(self.store.get("https://music.bugs.co.kr/album/1"))
+
+    def test_replay_transport(self):
+        parser = MusicParser(transport=ReplayTransport(self.store))
+
+        for url, album in self.expected.items():
+            self.assertEqual(parser.to_dict(url), album)
+        self.assertRaises(requests.HTTPError, parser.to_dict, "https://music.bugs.co.kr/album/1")
+
+    def test_rewrite_url(self):
+        self.assertEqual(rewrite_url("http://127.0.0.1:8000/", MELON_URL),
+                         "http://127.0.0.1:8000/www.melon.com/album/detail.htm?albumId=2281828")
+        self.assertEqual(rewrite_url("http://127.0.0.1:8000", BUGS_URL),
+                         "http://127.0.0.1:8000/music.bugs.co.kr/album/450734")
+
+    def test_local_async_transport(self):
+        class PageAsyncTransport(object):
+            async def get_content(self, url):
+                return url.encode('utf-8'), 'text/plain'
+
+        transport = LocalAsyncTransport("http://127.0.0.1:8000", PageAsyncTransport())
+
+        self.assertEqual(asyncio.run(transport.get_content(BUGS_URL)),
+                         (rewrite_url("http://127.0.0.1:8000", BUGS_URL).encode('utf-8'), 'text/plain'))
+
+    def test_server(self):
+        with ReplayServer(self.store) as server, Transport(retries=0) as transport:
+            parser = MusicParser(transport=LocalTransport(server.url, transport))
+
+            results = list(parser.to_dict_many(list(self.expected) + ["https://music.bugs.co.kr/album/1"]))
+
+            self.assertEqual([item.result for item in results[:3]], list(self.expected.values()))
+            self.assertEqual(results[3].error.response.status_code, 404)
+            self.assertEqual(server.requests, 4)
+            self.assertEqual(server.errors, 0)
+
+    def test_server_errors_and_latency(self):
+        with ReplayServer(self.store, latency=0.05, error_rate=1) as server, Transport(retries=0) as transport:
+            local_transport = LocalTransport(server.url, transport)
+
+            start = time.perf_counter()
+            self.assertRaises(requests.HTTPError, local_transport.get, BUGS_URL)
+            self.assertGreaterEqual(time.perf_counter() - start, 0.05)
+            self.assertEqual(server.errors, 1)
+
+    def test_server_bandwidth(self):
+        size = len(self.store.get(BUGS_URL).content)
+
+        with ReplayServer(self.store, bandwidth=size * 10) as server, Transport(retries=0) as transport:
+            start = time.perf_counter()
+            response = LocalTransport(server.url, transport).get(BUGS_URL)
+
+            self.assertEqual(len(response.content), size)
+            self.assertGreaterEqual(time.perf_counter() - start, 0.09)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+from MusicParser import router
+from MusicParser.cache import AlbumCache
+from MusicParser.metrics import StatsSink
+from MusicParser.parser import BugsParser, InvalidURLError, MusicParser, get_site_parser
+from test.support import BUGS_URL, FixtureTransport
+
+
+class TestRouter(unittest.TestCase):
+    """Test for routing URLs to music sites."""
+
+    def test_route(self):
+        self.assertEqual(router.route("https://music.bugs.co.kr/album/450734?wl_ref=list_ab_03"),
+                         router.Route('bugs', '450734', "https://music.bugs.co.kr/album/450734"))
+        self.assertEqual(router.route("http://www.melon.com/album/detail.htm?albumId=2281828#comments"),
+                         router.Route('melon', '2281828', "https://www.melon.com/album/detail.htm?albumId=2281828"))
+        self.assertEqual(router.route("https://www.allmusic.com/album/judgment-night-mw0000101514/credits"),
+                         router.Route('allmusic', 'mw0000101514',
+                                      "https://www.allmusic.com/album/judgment-night-mw0000101514"))
+
+    def test_route_without_host(self):
+        self.assertEqual(router.route("bugs.co.kr/album/450734").url, "https://music.bugs.co.kr/album/450734")
+        self.assertIsNone(router.route("https://music.bugs.co.kr/artist/80003"))
+        self.assertIsNone(router.route("https://example.com/album/1"))
+        self.assertIsNone(router.route("http://[invalid"))
+
+    def test_classify_many(self):
+        routes = MusicParser.classify_many([BUGS_URL, "https://example.com/", "melon.com/album/detail.htm?albumId=1"])
+
+        self.assertEqual([route.site if route else None for route in routes], ['bugs', None, 'melon'])
+
+    def test_site_parsers_are_reused(self):
+        _, parser1 = MusicParser.check_input(BUGS_URL)
+        _, parser2 = MusicParser.check_input(BUGS_URL + "?x=1")
+
+        self.assertIs(parser1, parser2)
+        self.assertIs(parser1, get_site_parser('bugs'))
+        self.assertIsInstance(parser1, BugsParser)
+        self.assertRaises(InvalidURLError, MusicParser.check_input, "https://example.com/album/1")
+
+    def test_site_parsers_share_settings(self):
+        transport = FixtureTransport()
+        parser = MusicParser(transport=transport)
+
+        parser.to_dict(BUGS_URL)
+        parser.to_dict(BUGS_URL)
+
+        self.assertIs(parser._get_site_parser('bugs'), parser._get_site_parser('bugs'))
+        self.assertIs(parser._get_site_parser('bugs').transport, transport)
+        self.assertIsNot(parser._get_site_parser('bugs'), get_site_parser('bugs'))
+
+    def test_changed_settings_are_used(self):
+        parser = MusicParser(transport=FixtureTransport())
+        parser.to_dict(BUGS_URL)
+
+        transport = FixtureTransport()
+        sink = StatsSink()
+        parser.transport = transport
+        parser.metrics = sink
+        parser.album_cache = AlbumCache()
+        parser.backend = 'html.parser'
+        parser.partial = False
+        parser.to_dict(BUGS_URL)
+
+        self.assertEqual(transport.requested, [BUGS_URL])
+        self.assertIn('bugs', sink.summary())
+        self.assertEqual(len(parser.album_cache), 1)
+        self.assertEqual(parser._get_site_parser('bugs').backend, 'html.parser')
+        self.assertFalse(parser._get_site_parser('bugs').partial)
@@ -0,0 +1,160 @@
+import threading
+import time
+import unittest
+
+from MusicParser.parser import MusicParser, ParseError
+from MusicParser.scheduler import BULK, INTERACTIVE, HostScheduler, Scheduler, TokenBucket, get_priority, priority
+from MusicParser.transport import Transport
+from test.support import BUGS_URL, LocalServer, make_response
+
+
+class TestScheduler(unittest.TestCase):
+    """Test for rate limits and adaptive concurrency of each host."""
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(rate=10, burst=2)
+
+        self.assertEqual(bucket.try_acquire(), 0)
+        self.assertEqual(bucket.try_acquire(), 0)
+        self.assertGreater(bucket.try_acquire(), 0)
+
+    def test_rate_limit(self):
+        scheduler = Scheduler(rate=20, burst=1)
+
+        start = time.monotonic()
+        for _ in range(5):
+            scheduler.call('https://music.bugs.co.kr/', lambda: make_response('', b''))
+
+        # First request uses the burst, and the others wait for 1/20 second each.
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+
+    def test_back_off_and_recover(self):
+        host = HostScheduler(concurrency=8, cooldown=0)
+
+        host.acquire()
+        host.release(503, 0.1)
+        self.assertEqual(host.limit, 4)
+
+        for _ in range(20):
+            host.acquire()
+            host.release(200, 0.1)
+        self.assertGreater(host.limit, 4)
+        self.assertLessEqual(host.limit, host.max_concurrency)
+
+    def test_back_off_on_latency(self):
+        host = HostScheduler(concurrency=8, cooldown=0)
+        for _ in range(5):
+            host.acquire()
+            host.release(200, 0.1)
+        limit = host.limit
+
+        host.acquire()
+        host.release(200, 5.0)
+
+        self.assertLess(host.limit, limit)
+
+    def test_priority(self):
+        host = HostScheduler(concurrency=1)
+        host.acquire()
+
+        served = []
+
+        def request(level, name):
+            host.acquire(level)
+            served.append(name)
+            host.release(200, 0.01)
+
+        bulk = threading.Thread(target=request, args=(BULK, 'bulk'))
+        bulk.start()
+        time.sleep(0.05)
+        interactive = threading.Thread(target=request, args=(INTERACTIVE, 'interactive'))
+        interactive.start()
+        time.sleep(0.05)
+
+        host.release(200, 0.01)
+        bulk.join()
+        interactive.join()
+
+        self.assertEqual(served, ['interactive', 'bulk'])
+
+    def test_retries_through_scheduler(self):
+        scheduler = CountingScheduler()
+
+        with LocalServer() as server:
+            url = 'http://127.0.0.1:%d/flaky' % server.server_address[1]
+            server.failures = 2
+            with Transport(retries=2, backoff_factor=0, scheduler=scheduler) as transport:
+                self.assertEqual(transport.get(url).status_code, 200)
+
+            server.failures = 3
+            with Transport(retries=2, backoff_factor=0, scheduler=scheduler) as transport:
+                self.assertRaises(Exception, transport.get, url)
+
+        # Each attempt waited for the scheduler, and adapter didn't retry by itself.
+        self.assertEqual(scheduler.calls, 6)
+        self.assertEqual(len(server.requests), 6)
+        self.assertEqual(scheduler.stats()['127.0.0.1']['in_flight'], 0)
+
+    def test_priority_context(self):
+        self.assertEqual(get_priority(), INTERACTIVE)
+        with priority(BULK):
+            self.assertEqual(get_priority(), BULK)
+        self.assertEqual(get_priority(), INTERACTIVE)
+
+    def test_transport_with_scheduler(self):
+        scheduler = Scheduler()
+
+        with LocalServer() as server:
+            url = 'http://127.0.0.1:%d/flaky' % server.server_address[1]
+            server.failures = 1
+            with Transport(retries=0, scheduler=scheduler) as transport:
+                self.assertRaises(Exception, transport.get, url)
+                self.assertEqual(transport.get(url).status_code, 200)
+
+        self.assertEqual(scheduler.stats()['127.0.0.1']['in_flight'], 0)
+        self.assertLess(scheduler.stats()['127.0.0.1']['limit'], 4)
+
+
+class CountingScheduler(Scheduler):
+    """Scheduler counting requests sent through it."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = 0
+
+    def call(self, url, send):
+        self.calls += 1
+        return super().call(url, send)
+
+
+class ErrorPageTransport(object):
+    """Transport returning an error page with status 200, like throttled sites."""
+
+    def __init__(self, page=b'<html><body><h1>Too many requests</h1></body></html>'):
+        self.page = page
+
+    def get(self, url, headers=None, stream=False):
+        return make_response(url, self.page)
+
+
+class TestParseError(unittest.TestCase):
+    """Test for pages without album information."""
+
+    def test_error_page(self):
+        parser = MusicParser(transport=ErrorPageTransport())
+
+        self.assertRaises(ParseError, parser.to_dict, BUGS_URL)
+
+    def test_error_page_without_image_source(self):
+        # Page has album regions, but its image has no 'src' attribute.
+        page = ('<html><body><header class="pgTitle"><h1>Error</h1></header>'
+                '<table class="info"><tr><th>Artist</th><td>Unknown</td></tr></table>'
+                '<div class="photos"><img alt="No image"></div>'
+                '<table class="trackList"><tr><th>Title</th></tr></table></body></html>')
+        parser = MusicParser(transport=ErrorPageTransport(page.encode('utf-8')))
+
+        self.assertRaises(ParseError, parser.to_dict, BUGS_URL)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import threading
+import unittest
+
+from MusicParser.parser import InvalidURLError
+from MusicParser.search import MELON_ALBUM_URL, SEARCH_URLS, AlbumResolver, find_album_urls, normalize_query
+from test.support import ALLMUSIC_URL, BUGS_URL, MELON_URL, FixtureTransport, make_response
+
+MELON_RESULT = ('<ul><li><a href="javascript:melon.link.goAlbumDetail(\'2281828\');">Album</a></li>'
+                '<li><a href="javascript:melon.link.goAlbumDetail(\'2281828\');">Again</a></li>'
+                '<li><a href="/artist/detail.htm?artistId=1">Artist</a></li></ul>')
+BUGS_RESULT = ('<ul><li><a href="/album/450734?wl_ref=list_ab_01">Album</a></li>'
+               '<li><a href="https://www.melon.com/album/detail.htm?albumId=1">Other site</a></li></ul>')
+ALLMUSIC_RESULT = '<div class="title"><a href="/album/judgment-night-mw0000101514">Judgment Night</a></div>'
+EMPTY_RESULT = '<p>No results.</p>'
+
+
+class SearchTransport(FixtureTransport):
+    """Transport serving search result pages for queries, and saved album pages."""
+
+    def __init__(self, results):
+        super().__init__()
+        self.results = results
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, stream=False):
+        for (site, query), text in self.results.items():
+            if url == SEARCH_URLS[site](query):
+                with self._lock:
+                    self.requested.append(url)
+                return make_response(url, text.encode('utf-8'), headers={'Content-Type': 'text/html'})
+
+        for make_url in SEARCH_URLS.values():
+            if url.startswith(make_url('')):
+                with self._lock:
+                    self.requested.append(url)
+                return make_response(url, EMPTY_RESULT.encode('utf-8'))
+
+        with self._lock:
+            return super().get(url, headers=headers, stream=stream)
+
+
+class TestSearch(unittest.TestCase):
+    """Test for finding album URLs from artist and title."""
+
+    def setUp(self):
+        self.transport = SearchTransport({
+            ('melon', 'crying nut 96'): MELON_RESULT,
+            ('bugs', 'crying nut 96'): BUGS_RESULT,
+            ('allmusic', 'original soundtrack judgment night'): ALLMUSIC_RESULT,
+        })
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query("  Crying  Nut ", "\t96"), "crying nut 96")
+        self.assertEqual(normalize_query(None, "96"), "96")
+
+    def test_search_url(self):
+        # '/' in query is not a separator of path.
+        self.assertEqual(SEARCH_URLS['allmusic']("ac/dc back in black"),
+                         "https://www.allmusic.com/search/albums/ac%2Fdc%20back%20in%20black")
+
+    def test_find_album_urls(self):
+        self.assertEqual(find_album_urls('melon', SEARCH_URLS['melon']('q'), MELON_RESULT), [MELON_URL])
+        # Relative links are resolved, and albums of other sites are ignored.
+        self.assertEqual(find_album_urls('bugs', SEARCH_URLS['bugs']('q'), BUGS_RESULT), [BUGS_URL])
+        self.assertEqual(find_album_urls('allmusic', SEARCH_URLS['allmusic']('q'), ALLMUSIC_RESULT),
+                         [ALLMUSIC_URL])
+        self.assertEqual(find_album_urls('bugs', SEARCH_URLS['bugs']('q'), EMPTY_RESULT), [])
+
+    def test_find_album_urls_in_page_order(self):
+        text = ('<a href="javascript:melon.link.goAlbumDetail(\'1\');">First</a>'
+                '<a href="https://www.melon.com/album/detail.htm?albumId=2">Second</a>'
+                '<a href="javascript:melon.link.goAlbumDetail(\'3\');">Third</a>')
+
+        self.assertEqual(find_album_urls('melon', SEARCH_URLS['melon']('q'), text),
+                         [MELON_ALBUM_URL % album_id for album_id in ('1', '2', '3')])
+
+    def test_search_without_charset(self):
+        # Response has no charset, so the page is decoded as UTF-8. (Not ISO-8859-1)
+        transport = SearchTransport({('allmusic', '크라잉넛 96'): '<a href="/album/크라잉넛-96-mw0000000096">96</a>'})
+        resolver = AlbumResolver(transport=transport, sites=('allmusic',))
+
+        self.assertEqual(resolver.search('allmusic', "크라잉넛", "96"),
+                         ["https://www.allmusic.com/album/크라잉넛-96-mw0000000096"])
+
+    def test_resolve(self):
+        resolver = AlbumResolver(transport=self.transport)
+
+        self.assertEqual(resolver.resolve("Crying Nut", "96"), MELON_URL)
+        self.assertEqual(AlbumResolver(transport=self.transport, sites=('bugs',)).resolve("Crying Nut", "96"),
+                         BUGS_URL)
+        # Next sites are searched if not found.
+        self.assertEqual(resolver.resolve("Original Soundtrack", "Judgment Night"), ALLMUSIC_URL)
+        self.assertIsNone(resolver.resolve("Nobody", "Nothing"))
+
+    def test_resolve_with_failed_candidate(self):
+        # First candidate is a removed album. (404)
+        result = '<a href="/album/1">Removed</a>' + BUGS_RESULT
+        resolver = AlbumResolver(transport=SearchTransport({('bugs', 'crying nut 96'): result}), sites=('bugs',))
+
+        self.assertEqual(resolver.resolve("Crying Nut", "96"), BUGS_URL)
+
+    def test_resolve_mismatch(self):
+        transport = SearchTransport({
+            ('melon', 'crying nut 69'): MELON_RESULT,
+            ('bugs', 'deli spice 96'): BUGS_RESULT,
+            ('bugs', 'no brain 96'): BUGS_RESULT,
+        })
+        resolver = AlbumResolver(transport=transport)
+
+        # Album found is not the album of the query.
+        self.assertIsNone(resolver.resolve("Crying Nut", "69"))
+        # Title matches, but artist doesn't.
+        self.assertIsNone(resolver.resolve("Deli Spice", "96"))
+        # Any artist of the album (including names in parentheses) matches.
+        self.assertEqual(resolver.resolve("No Brain", "96"), BUGS_URL)
+
+    def test_cache(self):
+        resolver = AlbumResolver(transport=self.transport)
+
+        resolver.resolve("Crying Nut", "96")
+        resolver.resolve("crying nut", "  96")
+        resolver.resolve("Nobody", "Nothing")
+        resolver.resolve("Nobody", "Nothing")
+
+        # Empty results are cached too. (Melon search and album, then search of each site)
+        self.assertEqual(len(self.transport.requested), 2 + 3)
+
+    def test_resolve_many(self):
+        resolver = AlbumResolver(transport=self.transport)
+        queries = [("Crying Nut", "96"), ("Nobody", "Nothing"),
+                   ("Original Soundtrack", "Judgment Night")] * 3
+
+        results = list(resolver.resolve_many(queries, max_workers=4))
+
+        self.assertEqual([item.url for item in results], queries)
+        self.assertTrue(all(item.ok for item in results))
+        self.assertEqual([item.result for item in results], [MELON_URL, None, ALLMUSIC_URL] * 3)
+
+    def test_parse_many(self):
+        resolver = AlbumResolver(transport=self.transport)
+        queries = [("Crying Nut", "96"), ("Nobody", "Nothing"), ("Original Soundtrack", "Judgment Night")]
+
+        melon, missing, allmusic = resolver.parse_many(queries, max_workers=2)
+
+        self.assertEqual(melon.result.url, MELON_URL)
+        self.assertEqual(melon.result.album.album_title, "96")
+        self.assertIsInstance(missing.error, InvalidURLError)
+        self.assertEqual(allmusic.result.album.album_title, "Judgment Night")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+from MusicParser import streaming
+from MusicParser.parser import InvalidURLError, MusicParser
+from test.support import ALLMUSIC_URL, BUGS_URL, FIXTURES, MELON_URL, FixtureTransport, make_response, read_fixture
+
+PAGE = ('<html><body><div class="list">'
+        '<table class="trackList"><tr><th>No</th></tr><tr><td>A &amp; B</td><td><br/>&#8217;</td></tr></table>'
+        '</div><table class="trackList"><tr><td>Other</td></tr></table>'
+        '<p>After track table</p></body></html>')
+
+
+def split(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class TestStreaming(unittest.TestCase):
+    """Test for parsing tracks while a page is downloaded."""
+
+    def setUp(self):
+        self.parser = MusicParser(transport=FixtureTransport())
+
+    def test_iter_tracks(self):
+        for url in (BUGS_URL, MELON_URL):
+            self.assertEqual(list(self.parser.iter_tracks(url)), list(self.parser.to_album(url).tracks))
+
+    def test_rows_in_small_chunks(self):
+        rows = list(streaming.iter_rows(split(PAGE, 7), ('table', 'trackList')))
+
+        self.assertEqual(rows, [(0, 0, '<tr><th>No</th></tr>'),
+                                (0, 1, '<tr><td>A &amp; B</td><td><br/>&#8217;</td></tr>')])
+
+    def test_stop_after_track_table(self):
+        chunks = split(PAGE, 10)
+        read = []
+
+        def texts():
+            for chunk in chunks:
+                read.append(chunk)
+                yield chunk
+
+        list(streaming.iter_rows(texts(), ('table', 'trackList')))
+
+        self.assertLess(len(read), len(chunks))
+
+    def test_decode_split_characters(self):
+        page = read_fixture(FIXTURES[BUGS_URL])
+        response = make_response(BUGS_URL, page)
+
+        self.assertEqual(''.join(streaming.iter_text(response, chunk_size=5)), page.decode('utf-8'))
+
+    def test_not_supported(self):
+        self.assertRaises(NotImplementedError, self.parser.iter_tracks, ALLMUSIC_URL)
+        self.assertRaises(InvalidURLError, self.parser.iter_tracks, "https://example.com/album/1")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+import requests
+
+from MusicParser.parser import MusicParser
+from MusicParser.transport import Transport, get_default_transport, make_response, resolve_transport
+from test.support import BUGS_URL, FixtureTransport, LocalServer
+
+
+class TestTransport(unittest.TestCase):
+    """Test for pooled HTTP transport with local HTTP server."""
+
+    def setUp(self):
+        self.local = LocalServer()
+        self.server = self.local.__enter__()
+        self.base_url = self.local.url
+
+    def tearDown(self):
+        self.local.__exit__(None, None, None)
+
+    def test_keep_alive(self):
+        with Transport() as transport:
+            for _ in range(5):
+                self.assertEqual(transport.get(self.base_url + '/').status_code, 200)
+
+        # All requests are sent through one connection.
+        self.assertEqual(len(self.server.clients), 1)
+        self.assertIn('Mozilla/5.0', self.server.requests[0][1]['User-Agent'])
+
+    def test_retry(self):
+        self.server.failures = 2
+
+        with Transport(retries=3, backoff_factor=0) as transport:
+            self.assertEqual(transport.get(self.base_url + '/flaky').status_code, 200)
+
+    def test_error_status(self):
+        with Transport(retries=0) as transport:
+            self.assertRaises(requests.HTTPError, transport.get, self.base_url + '/missing')
+
+    def test_default_transport(self):
+        self.assertIs(get_default_transport(), get_default_transport())
+
+        transport = FixtureTransport()
+        self.assertIs(resolve_transport(transport), transport)
+        self.assertIs(resolve_transport(None), get_default_transport())
+
+    def test_make_response(self):
+        headers = {'Content-Type': 'text/html; charset=euc-kr', 'ETag': None}
+        response = make_response(BUGS_URL, '벅스'.encode('euc-kr'), headers=headers)
+
+        self.assertEqual(response.text, '벅스')
+        self.assertNotIn('ETag', response.headers)
+        self.assertEqual(list(response.iter_content(1))[0], '벅스'.encode('euc-kr')[:1])
+
+    def test_inject_transport(self):
+        transport = FixtureTransport()
+        parser = MusicParser(transport=transport)
+
+        self.assertEqual(parser.to_dict(BUGS_URL)['album_title'], "96")
+        self.assertEqual(transport.requested, [BUGS_URL])